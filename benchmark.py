@@ -0,0 +1,359 @@
+import json
+import time
+import timeit
+import asyncio
+import argparse
+import threading
+import multiprocessing
+import logging
+import tracemalloc
+import discord
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from src.utils.localization import EmbedTemplate
+from src.utils.logger import AsyncLogger, LogPipeline, LogSink
+from tools.fakes import FakeLogger, FakeRedisServer
+from src.utils.guilds import GuildConfig, GuildState
+from tools.simulation import LoadTest, random_traffic
+from src.utils.timers import TimerWheel
+from src.cogs.autoroomer import Autoroomer
+
+
+def legacy_get_text(translations: dict, key: str):
+    """Localization.get_text as used by the listings before the templates"""
+    translation = translations
+    for part in key.split('.'):
+        translation = translation.get(part, f"❌ Missing translation: {key}")
+        if isinstance(translation, str):
+            break
+    return translation
+
+
+def legacy_participant_list(embed_data: dict, channel, state, participants) -> list:
+    output = []
+    for i in range(channel.user_limit):
+        if i < len(participants):
+            suffix = "[OWNER]" if participants[i].id == state.owner_id else ""
+            output.append(embed_data["fields"][0]["value"]["participant"].format(suffix=suffix, user_id=participants[i].id))
+        else:
+            output.append(embed_data["fields"][0]["value"]["free_slot"])
+    return output
+
+
+def legacy_build_embed(embed_data: dict, channel, state, participants) -> discord.Embed:
+    output = legacy_participant_list(embed_data, channel, state, participants)
+    embed = discord.Embed(title=embed_data["title"], description="", color=discord.Color(embed_data["color"]), timestamp=datetime.now(timezone.utc))
+    embed.add_field(name="", value="\n".join(output), inline=False)
+    embed.add_field(name="", value=embed_data["fields"][1]["value"].format(comment=state.comment), inline=False)
+    embed.set_author(name=embed_data["bot"]["name"], icon_url=embed_data["bot"]["url"])
+    embed.set_thumbnail(url=embed_data["thumbnail"]["url"])
+    embed.set_footer(text=embed_data["footer"]["text"], icon_url=embed_data["footer"]["icon_url"])
+    return embed
+
+
+def bench_embeds(args: argparse.Namespace) -> None:
+    """Compares building and updating a listing embed through the dict walk and through the compiled template"""
+    with open(args.locale, encoding="utf-8") as f:
+        translations = json.load(f)
+    template = EmbedTemplate(translations["embeds"]["create_message"])
+    members = [SimpleNamespace(id=1152921504606846977 + i) for i in range(args.members)]
+    channel = SimpleNamespace(user_limit=args.user_limit, members=members)
+    state = SimpleNamespace(owner_id=members[0].id if members else 0, comment="looking for a duo")
+    member_ids = [member.id for member in members]
+
+    def legacy_build():
+        embed_data = legacy_get_text(translations, "embeds.create_message")
+        return legacy_build_embed(embed_data, channel, state, channel.members)
+
+    def template_build():
+        return template.build(template.participants(state.owner_id, member_ids, channel.user_limit), template.comment(state.comment))
+
+    legacy_embed = legacy_build()
+
+    def legacy_update():
+        embed_data = legacy_get_text(translations, "embeds.create_message")
+        output = legacy_participant_list(embed_data, channel, state, channel.members)
+        legacy_embed.set_field_at(index=0, name="", value="\n".join(output), inline=False)
+        legacy_embed.set_field_at(index=1, name="", value=embed_data["fields"][1]["value"].format(comment=state.comment), inline=False)
+
+    template_embed = template_build()
+
+    def template_update():
+        template_embed.set_field_at(index=0, name="", value=template.participants(state.owner_id, member_ids, channel.user_limit), inline=False)
+        template_embed.set_field_at(index=1, name="", value=template.comment(state.comment), inline=False)
+
+    strip = lambda embed: {key: value for key, value in embed.to_dict().items() if key != "timestamp"}
+    assert strip(legacy_build()) == strip(template_build()), "the template renders a different embed"
+
+    print(f"{args.members} of {args.user_limit} slots taken, {args.number} runs, best of {args.repeat}")
+    for name, legacy, compiled in (("build", legacy_build, template_build), ("update", legacy_update, template_update)):
+        before = min(timeit.repeat(legacy, number=args.number, repeat=args.repeat)) / args.number
+        after = min(timeit.repeat(compiled, number=args.number, repeat=args.repeat)) / args.number
+        print(f"{name:<7} dict walk {before * 1e6:7.2f} µs   template {after * 1e6:7.2f} µs   x{before / after:.2f}")
+
+
+class SlowStream:
+    """Stream standing in for a congested stdout pipe: every write blocks for ``delay`` seconds"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, data: str) -> None:
+        self.writes += 1
+        time.sleep(self.delay)
+
+    def flush(self) -> None:
+        pass
+
+
+class LegacyLogger:
+    """AsyncLogger as it was: an unbounded asyncio.Queue drained by a task writing each record on the loop"""
+
+    def __init__(self, stream):
+        self.logger = logging.getLogger("benchmark.legacy")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.logger.handlers = [logging.StreamHandler(stream)]
+        self.queue = asyncio.Queue()
+
+    async def info(self, message: str) -> None:
+        await self.queue.put((logging.INFO, message))
+
+    async def process_logs(self) -> None:
+        while True:
+            level, message = await self.queue.get()
+            self.logger.log(level, message)
+
+
+async def measure_logger(logger, records: int, events: int) -> tuple:
+    """Simulates event handlers that log and yield, and measures the call cost and the loop lag"""
+    lags = []
+
+    async def ticker():
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+
+    probe = asyncio.create_task(ticker())
+    spent = 0.0
+    for event in range(events):
+        started = time.perf_counter()
+        for record in range(records):
+            await logger.info(f"🟢 Event {event} record {record}")
+        spent += time.perf_counter() - started
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.05)
+    probe.cancel()
+    return spent / (events * records), max(lags, default=0.0)
+
+
+def bench_logger(args: argparse.Namespace) -> None:
+    """Compares the queue-and-task logger with the buffered logger while stdout is slow"""
+    async def run():
+        legacy_stream = SlowStream(args.write_delay)
+        legacy = LegacyLogger(legacy_stream)
+        consumer = asyncio.create_task(legacy.process_logs())
+        legacy_cost, legacy_lag = await measure_logger(legacy, args.records, args.events)
+        consumer.cancel()
+
+        stream = SlowStream(args.write_delay)
+        pipeline = LogPipeline([LogSink(stream)], capacity=args.capacity)
+        buffered = AsyncLogger("benchmark", pipeline)
+        pipeline.attach()
+        cost, lag = await measure_logger(buffered, args.records, args.events)
+        suppressed = min(timeit.repeat(lambda: buffered.debug("⏱️ Handled", guild_id=1, latency_ms=0.5), number=100000, repeat=3)) / 100000
+        buffered.stop()
+
+        total = args.records * args.events
+        print(f"{total} records, stdout write {args.write_delay * 1e3:.1f} ms, buffer of {args.capacity}")
+        print(f"queue+task  call {legacy_cost * 1e6:6.2f} µs   max loop lag {legacy_lag * 1e3:7.2f} ms   writes {legacy_stream.writes}")
+        print(f"buffered    call {cost * 1e6:6.2f} µs   max loop lag {lag * 1e3:7.2f} ms   writes {stream.writes}   dropped {pipeline.dropped}")
+        print(f"suppressed debug call with fields {suppressed * 1e6:6.2f} µs")
+
+    asyncio.run(run())
+
+
+def bench_lookups(args: argparse.Namespace) -> None:
+    """Compares finding a room category by scanning the guild's categories with the resolved-channel index"""
+    categories = [SimpleNamespace(id=1000 + i) for i in range(args.categories)]
+    channels = {category.id: category for category in categories}
+    discord_guild = SimpleNamespace(id=1, categories=categories, get_channel=channels.get)
+    bot = SimpleNamespace(get_channel=channels.get)
+    config = GuildConfig(1, categories[0].id, categories[1].id, categories[-2].id, categories[-1].id, {}, "en.json")
+    guild = GuildState(config=config, localization=None, pool=None)
+
+    scan = lambda: discord.utils.get(discord_guild.categories, id=config.category_filled)
+    index = lambda: guild.channels(bot, discord_guild).filled
+    assert scan() is index()
+
+    print(f"{args.categories} categories, {args.number} runs, best of {args.repeat}")
+    before = min(timeit.repeat(scan, number=args.number, repeat=args.repeat)) / args.number
+    after = min(timeit.repeat(index, number=args.number, repeat=args.repeat)) / args.number
+    print(f"category lookup   scan {before * 1e6:7.2f} µs   index {after * 1e6:7.2f} µs   x{before / after:.2f}")
+
+
+def bench_timers(args: argparse.Namespace) -> None:
+    """Compares one sleeping task per pending timer with the timer wheel: schedule, cancel and memory"""
+    async def noop():
+        pass
+
+    async def sleeper(delay: float):
+        await asyncio.sleep(delay)
+        await noop()
+
+    async def run():
+        delays = [600 + i % 1200 for i in range(args.timers)]
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        tasks = {key: asyncio.create_task(sleeper(delay)) for key, delay in enumerate(delays)}
+        await asyncio.sleep(0)
+        scheduled = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        cancelled = time.perf_counter() - started
+        tracemalloc.stop()
+        print(f"tasks   schedule {scheduled / args.timers * 1e6:6.2f} µs   cancel {cancelled / args.timers * 1e6:6.2f} µs   {memory / args.timers:6.0f} B per timer")
+        del tasks
+
+        wheel = TimerWheel(FakeLogger())
+        tracemalloc.start()
+        started = time.perf_counter()
+        for key, delay in enumerate(delays):
+            wheel.schedule(key, delay, noop)
+        scheduled = time.perf_counter() - started
+        memory = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        for key in range(args.timers):
+            wheel.cancel(key)
+        cancelled = time.perf_counter() - started
+        tracemalloc.stop()
+        wheel.close()
+        print(f"wheel   schedule {scheduled / args.timers * 1e6:6.2f} µs   cancel {cancelled / args.timers * 1e6:6.2f} µs   {memory / args.timers:6.0f} B per timer")
+
+    print(f"{args.timers} pending timers of 10 to 30 minutes")
+    asyncio.run(run())
+
+
+class CogLockAutoroomer(Autoroomer):
+    """The cog with every event handled under one cog-wide lock, as before per-room locking"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = asyncio.Lock()
+
+    async def on_voice_state_update(self, member, before, after) -> None:
+        async with self._lock:
+            await super().on_voice_state_update(member, before, after)
+
+    async def on_voice_channel_status_update(self, channel, before, after) -> None:
+        async with self._lock:
+            await super().on_voice_channel_status_update(channel, before, after)
+
+
+def bench_locks(args: argparse.Namespace) -> None:
+    """Runs the same traffic under one cog-wide lock and under per-room locks, for growing numbers of members"""
+    async def run(cog_class, members: int):
+        test = LoadTest(members=members, latency=args.latency, limits="none", seed=args.seed, cog_class=cog_class)
+        try:
+            return await test.run(list(random_traffic(args.events, members, sorted(test.world.lobbies), seed=args.seed)))
+        finally:
+            test.close()
+
+    print(f"{args.events} actions back to back, {args.latency * 1000:.0f} ms REST latency, seed {args.seed}")
+    for members in args.members:
+        cog_lock = asyncio.run(run(CogLockAutoroomer, members))
+        room_locks = asyncio.run(run(Autoroomer, members))
+        print(
+            f"{members:4d} members   cog lock {cog_lock.events_per_second:7.0f} events/s  p99 {cog_lock.percentile(99) * 1000:7.1f} ms"
+            f"   room locks {room_locks.events_per_second:7.0f} events/s  p99 {room_locks.percentile(99) * 1000:7.1f} ms"
+            f"   x{room_locks.events_per_second / cog_lock.events_per_second:.1f}"
+        )
+
+
+def shard_worker(worker: int, events: int, members: int, url: str, results) -> None:
+    """Runs the load test of one worker process against the shared backend"""
+    async def run():
+        test = LoadTest(members=members, limits="none", seed=worker, first_id=(1 << 60) + (worker << 32), state_backend=url)
+        try:
+            report = await test.run(list(random_traffic(events, members, [2, 3, 4], seed=worker)))
+        finally:
+            test.close()
+            await asyncio.sleep(0.1)
+        results.put((report.events, report.elapsed))
+
+    asyncio.run(run())
+
+
+def bench_shards(args: argparse.Namespace) -> None:
+    """Splits the same traffic over 1..N worker processes, each serving its own guild, with one shared backend"""
+    loop = asyncio.new_event_loop()
+    server = FakeRedisServer()
+    loop.run_until_complete(server.start())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    context = multiprocessing.get_context("spawn")
+
+    print(f"{args.events} actions in total, {args.members} members per guild, backend {server.url}")
+    for workers in args.workers:
+        server.commands.clear()
+        results = context.Queue()
+        processes = [
+            context.Process(target=shard_worker, args=(worker, args.events // workers, args.members, server.url, results))
+            for worker in range(workers)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        wall = time.perf_counter() - started
+        events = sum(count for count, _ in reports)
+        slowest = max(elapsed for _, elapsed in reports)
+        commands = ", ".join(f"{name} {count}" for name, count in server.commands.most_common())
+        print(f"{workers} workers  {events} events  {events / slowest:8.0f} events/s  wall {wall:5.2f} s  backend: {commands}")
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the bot's hot paths")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    embeds = subparsers.add_parser("embeds", help="listing embed build and update")
+    embeds.add_argument("--locale", default="locales/en.json")
+    embeds.add_argument("--members", type=int, default=2)
+    embeds.add_argument("--user-limit", type=int, default=4)
+    embeds.add_argument("--number", type=int, default=20000)
+    embeds.add_argument("--repeat", type=int, default=5)
+    embeds.set_defaults(run=bench_embeds)
+    lookups = subparsers.add_parser("lookups", help="category lookup on the event path")
+    lookups.add_argument("--categories", type=int, default=50)
+    lookups.add_argument("--number", type=int, default=100000)
+    lookups.add_argument("--repeat", type=int, default=5)
+    lookups.set_defaults(run=bench_lookups)
+    logger = subparsers.add_parser("logger", help="logging cost and event loop lag with a slow stdout")
+    logger.add_argument("--events", type=int, default=500)
+    logger.add_argument("--records", type=int, default=4)
+    logger.add_argument("--write-delay", type=float, default=0.001)
+    logger.add_argument("--capacity", type=int, default=10000)
+    logger.set_defaults(run=bench_logger)
+    timers = subparsers.add_parser("timers", help="pending timers as sleeping tasks or on the timer wheel")
+    timers.add_argument("--timers", type=int, default=50000)
+    timers.set_defaults(run=bench_timers)
+    locks = subparsers.add_parser("locks", help="event throughput under one cog-wide lock and under per-room locks")
+    locks.add_argument("--events", type=int, default=1000)
+    locks.add_argument("--members", type=int, nargs="+", default=[10, 50, 200])
+    locks.add_argument("--latency", type=float, default=0.02)
+    locks.add_argument("--seed", type=int, default=0)
+    locks.set_defaults(run=bench_locks)
+    shards = subparsers.add_parser("shards", help="load test split over worker processes sharing a state backend")
+    shards.add_argument("--events", type=int, default=6000)
+    shards.add_argument("--members", type=int, default=200)
+    shards.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    shards.set_defaults(run=bench_shards)
+    args = parser.parse_args()
+    args.run(args)
@@ -0,0 +1,95 @@
+import asyncio
+import argparse
+import multiprocessing
+from typing import Dict, List
+from main import main
+from src.utils.config import Config
+from src.utils.logger import setup_async_logger
+
+
+def shard_ranges(shard_count: int, workers: int) -> List[List[int]]:
+    """Splits the shards into contiguous ranges, one per worker.
+
+    Args:
+        shard_count: Total number of shards.
+        workers: Number of worker processes.
+
+    Returns:
+        List[List[int]]: Shard IDs of every worker; sizes differ by at most one.
+    """
+    size, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for worker in range(workers):
+        end = start + size + (worker < extra)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+def run_worker(shard_ids: List[int], shard_count: int, worker: int) -> None:
+    """Entry point of one worker process"""
+    asyncio.run(main(shard_ids, shard_count, worker))
+
+
+async def launch(workers: int, shard_count: int, restart_delay: float) -> None:
+    """Starts one process per shard range and restarts the ones that exit.
+
+    A restarted worker reconnects its shards and claims its guilds again as soon as the
+    leases of the previous process expire (STATE_LEASE_TTL), then restores their rooms
+    from the shared state backend.
+
+    Args:
+        workers: Number of worker processes.
+        shard_count: Total number of shards.
+        restart_delay: Seconds to wait before restarting a worker that exited.
+    """
+    logger = await setup_async_logger('Launcher')
+    context = multiprocessing.get_context("spawn")
+    ranges = shard_ranges(shard_count, workers)
+    processes: Dict[int, multiprocessing.Process] = {}
+
+    def start(worker: int) -> None:
+        process = context.Process(target=run_worker, args=(ranges[worker], shard_count, worker), name=f"worker-{worker}")
+        process.start()
+        processes[worker] = process
+
+    for worker, shard_ids in enumerate(ranges):
+        start(worker)
+        await logger.info(f"🚀 Worker {worker} (pid {processes[worker].pid}) started with shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count}")
+    try:
+        while True:
+            await asyncio.sleep(1)
+            for worker, process in list(processes.items()):
+                if not process.is_alive():
+                    await logger.error(f"❌ Worker {worker} exited with code {process.exitcode}, restarting in {restart_delay:.0f} s")
+                    await asyncio.sleep(restart_delay)
+                    start(worker)
+    finally:
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join()
+        logger.stop()
+
+
+if __name__ == "__main__":
+    config = Config()
+    parser = argparse.ArgumentParser(description="Run the bot as several worker processes, each serving a range of shards")
+    parser.add_argument("--workers", type=int, default=config.workers, help="worker processes (WORKERS)")
+    parser.add_argument("--shards", type=int, default=config.shard_count, help="total shards (SHARD_COUNT, defaults to one per worker)")
+    parser.add_argument("--restart-delay", type=float, default=5.0, help="seconds before a worker that exited is restarted")
+    args = parser.parse_args()
+    shard_count = args.shards or args.workers
+    if args.workers < 1 or shard_count < args.workers:
+        parser.error("every worker needs at least one shard")
+    if args.workers > 1 and not config.guilds_file:
+        parser.error("several workers need GUILDS_FILE, the .env configuration is for a single guild")
+    if args.workers > 1 and config.state_backend in ("sqlite", "memory"):
+        parser.error(f"several workers need a shared STATE_BACKEND (redis://...), {config.state_backend} is kept per process")
+    if config.state_backend == "memory":
+        print("⚠️ STATE_BACKEND=memory lives inside each worker: its rooms are lost when it restarts")
+    try:
+        asyncio.run(launch(args.workers, shard_count, args.restart_delay))
+    except KeyboardInterrupt:
+        print("❌ Launcher was stopped manually")
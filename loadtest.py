@@ -0,0 +1,61 @@
+import asyncio
+import argparse
+from pathlib import Path
+from tools.simulation import LoadTest, random_traffic, recorded_traffic, scripted_traffic
+
+
+async def main(args: argparse.Namespace):
+    replay = list(recorded_traffic(args.replay, args.speed)) if args.replay else None
+    members = args.members
+    if replay:
+        # Every recorded member needs a fake member of its own
+        members = max(members, max(action.member for action in replay) + 1)
+    load_test = LoadTest(
+        members=members,
+        latency=args.latency,
+        limits=args.limits,
+        seed=args.seed,
+        edit_flush_window=args.flush_window,
+        listing_mode=args.listing_mode,
+        board_refresh_interval=args.board_interval,
+        matchmaking=args.matchmaking,
+        room_grace_period=args.grace_period,
+        filled_hysteresis=args.hysteresis
+    )
+    await load_test.setup()
+    if replay is not None:
+        actions = iter(replay)
+    elif args.script:
+        actions = scripted_traffic(args.script)
+    else:
+        actions = random_traffic(args.events, args.members, sorted(load_test.world.lobbies), args.seed, args.rate)
+
+    try:
+        report = await load_test.run(actions, trace_memory=args.trace_memory)
+    finally:
+        load_test.close()
+    print(report)
+    for error in report.errors[:5]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive the Autoroomer cog with simulated voice traffic against a fake Discord")
+    parser.add_argument("--events", type=int, default=2000, help="number of random user actions")
+    parser.add_argument("--members", type=int, default=200, help="number of guild members taking part")
+    parser.add_argument("--rate", type=float, default=0.0, help="mean user actions per second (0 = back to back)")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated REST round trip in seconds")
+    parser.add_argument("--flush-window", type=float, default=0.0, help="EDIT_FLUSH_WINDOW for the run")
+    parser.add_argument("--listing-mode", choices=("messages", "board"), default="messages", help="LISTING_MODE for the run")
+    parser.add_argument("--board-interval", type=float, default=0.0, help="BOARD_REFRESH_INTERVAL for the run")
+    parser.add_argument("--matchmaking", action="store_true", help="move lobby joiners into open rooms before creating new ones")
+    parser.add_argument("--grace-period", type=float, default=0.0, help="ROOM_GRACE_PERIOD for the run")
+    parser.add_argument("--hysteresis", type=float, default=0.0, help="FILLED_HYSTERESIS for the run")
+    parser.add_argument("--limits", choices=("discord", "strict", "none"), default="none",
+                        help="rate limits of the fake Discord: the real ones, waited for like py-cord does, half of them (429s) or none (default, measures the bot itself)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--script", type=Path, help="JSON-lines file with scripted actions instead of random traffic")
+    parser.add_argument("--replay", type=Path, help="voice event recording (VOICE_RECORD_FILE) to play instead of random traffic")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay speed relative to the recording (0 = as fast as possible)")
+    parser.add_argument("--trace-memory", action="store_true", help="report the tracemalloc peak instead of the process RSS")
+    asyncio.run(main(parser.parse_args()))
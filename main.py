@@ -1,30 +1,40 @@
 import asyncio
 import discord
-from src.bot import Bot
+from typing import List, Optional
+from src.bot import Bot, ShardedBot
 from src.utils.config import Config
-from src.utils.localization import Localization
+from src.utils.localization import Locales
 from src.utils.logger import setup_async_logger
 
-async def main():
-    # Create logger
-    logger = await setup_async_logger('Main')
+async def main(shard_ids: Optional[List[int]] = None, shard_count: Optional[int] = None, worker: int = 0):
+    # Read configuration and create logger
+    config = Config()
+    logger = await setup_async_logger('Main' if shard_ids is None else f'Worker:{worker}', config)
     
     # Initialize configuration
-    config = Config()
     await config.initialize(logger)
+    if config.metrics_port:
+        # Every worker of launcher.py serves its metrics on its own port
+        config.metrics_port += worker
     
-    # Initializing localization
-    localization = Localization(config.lang, logger)
+    # Initializing localization for every guild
+    localization = Locales(logger)
+    for lang in {config.lang, *(guild.lang for guild in config.guilds)}:
+        await localization.load(lang)
     
-    # Initializing bot
-    bot = Bot(config, localization, logger)
+    # Initializing bot, sharded if the launcher assigned shards or SHARD_COUNT is set
+    shard_count = shard_count or config.shard_count
+    if shard_count:
+        bot = ShardedBot(config, localization, logger, shard_count=shard_count, shard_ids=shard_ids)
+    else:
+        bot = Bot(config, localization, logger)
     await bot.setup()
     
     try:
         await bot.start(config.token)
     except discord.errors.PrivilegedIntentsRequired:
         await logger.error("❌ Privileged intents are not enabled in the Discord Developer Portal. "
-                           "Please enable 'Message Content Intent' at https://discord.com/developers/applications")
+                           "Please enable them at https://discord.com/developers/applications or set INTENTS_PROFILE=minimal")
         raise
     except (KeyboardInterrupt, asyncio.CancelledError):
         print("❌ Bot was stopped manually")
@@ -3,20 +3,39 @@ from discord.ext import commands
 from pathlib import Path
 from importlib import import_module
 from .utils.logger import setup_async_logger
+from .utils.metrics import registry, MetricsServer
+from .utils.gateway import cache_sizes, gateway_options, peak_rss_kb
 
 
 class Bot(commands.Bot):
-    __slots__ = ('config', 'localization', 'logger', 'cog_loggers')
+    __slots__ = ('config', 'localization', 'logger', 'cog_loggers', 'metrics_server')
 
-    def __init__(self, config, localization, logger):
-        super().__init__(command_prefix='!', intents=discord.Intents.all())
+    def __init__(self, config, localization, logger, **options):
+        super().__init__(command_prefix='!', **gateway_options(config.intents_profile), **options)
         self.config = config
         self.localization = localization
         self.logger = logger
         self.cog_loggers = []
+        self.metrics_server = None
 
     async def setup(self):
         await self.load_cogs()
+        await self.start_metrics()
+        self.localization.watch(self.config.locale_reload_interval)
+
+    async def start_metrics(self):
+        """Enables instrumentation and serves it on the configured port, if any"""
+        if not self.config.metrics_port:
+            return
+        registry.enabled = True
+        registry.register("logger_queue_depth", "gauge", lambda: len(self.logger.pipeline.buffer))
+        registry.register("logger_dropped_total", "counter", lambda: self.logger.pipeline.dropped)
+        registry.register("cache_objects", "gauge", lambda: {
+            (("kind", kind),): size for kind, size in cache_sizes(self).items()
+        })
+        self.metrics_server = MetricsServer(registry, self.config.metrics_host, self.config.metrics_port)
+        await self.metrics_server.start()
+        await self.logger.info(f'📈 Metrics available at http://{self.config.metrics_host}:{self.config.metrics_port}/metrics')
     
     async def load_cogs(self):
         """Loading of all cogs from the src/cogs folder"""
@@ -30,10 +49,13 @@ class Bot(commands.Bot):
                         await self.logger.error(f"❌ Module {f"src.cogs.{file_path.stem}"} does not contain a valid Cog class {file_path.stem.capitalize()}")
                         continue
 
-                    cog_logger = await setup_async_logger(f'Cog:{file_path.stem}')
+                    cog_logger = await setup_async_logger(f'Cog:{file_path.stem}', self.config)
                     self.cog_loggers.append(cog_logger)
 
-                    self.add_cog(cog_class(self, self.localization, self.config, cog_logger))
+                    cog = cog_class(self, self.localization, self.config, cog_logger)
+                    self.add_cog(cog)
+                    if hasattr(cog, "setup"):
+                        await cog.setup()
                     await self.logger.info(f'✅ Loaded cog: {file_path.stem}')
 
                 except Exception as e:
@@ -41,8 +63,23 @@ class Bot(commands.Bot):
 
     async def on_ready(self):
         await self.logger.info(f'🤖 Bot {self.user} is ready!')
+        await self.report_cache()
+
+    async def report_cache(self):
+        """Logs the size of the cache and the peak memory, to verify the intents profile"""
+        sizes = ", ".join(f"{size} {kind}" for kind, size in cache_sizes(self).items())
+        await self.logger.info(
+            f'📊 Cache with intents profile {self.config.intents_profile}: {sizes}, peak RSS {peak_rss_kb() / 1024:.1f} MiB'
+        )
 
     async def close(self):
+        self.localization.close()
+        if self.metrics_server:
+            self.metrics_server.close()
         for cog_logger in self.cog_loggers:
             cog_logger.stop()
-        await super().close()
\ No newline at end of file
+        await super().close()
+
+
+class ShardedBot(Bot, commands.AutoShardedBot):
+    """The bot running a range of shards in this process; see launcher.py"""
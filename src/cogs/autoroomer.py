@@ -1,8 +1,23 @@
+import time
 import asyncio
+import logging
 import discord
+from contextlib import asynccontextmanager
 from discord.ext import commands
-from typing import Dict
-from ..utils.func import RoomState, CreateRoom, Message
+from typing import Dict, List, Optional, AsyncIterator, Set, Union
+from ..utils.func import OWNER_PERMISSIONS, RoomState, CreateRoom, Message
+from ..utils.debounce import EditScheduler
+from ..utils.rest import Priority, RestScheduler
+from ..utils.store import open_store
+from ..utils.pool import RoomPool
+from ..utils.guilds import DEFAULT_GUILD, GuildState, find_guild
+from ..utils.metrics import registry
+from ..utils.locks import LockTable
+from ..utils.matchmaking import FreeSlotIndex
+from ..utils.board import Board, BoardRoom
+from ..utils.recorder import ChannelRef, VoiceRecorder
+from ..utils.timers import TimerWheel
+from ..utils.reconcile import ReconcileReport, mentioned_user_ids, room_owner_id, split_for_bulk_delete
 
 
 class Autoroomer(commands.Cog):
@@ -11,172 +26,1084 @@ class Autoroomer(commands.Cog):
 
         Args:
             bot: An instance of the Discord bot.
-            localization: A localization object for messages.
+            localization: The loaded locales of all guilds.
             config: The bot's configuration.
             logger: A logger for recording events and errors.
 
+        Every configured guild gets its own room states, lobby map, locale and room pool,
+        looked up by guild ID when an event arrives.
+
         Raises:
-            ValueError: If the configuration contains invalid values for categories.
+            ValueError: If no guild is configured.
         """
-        if not all([config.category_filled, config.category_find, config.category_create_room]):
-            raise ValueError("🔴 Invalid configuration: missing required category IDs.")
-        
+        if not config.guilds:
+            raise ValueError("🔴 Invalid configuration: no guild configured.")
+
         self.bot: commands.Bot = bot
-        self.room_states: Dict[int, RoomState] = {}
         self.localization = localization
         self.config = config
         self.logger = logger
-        self._lock: asyncio.Lock = asyncio.Lock()
-        self._channel_locks: Dict[int, asyncio.Lock] = {}
+        self.locks = LockTable()
+        self.fetches_avoided: int = 0
+        self.edits = EditScheduler(config.edit_flush_window, logger)
+        self.board_edits = EditScheduler(config.board_refresh_interval, logger)
+        self.rest = RestScheduler(logger)
+        self.timers = TimerWheel(logger)
+        self.guilds: Dict[int, GuildState] = {
+            guild.guild_id: GuildState(
+                config=guild,
+                localization=localization.get(guild.lang),
+                pool=RoomPool(
+                    logger, self.rest, guild.category_create_room, guild.sizes,
+                    config.pool_min_size, config.pool_max_size, config.pool_horizon
+                ),
+                board=Board(logger, self.rest) if guild.listing_mode == "board" else None
+            )
+            for guild in config.guilds
+        }
+        for guild in self.guilds.values():
+            if guild.board is not None and "board" not in guild.localization.templates:
+                raise ValueError(f"🔴 Invalid configuration: {guild.config.lang} has no 'board' embed for board mode.")
+        self.store = open_store(config, logger)
+        self.store.on_lost = self._lease_lost
+        self._restarts: Set[asyncio.Task] = set()
+        self.recorder = VoiceRecorder(config.voice_record_file) if config.voice_record_file else None
+        self._restore_ms = 0.0
+        self.creation_latency = registry.histogram("room_creation_seconds")
+        self._register_metrics()
+
+    async def setup(self) -> None:
+        """Opens the room store and restores the stored room states before the bot connects"""
+        started = time.perf_counter()
+        restored = await self.store.load({guild_id: guild.room_states for guild_id, guild in self.guilds.items()})
+        self._restore_ms = (time.perf_counter() - started) * 1000
+        await self.logger.info(f"♻️ Restored {restored} room states in {self._restore_ms:.0f} ms.")
+
+    def _register_metrics(self) -> None:
+        """Exposes the cog's gauges and counters to the metrics registry"""
+        registry.register("live_rooms", "gauge", lambda: sum(len(guild.room_states) for guild in self.guilds.values()))
+        registry.register("channel_locks", "gauge", lambda: len(self.locks))
+        registry.register("pending_locks", "gauge", self.locks.waiting)
+        registry.register("lock_contended_total", "counter", lambda: self.locks.contended)
+        registry.register("lock_contended_wait_seconds_total", "counter", lambda: self.locks.wait_seconds)
+        registry.register("hot_locks", "gauge", lambda: {
+            (("channel", str(channel_id)),): contended for channel_id, contended in self.locks.hottest()
+        })
+        registry.register("fetches_avoided_total", "counter", lambda: self.fetches_avoided)
+        registry.register("rest_queue_depth", "gauge", lambda: {
+            (("priority", priority),): depth for priority, depth in self.rest.queue_depth().items()
+        })
+        registry.register("pool_rooms", "gauge", self._pool_rooms)
+        registry.register("open_rooms", "gauge", self._open_rooms)
+        registry.register("pending_timers", "gauge", lambda: len(self.timers))
+        registry.register("vacant_rooms", "gauge", lambda: sum(len(rooms) for guild in self.guilds.values() for rooms in guild.vacant.values()))
+        registry.register("timers_fired_total", "counter", lambda: self.timers.fired)
+
+    def _pool_rooms(self) -> Dict[tuple, int]:
+        """Returns the number of pooled rooms per size across all guilds"""
+        rooms: Dict[tuple, int] = {}
+        for guild in self.guilds.values():
+            for size in guild.config.sizes:
+                key = (("size", str(size)),)
+                rooms[key] = rooms.get(key, 0) + guild.pool.size(size)
+        return rooms
+
+    def _open_rooms(self) -> Dict[tuple, int]:
+        """Returns the number of rooms with a free slot per size across all guilds"""
+        rooms: Dict[tuple, int] = {}
+        for guild in self.guilds.values():
+            for size, count in guild.open_rooms.counts().items():
+                key = (("size", str(size)),)
+                rooms[key] = rooms.get(key, 0) + count
+        return rooms
+
+    def cog_unload(self) -> None:
+        """Drops listing edits and Discord requests that have not been sent yet and persists the room states"""
+        self.edits.close()
+        self.board_edits.close()
+        self.timers.close()
+        for guild in self.guilds.values():
+            guild.pool.close()
+        for task in self._restarts:
+            task.cancel()
+        self.rest.close()
+        self.store.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    @asynccontextmanager
+    async def _acquire_channels(self, *channels: Optional[discord.abc.GuildChannel]) -> AsyncIterator[None]:
+        """Holds the locks of all given channels for the duration of the block.
+
+        Locks are always taken in ascending channel ID order, so two events touching the
+        same pair of rooms in opposite directions cannot deadlock, and events for one room
+        are applied in the order they arrived. A channel's lock only exists while an event
+        holds or waits for it.
+
+        Args:
+            channels: Channels to lock. ``None`` entries and duplicates are ignored.
+        """
+        with registry.time("lock_wait_seconds"):
+            held = await self.locks.acquire_many(*(channel.id for channel in channels if channel is not None))
+        try:
+            yield
+        finally:
+            self.locks.release_many(held)
+
+    @staticmethod
+    def _is_room(guild: GuildState, channel: Optional[discord.abc.GuildChannel]) -> bool:
+        """Checks whether a channel is a managed room.
+
+        Args:
+            guild: The guild of the channel.
+            channel: The channel to check.
+
+        Returns:
+            bool: True if the channel is in the guild's "find" or "filled" category.
+        """
+        return channel is not None and channel.category_id in guild.config.room_categories
+
+    def _channel_ref(self, guild: GuildState, channel: Optional[discord.abc.GuildChannel]) -> ChannelRef:
+        """Describes a channel for the voice recorder: a lobby by its size, a room by its ID, anything else as other"""
+        if channel is None:
+            return None
+        if channel.id in guild.config.lobbies:
+            return "lobby", guild.config.lobbies[channel.id]
+        if self._is_room(guild, channel):
+            return "room", channel.id
+        return "other", 0
+
+    @staticmethod
+    def _free_slots(guild: GuildState, channel: discord.VoiceChannel) -> int:
+        """Returns the free slots of a room from its live member list and the members still being moved in"""
+        reserved = guild.open_rooms.reserved(channel.id)
+        if reserved:
+            reserved = reserved.difference(member.id for member in channel.members)
+        return channel.user_limit - len(channel.members) - len(reserved)
+
+    def _index_room(self, guild: GuildState, channel: discord.VoiceChannel) -> None:
+        """Updates the free slots of a room in the guild's matchmaking index.
+
+        A room is open while it has a state, at least one member and a free slot. The
+        update does not await anything, so it needs no room lock.
+
+        Args:
+            guild: The guild of the room.
+            channel: The room whose members changed.
+        """
+        if channel.id in guild.room_states and channel.members:
+            guild.open_rooms.update(channel.id, channel.user_limit, self._free_slots(guild, channel))
+        else:
+            guild.open_rooms.discard(channel.id)
+
+    async def _match_room(self, guild: GuildState, member: discord.Member, sizes: List[int]) -> Optional[discord.VoiceChannel]:
+        """Moves a member into the fullest open room of the given sizes.
+
+        The index may lag behind joins whose events are not handled yet, so each candidate
+        is checked against its live member list first. The slot is reserved until the join
+        event of the move is handled, so members matched at the same time are spread over
+        the free slots. Bot moves ignore the user limit, which makes this check the only
+        guard against overfilling a room.
+
+        Must not be called while holding a room lock.
+
+        Args:
+            guild: The guild to search.
+            member: The member to move.
+            sizes: User limits of the rooms to consider.
+
+        Returns:
+            Optional[discord.VoiceChannel]: The room the member was moved into, or None if no room is open or the move failed.
+        """
+        current = member.voice.channel.id if member.voice and member.voice.channel else None
+        while (channel_id := guild.open_rooms.best(sizes, exclude=current)) is not None:
+            channel = member.guild.get_channel(channel_id)
+            if not isinstance(channel, discord.VoiceChannel) or channel.id not in guild.room_states:
+                guild.open_rooms.discard(channel_id)
+                continue
+            if self._free_slots(guild, channel) <= 0:
+                self._index_room(guild, channel)
+                continue
+            guild.open_rooms.reserve(channel.id, member.id)
+            self._index_room(guild, channel)
+            try:
+                moved = await self.rest.submit(Priority.MOVE_MEMBER, f"members:{member.guild.id}", "move_member", lambda channel=channel: self._move_if_free(guild, member, channel))
+            except Exception as e:
+                await self.logger.error(f"🔴 Error while moving member {member.id} into room {channel.id}: {e}")
+                moved = False
+            if moved:
+                registry.inc("rooms_matched_total")
+                return channel
+            guild.open_rooms.release(channel.id, member.id)
+            self._index_room(guild, channel)
+            if moved is False:
+                return None
+        return None
+
+    async def _move_if_free(self, guild: GuildState, member: discord.Member, channel: discord.VoiceChannel) -> Optional[bool]:
+        """Moves a member into a room if it still has a slot for them once the request is sent.
+
+        Returns:
+            Optional[bool]: True if the member was moved, None if the room filled up meanwhile.
+        """
+        # The member's own reservation is counted by _free_slots, so a full room has fewer than zero
+        if self._free_slots(guild, channel) < 0:
+            registry.inc("rooms_match_conflicts_total")
+            return None
+        await member.move_to(channel)
+        return True
+
+    @staticmethod
+    def _is_idle(member: discord.Member) -> bool:
+        """Checks whether a member is deafened, by themselves or by a moderator"""
+        voice = member.voice
+        return voice is not None and (voice.self_deaf or voice.deaf)
+
+    def _watch_idle(self, guild: GuildState, channel: discord.VoiceChannel) -> None:
+        """Starts the idle timer of a room whose members are all deafened, or stops it.
+
+        A running timer is left alone, so the room is reaped ``room_idle_timeout`` seconds
+        after its members went idle however many events arrive meanwhile.
+
+        Args:
+            guild: The guild of the room.
+            channel: The room whose members changed.
+        """
+        if not self.config.room_idle_timeout:
+            return
+        key = ("idle", channel.id)
+        if channel.id in guild.room_states and channel.members and all(map(self._is_idle, channel.members)):
+            if key not in self.timers:
+                self.timers.schedule(key, self.config.room_idle_timeout, lambda: self._reap_idle_room(guild, channel))
+        else:
+            self.timers.cancel(key)
+
+    async def _reap_idle_room(self, guild: GuildState, channel: discord.VoiceChannel) -> None:
+        """Deletes a room whose members have all stayed deafened for ``room_idle_timeout`` seconds.
+
+        Args:
+            guild: The guild of the room.
+            channel: The idle room.
+        """
+        message_channel = guild.channels(self.bot, channel.guild).listing
+        if not message_channel:
+            await self.logger.error(f"🔴 Text channel {guild.config.text_channel_id} not found.")
+            return
+        async with self._acquire_channels(channel):
+            state = guild.room_states.get(channel.id)
+            if state is None or not channel.members or not all(map(self._is_idle, channel.members)):
+                return
+            registry.inc("rooms_reaped_total")
+            await self.logger.info(f"♻️ Deleting room {channel.id}, its members were deafened for {self.config.room_idle_timeout:.0f} seconds.")
+            await self._delete_room(guild, channel, state, message_channel)
+            self.store.touch(guild.config.guild_id, channel.id)
+
+    def _schedule_listing_retry(self, guild: GuildState, channel: discord.VoiceChannel, message_channel: discord.TextChannel, attempt: int) -> None:
+        """Schedules another attempt to post a room's listing after a failed send.
+
+        The delay starts at ``listing_retry_delay`` and doubles with every attempt.
+
+        Args:
+            guild: The guild of the room.
+            channel: The room without a listing.
+            message_channel: Text channel for messages.
+            attempt: Number of retries made so far.
+        """
+        if attempt >= self.config.listing_retry_attempts:
+            if attempt:
+                registry.inc("listing_retries_exhausted_total")
+            return
+        self.timers.schedule(
+            ("listing", channel.id), self.config.listing_retry_delay * 2 ** attempt,
+            lambda: self._retry_listing(guild, channel, message_channel, attempt)
+        )
+
+    async def _retry_listing(self, guild: GuildState, channel: discord.VoiceChannel, message_channel: discord.TextChannel, attempt: int) -> None:
+        """Posts the listing of a room that still has none, unless it was deleted, filled or emptied meanwhile.
+
+        Args:
+            guild: The guild of the room.
+            channel: The room without a listing.
+            message_channel: Text channel for messages.
+            attempt: Number of retries made so far.
+        """
+        async with self._acquire_channels(channel):
+            state = guild.room_states.get(channel.id)
+            if state is None or state.message_id is not None or not channel.members or channel.category_id != guild.config.category_find:
+                return
+            registry.inc("listing_retries_total")
+            await Message.create_message(self.logger, self.rest, guild.localization, channel, state, message_channel)
+            if state.message_id is None:
+                self._schedule_listing_retry(guild, channel, message_channel, attempt + 1)
+            else:
+                await self.logger.info(f"✅ Listing of room {channel.id} posted after {attempt + 1} retries.")
+                self.store.touch(guild.config.guild_id, channel.id)
+
+    def _listing_message(self, state: RoomState, message_channel: discord.TextChannel) -> Union[discord.Message, discord.PartialMessage]:
+        """Returns an editable handle for the room's listing message without fetching it.
 
-    async def _get_channel_lock(self, channel_id: int) -> asyncio.Lock:
-        """Get or create a lock for a specific channel.
+        The last sent or edited message is reused; if only the ID is known, a partial
+        message is built locally. Callers fall back to recreating the listing on NotFound.
 
         Args:
-            channel_id: ID of the voice channel.
+            state: Room state with a non-empty message_id.
+            message_channel: Text channel for messages.
 
         Returns:
-            asyncio.Lock: Lock for the specified channel.
+            Union[discord.Message, discord.PartialMessage]: Handle for the listing message.
         """
-        if channel_id not in self._channel_locks:
-            self._channel_locks[channel_id] = asyncio.Lock()
-        return self._channel_locks[channel_id]
+        if state.message is None or state.message.id != state.message_id:
+            state.message = message_channel.get_partial_message(state.message_id)
+        return state.message
 
-    async def _ensure_message_created(self, channel: discord.VoiceChannel, state: RoomState, message_channel: discord.TextChannel) -> None:
+    async def _delete_listing_message(self, state: RoomState, message_channel: discord.TextChannel) -> None:
+        """Deletes the room's listing message and forgets its handle.
+
+        Args:
+            state: Room state with a non-empty message_id.
+            message_channel: Text channel for messages.
+
+        Raises:
+            discord.errors.NotFound: If the message was already deleted.
+        """
+        message = self._listing_message(state, message_channel)
+        state.message = None
+        await self.rest.submit(Priority.DELETE_LISTING, f"messages:{message_channel.id}", "delete_message", message.delete)
+
+    async def _move_to_category(self, channel: discord.VoiceChannel, category: Optional[discord.CategoryChannel]) -> None:
+        """Moves a room to another category.
+
+        Args:
+            channel: Voice channel.
+            category: Target category.
+        """
+        await self.rest.submit(Priority.CHANNEL, f"channel:{channel.id}", "edit_channel", lambda: channel.edit(category=category))
+
+    async def _ensure_message_created(self, guild: GuildState, channel: discord.VoiceChannel, state: RoomState, message_channel: discord.TextChannel) -> None:
         """Ensures that the message for the room is created and state.message_id is updated.
 
         Args:
+            guild: The guild of the room.
+            channel: Voice channel.
+            state: Room state.
+            message_channel: Text channel for messages.
+        """
+        if guild.board is not None:
+            state.value = 1
+            self._schedule_board(guild, message_channel)
+            return
+        await Message.create_message(self.logger, self.rest, guild.localization, channel, state, message_channel)
+        if state.message_id is None:
+            self._schedule_listing_retry(guild, channel, message_channel, 0)
+
+    async def _update_listing(self, guild: GuildState, channel: discord.VoiceChannel, state: RoomState, message_channel: discord.TextChannel) -> None:
+        """Renders the current room state into its listing message, recreating it if it is gone.
+
+        The caller must hold the lock of ``channel``.
+
+        Args:
+            guild: The guild of the room.
             channel: Voice channel.
             state: Room state.
             message_channel: Text channel for messages.
         """
-        await Message.create_message(self.logger, self.localization, channel, state, message_channel)
+        try:
+            if state.message_id is not None:
+                msg = self._listing_message(state, message_channel)
+                # Editing through the handle replaces the fetch_message an edit used to need
+                self.fetches_avoided += 1
+                await Message.update_message(self.logger, self.rest, guild.localization, channel, state, msg)
+            elif channel.category_id == guild.config.category_find:
+                await self._ensure_message_created(guild, channel, state, message_channel)
+        except discord.errors.NotFound:
+            # A room that was filled meanwhile gets its listing back when it is released
+            if channel.category_id == guild.config.category_find:
+                await self._ensure_message_created(guild, channel, state, message_channel)
+        except Exception as e:
+            await self.logger.error(f"🔴 Unexpected error while updating message: {e}")
+
+    async def _schedule_update(self, guild: GuildState, channel: discord.VoiceChannel, state: RoomState, message_channel: discord.TextChannel) -> None:
+        """Updates the listing message at the end of the flush window.
+
+        Participant and comment changes arriving within the window are merged into a
+        single edit of the latest state. With a window of 0 the edit is sent right away.
+
+        Args:
+            guild: The guild of the room.
+            channel: Voice channel.
+            state: Room state.
+            message_channel: Text channel for messages.
+        """
+        if guild.board is not None:
+            self._schedule_board(guild, message_channel)
+            return
+        if self.edits.window <= 0:
+            await self._update_listing(guild, channel, state, message_channel)
+            return
 
-    async def _handle_before_channel(self, channel: discord.VoiceChannel, message_channel: discord.TextChannel) -> None:
+        async def flush() -> None:
+            async with self._acquire_channels(channel):
+                if guild.room_states.get(channel.id) is state:
+                    await self._update_listing(guild, channel, state, message_channel)
+                    self.store.touch(guild.config.guild_id, channel.id)
+
+        self.edits.schedule(channel.id, flush)
+
+    def _schedule_board(self, guild: GuildState, message_channel: discord.TextChannel) -> None:
+        """Refreshes the guild's board at most once per ``board_refresh_interval``.
+
+        Every room change within the interval is covered by the one refresh at its end,
+        which renders all open rooms and only edits the pages that changed.
+
+        Args:
+            guild: The guild of the board.
+            message_channel: Text channel of the board.
+        """
+        self.board_edits.schedule(guild.config.guild_id, lambda: self._refresh_board(guild, message_channel))
+
+    async def _refresh_board(self, guild: GuildState, message_channel: discord.TextChannel) -> None:
+        """Renders the open rooms of a guild into its board pages.
+
+        Args:
+            guild: The guild of the board.
+            message_channel: Text channel of the board.
+        """
+        rooms: List[BoardRoom] = []
+        for resolved in guild.resolved.values():
+            if resolved.find is None:
+                continue
+            for channel in resolved.find.voice_channels:
+                state = guild.room_states.get(channel.id)
+                if state is not None and channel.members:
+                    rooms.append((channel.user_limit, channel.id, len(channel.members), state.comment))
+        try:
+            await guild.board.refresh(guild.localization.embed("board"), rooms, message_channel)
+        except KeyError:
+            await self.logger.error(f"🔴 {guild.localization.locale_file} has no 'board' embed, the board is not updated.")
+        except discord.errors.Forbidden:
+            await self.logger.error(f"🔴 Missing permissions to update the board in channel {message_channel.id}.")
+
+    async def _delete_room(self, guild: GuildState, channel: discord.VoiceChannel, state: RoomState, message_channel: discord.TextChannel) -> None:
+        """Deletes a room together with its listing message and state.
+
+        The caller must hold the lock of ``channel``.
+
+        Args:
+            guild: The guild of the room.
+            channel: Voice channel.
+            state: Room state.
+            message_channel: Text channel for messages.
+        """
+        self.edits.cancel(channel.id)
+        self._occupy(guild, channel)
+        guild.open_rooms.forget(channel.id)
+        for purpose in ("idle", "listing", "unfill"):
+            self.timers.cancel((purpose, channel.id))
+        registry.inc("rooms_deleted_total")
+        try:
+            if guild.board is not None:
+                self._schedule_board(guild, message_channel)
+            elif state.message_id is not None:
+                await self._delete_listing_message(state, message_channel)
+            else:
+                await self.logger.info(f"🟠 No message_id for channel {channel.id}, skipping message deletion.")
+        except discord.errors.NotFound:
+            await self.logger.info(f"🟠 Message {state.message_id} already deleted or not found.")
+        except Exception as e:
+            await self.logger.error(f"🔴 Unexpected error while deleting message: {e}")
+        finally:
+            if channel.id in guild.room_states:
+                del guild.room_states[channel.id]
+            try:
+                await self.rest.submit(Priority.CHANNEL, f"channel:{channel.id}", "delete_channel", channel.delete)
+            except discord.errors.NotFound:
+                await self.logger.info(f"🟠 Channel {channel.id} already deleted.")
+            except Exception as e:
+                await self.logger.error(f"🔴 Unexpected error while deleting channel: {e}")
+
+    async def _handle_before_channel(self, guild: GuildState, channel: discord.VoiceChannel, message_channel: discord.TextChannel) -> None:
         """Handles user leave events from a voice channel.
 
+        The caller must hold the lock of ``channel``.
+
         Args:
+            guild: The guild of the channel.
             channel: The voice channel the user left.
             message_channel: The text channel for messages.
         """
-        async with await self._get_channel_lock(channel.id):
-            if channel.id not in self.room_states:
-                await self.logger.info(f"🔴 No state found for channel {channel.id}.")
+        if channel.id not in guild.room_states:
+            await self.logger.info(f"🔴 No state found for channel {channel.id}.")
+            return
+        state = guild.room_states[channel.id]
+
+        if not channel.members:
+            if self.config.room_grace_period:
+                await self._vacate_room(guild, channel, state, message_channel)
+            else:
+                await self._delete_room(guild, channel, state, message_channel)
+        elif channel.category_id == guild.config.category_filled and len(channel.members) < channel.user_limit:
+            if not await self._release_filled(guild, channel, state, message_channel):
+                await self._schedule_update(guild, channel, state, message_channel)
+        else:
+            await self._schedule_update(guild, channel, state, message_channel)
+
+    async def _release_filled(self, guild: GuildState, channel: discord.VoiceChannel, state: RoomState, message_channel: discord.TextChannel) -> bool:
+        """Moves a filled room with a free slot back to the "find" category, after ``filled_hysteresis`` seconds if set.
+
+        Waiting means a room that loses and regains a member at its limit stays in the
+        "filled" category, without two category moves and a new listing.
+
+        The caller must hold the lock of ``channel``.
+
+        Args:
+            guild: The guild of the room.
+            channel: The room in the "filled" category.
+            state: Room state.
+            message_channel: Text channel for messages.
+
+        Returns:
+            bool: True if the move is deferred, False if the room was listed again right away.
+        """
+        if not self.config.filled_hysteresis:
+            await self._move_to_category(channel, guild.channels(self.bot, channel.guild).find)
+            await self._ensure_message_created(guild, channel, state, message_channel)
+            return False
+        key = ("unfill", channel.id)
+        if key not in self.timers:
+            self.timers.schedule(key, self.config.filled_hysteresis, lambda: self._release_filled_later(guild, channel, message_channel))
+        return True
+
+    async def _release_filled_later(self, guild: GuildState, channel: discord.VoiceChannel, message_channel: discord.TextChannel) -> None:
+        """Lists a room again whose free slot stayed open for ``filled_hysteresis`` seconds"""
+        async with self._acquire_channels(channel):
+            state = guild.room_states.get(channel.id)
+            if state is None or channel.category_id != guild.config.category_filled or not 0 < len(channel.members) < channel.user_limit:
+                return
+            await self._move_to_category(channel, guild.channels(self.bot, channel.guild).find)
+            await self._ensure_message_created(guild, channel, state, message_channel)
+            self.store.touch(guild.config.guild_id, channel.id)
+
+    async def _vacate_room(self, guild: GuildState, channel: discord.VoiceChannel, state: RoomState, message_channel: discord.TextChannel) -> None:
+        """Keeps an emptied room for ``room_grace_period`` seconds before deleting it.
+
+        Meanwhile a member reconnecting to it, its owner coming back through a lobby or
+        anyone joining a lobby of its size takes it over instead of a new room being created.
+        Its listing is taken down right away and posted again once the room is taken over.
+
+        The caller must hold the lock of ``channel``.
+
+        Args:
+            guild: The guild of the room.
+            channel: The empty room.
+            state: Room state.
+            message_channel: Text channel for messages.
+        """
+        self.edits.cancel(channel.id)
+        for purpose in ("unfill", "listing"):
+            self.timers.cancel((purpose, channel.id))
+        self._start_grace(guild, channel)
+        try:
+            if guild.board is not None:
+                self._schedule_board(guild, message_channel)
+            elif state.message_id is not None:
+                await self._delete_listing_message(state, message_channel)
+        except discord.errors.NotFound:
+            await self.logger.info(f"🟠 Message {state.message_id} already deleted.")
+        except Exception as e:
+            await self.logger.error(f"🔴 Unexpected error while deleting message: {e}")
+        state.message_id = None
+        state.value = 0
+
+    def _start_grace(self, guild: GuildState, channel: discord.VoiceChannel) -> None:
+        """Marks a room as vacant and schedules its deletion"""
+        guild.vacant.setdefault(channel.user_limit, {})[channel.id] = None
+        self.timers.schedule(("grace", channel.id), self.config.room_grace_period, lambda: self._expire_room(guild, channel))
+
+    def _occupy(self, guild: GuildState, channel: discord.VoiceChannel) -> bool:
+        """Takes a room out of the vacant rooms and stops its deletion.
+
+        Returns:
+            bool: True if the room was vacant.
+        """
+        vacant = guild.vacant.get(channel.user_limit)
+        if vacant is None or channel.id not in vacant:
+            return False
+        del vacant[channel.id]
+        self.timers.cancel(("grace", channel.id))
+        return True
+
+    @staticmethod
+    def _owner_id(guild: GuildState, channel_id: int) -> Optional[int]:
+        """Returns the owner of a room, or None if it has no state"""
+        state = guild.room_states.get(channel_id)
+        return state.owner_id if state else None
+
+    async def _expire_room(self, guild: GuildState, channel: discord.VoiceChannel) -> None:
+        """Deletes a vacant room nobody took over within ``room_grace_period`` seconds"""
+        message_channel = guild.channels(self.bot, channel.guild).listing
+        if not message_channel:
+            await self.logger.error(f"🔴 Text channel {guild.config.text_channel_id} not found.")
+            return
+        async with self._acquire_channels(channel):
+            state = guild.room_states.get(channel.id)
+            if state is None or channel.members or channel.id not in guild.vacant.get(channel.user_limit, {}):
                 return
-            state = self.room_states[channel.id]
+            registry.inc("rooms_expired_total")
+            await self._delete_room(guild, channel, state, message_channel)
+            self.store.touch(guild.config.guild_id, channel.id)
 
-            if channel.category_id == self.config.category_filled and len(channel.members) < channel.user_limit:
-                category = discord.utils.get(channel.guild.categories, id=self.config.category_find)
-                await channel.edit(category=category)
-                if channel.members:
-                    await self._ensure_message_created(channel, state, message_channel)
+    async def _claim_vacant_room(self, guild: GuildState, member: discord.Member, user_limit: int, owned_only: bool) -> Optional[discord.VoiceChannel]:
+        """Moves a member from a lobby into a vacant room of the lobby's size.
 
-            if not channel.members:
+        The member's own room is preferred. Another member's room is handed over with one
+        channel edit that gives the member the owner's permissions.
+
+        Args:
+            guild: The guild of the lobby.
+            member: The user who joined the lobby.
+            user_limit: User limit of the lobby.
+            owned_only: Only take a room the member owns.
+
+        Returns:
+            Optional[discord.VoiceChannel]: The room the member was moved into, or None.
+        """
+        vacant = guild.vacant.get(user_limit, {})
+        candidates = sorted(vacant, key=lambda channel_id: self._owner_id(guild, channel_id) != member.id)
+        for channel_id in candidates:
+            if owned_only and self._owner_id(guild, channel_id) != member.id:
+                break
+            channel = member.guild.get_channel(channel_id)
+            if not isinstance(channel, discord.VoiceChannel):
+                vacant.pop(channel_id, None)
+                continue
+            async with self._acquire_channels(channel):
+                # The room may have been rejoined, taken over or deleted while waiting for its lock
+                state = guild.room_states.get(channel.id)
+                if state is None:
+                    self._occupy(guild, channel)
+                    continue
+                if channel.members or not self._occupy(guild, channel):
+                    continue
+                reason = "reclaim" if state.owner_id == member.id else "reuse"
                 try:
-                    if state.message_id is not None:
-                        msg = await message_channel.fetch_message(state.message_id)
-                        await msg.delete()
-                    else:
-                        await self.logger.info(f"🟠 No message_id for channel {channel.id}, skipping message deletion.")
+                    if reason == "reuse":
+                        await self.rest.submit(Priority.CHANNEL, f"channel:{channel.id}", "edit_channel", lambda: channel.edit(
+                            overwrites={member: discord.PermissionOverwrite(**OWNER_PERMISSIONS)}
+                        ))
+                        state.owner_id = member.id
+                        self.store.touch(guild.config.guild_id, channel.id)
+                    moved = await CreateRoom.move_member(self.logger, self.rest, member, channel)
                 except discord.errors.NotFound:
-                    await self.logger.info(f"🟠 Message {state.message_id} already deleted or not found.")
+                    del guild.room_states[channel.id]
+                    guild.open_rooms.forget(channel.id)
+                    self.store.touch(guild.config.guild_id, channel.id)
+                    continue
                 except Exception as e:
-                    await self.logger.error(f"🔴 Unexpected error while deleting message: {e}")
-                finally:
-                    if channel.id in self.room_states:
-                        del self.room_states[channel.id]
-                    if channel.id in self._channel_locks:
-                        del self._channel_locks[channel.id]
-                    try:
-                        await channel.delete()
-                    except discord.errors.NotFound:
-                        await self.logger.info(f"🟠 Channel {channel.id} already deleted.")
-                    except Exception as e:
-                        await self.logger.error(f"🔴 Unexpected error while deleting channel: {e}")
+                    await self.logger.error(f"🔴 Error while handing over room {channel.id}: {e}")
+                    moved = False
+                if not moved:
+                    self._start_grace(guild, channel)
+                    return None
+                registry.inc("churn_avoided_total", reason=reason)
+                return channel
+        return None
+
+    async def _claim_pooled_room(self, guild: GuildState, member: discord.Member, user_limit: int) -> Optional[discord.VoiceChannel]:
+        """Hands a pre-created room to a member instead of creating a new one.
+
+        Args:
+            guild: The guild of the lobby.
+            member: The user who joined the lobby.
+            user_limit: User limit of the lobby.
+
+        Returns:
+            Optional[discord.VoiceChannel]: The claimed room, or None if the pool is disabled or empty.
+        """
+        if not guild.pool.enabled:
+            return None
+        room = await guild.pool.claim(user_limit, member, guild.channels(self.bot, member.guild).find)
+        if room is not None:
+            guild.room_states[room.id] = RoomState(owner_id=member.id, message_id=None, value=0, comment="")
+        return room
+
+    async def _create_room(self, guild: GuildState, member: discord.Member, user_limit: int, message_channel: discord.TextChannel) -> None:
+        """Gives a member who joined a lobby their own room, with its listing posted.
+
+        The room is created with the owner's permissions in a single request (or claimed
+        from the pool); then the member move and the listing run concurrently. The room is
+        locked until both finish, so the join event of the move sees the listing.
+
+        Args:
+            guild: The guild of the lobby.
+            member: The user who joined the lobby.
+            user_limit: User limit of the lobby.
+            message_channel: Text channel for messages.
+        """
+        started = time.perf_counter()
+        room = await self._claim_vacant_room(guild, member, user_limit, owned_only=True)
+        if room is None and self.config.matchmaking:
+            room = await self._match_room(guild, member, [user_limit])
+        if room is None:
+            room = await self._claim_vacant_room(guild, member, user_limit, owned_only=False)
+        if room is not None:
+            await self.logger.info(f"✅ Member {member.id} moved into existing room {room.id} in {(time.perf_counter() - started) * 1000:.0f} ms.")
+            return
+        room = await self._claim_pooled_room(guild, member, user_limit)
+        if room is None:
+            room = await CreateRoom.create_room(
+                self.logger, self.rest, guild.channels(self.bot, member.guild).find, guild.room_states, user_limit, member
+            )
+        if room is None:
+            return
+
+        async with self._acquire_channels(room):
+            state = guild.room_states[room.id]
+            if guild.board is not None:
+                listing = self._ensure_message_created(guild, room, state, message_channel)
             else:
-                try:
-                    if state.message_id is not None:
-                        msg = await message_channel.fetch_message(state.message_id)
-                        await Message.update_participants_message(self.logger, self.localization, channel, state, msg)
-                    else:
-                        await self._ensure_message_created(channel, state, message_channel)
-                except discord.errors.NotFound:
-                    await self._ensure_message_created(channel, state, message_channel)
-                except Exception as e:
-                    await self.logger.error(f"🔴 Unexpected error while updating message: {e}")
+                listing = Message.create_message(self.logger, self.rest, guild.localization, room, state, message_channel, participants=[member])
+            moved, _ = await asyncio.gather(CreateRoom.move_member(self.logger, self.rest, member, room), listing)
+            if moved and guild.board is None and state.message_id is None:
+                self._schedule_listing_retry(guild, room, message_channel, 0)
+            if moved:
+                registry.inc("rooms_created_total")
+                elapsed = time.perf_counter() - started
+                self.creation_latency.observe(elapsed)
+                await self.logger.info(f"✅ Room {room.id} ready in {elapsed * 1000:.0f} ms ({self.creation_latency}).")
+            else:
+                await self._delete_room(guild, room, state, message_channel)
+            self.store.touch(guild.config.guild_id, room.id)
 
-    async def _handle_after_channel(self, channel: discord.VoiceChannel, member: discord.Member, message_channel: discord.TextChannel) -> None:
+    async def _handle_after_channel(self, guild: GuildState, channel: discord.VoiceChannel, member: discord.Member, message_channel: discord.TextChannel) -> None:
         """Handles user join events in a voice channel.
 
+        The caller must hold the lock of ``channel`` if it is a managed room. Lobby
+        channels are not locked, so several rooms can be created from one lobby at once;
+        for a lobby the caller must hold no room lock, as the room the member ends up in
+        is locked here.
+
         Args:
+            guild: The guild of the channel.
             channel: The voice channel the user joined.
             member: The user who joined the channel.
             message_channel: The text channel for messages.
         """
-        channel_limits = {
-            self.config.voice_1: 2,
-            self.config.voice_2: 3,
-            self.config.voice_3: 4
-        }
+        lobbies = guild.config.lobbies
+        if channel.category_id == guild.config.category_create_room and channel.id in lobbies:
+            await self._create_room(guild, member, lobbies[channel.id], message_channel)
+        elif channel.category_id in guild.config.room_categories:
+            if channel.id in guild.room_states:
+                state = guild.room_states[channel.id]
+                if self._occupy(guild, channel):
+                    registry.inc("churn_avoided_total", reason="rejoin")
+                if channel.category_id == guild.config.category_filled:
+                    if len(channel.members) >= channel.user_limit:
+                        if self.timers.cancel(("unfill", channel.id)):
+                            registry.inc("churn_avoided_total", reason="hysteresis")
+                    elif not await self._release_filled(guild, channel, state, message_channel):
+                        await self._schedule_update(guild, channel, state, message_channel)
+                elif len(channel.members) >= channel.user_limit:
+                    self.edits.cancel(channel.id)
+                    try:
+                        if guild.board is not None:
+                            self._schedule_board(guild, message_channel)
+                        elif state.message_id is not None:
+                            await self._delete_listing_message(state, message_channel)
+                        else:
+                            await self.logger.info(f"🟠 No message_id for channel {channel.id}, skipping message deletion.")
+                    except discord.errors.NotFound:
+                        await self.logger.info(f"🟠 Message {state.message_id} already deleted.")
+                    except Exception as e:
+                        await self.logger.error(f"🔴 Unexpected error while deleting message: {e}")
+                    state.message_id = None
+                    category = guild.channels(self.bot, channel.guild).filled
+                    if category:
+                        await self._move_to_category(channel, category)
+                elif state.value == 0:
+                    await self._ensure_message_created(guild, channel, state, message_channel)
+                elif state.value == 1:
+                    await self._schedule_update(guild, channel, state, message_channel)
+
+    async def _reconcile(self, guild: GuildState, message_channel: discord.TextChannel) -> ReconcileReport:
+        """Rebuilds the room states from the rooms and listings that actually exist in the guild.
+
+        Both room categories and the last ``reconcile_history_limit`` messages of the listing
+        channel are scanned once. Listings are matched to rooms by their stored message ID or
+        by the members they mention. Empty rooms are deleted, live rooms without a state get
+        one rebuilt, each live room keeps at most one listing, and every other listing of the
+        bot is removed with bulk deletes.
+
+        Args:
+            guild: The guild to reconcile.
+            message_channel: Text channel for messages.
+
+        Returns:
+            ReconcileReport: What was found and fixed.
+        """
+        started = time.perf_counter()
+        report = ReconcileReport(restored=len(guild.room_states), restore_ms=self._restore_ms)
+
+        rooms: Dict[int, discord.VoiceChannel] = {}
+        for category_id in (guild.config.category_find, guild.config.category_filled):
+            category = message_channel.guild.get_channel(category_id)
+            if isinstance(category, discord.CategoryChannel):
+                rooms.update((channel.id, channel) for channel in category.voice_channels)
+        report.rooms_scanned = len(rooms)
+        member_rooms = {member.id: channel.id for channel in rooms.values() for member in channel.members}
+        message_rooms = {state.message_id: channel_id for channel_id, state in guild.room_states.items() if state.message_id is not None}
+
+        listings: Dict[int, List[discord.Message]] = {}
+        pages: List[discord.Message] = []
+        stale: List[Union[discord.Message, discord.PartialMessage]] = []
+        async for message in message_channel.history(limit=self.config.reconcile_history_limit):
+            report.messages_scanned += 1
+            if message.author.id != self.bot.user.id or not message.embeds:
+                continue
+            if guild.board is not None:
+                # The board pages are the bot's pinned messages; room listings of the other mode are stale
+                (pages if message.pinned else stale).append(message)
+                continue
+            channel_id = message_rooms.get(message.id) or next(
+                (member_rooms[user_id] for user_id in mentioned_user_ids(message) if user_id in member_rooms), None
+            )
+            if channel_id in rooms:
+                listings.setdefault(channel_id, []).append(message)
+            else:
+                stale.append(message)
+        scanned = {message.id for message in stale} | {message.id for messages in listings.values() for message in messages}
+        if guild.board is not None:
+            guild.board.adopt(pages)
+
+        for channel_id, state in list(guild.room_states.items()):
+            if channel_id not in rooms:
+                del guild.room_states[channel_id]
+                self.store.touch(guild.config.guild_id, channel_id)
+                report.states_dropped += 1
+                if state.message_id is not None and state.message_id not in scanned:
+                    stale.append(message_channel.get_partial_message(state.message_id))
+
+        async def reconcile_room(channel: discord.VoiceChannel) -> None:
+            async with self._acquire_channels(channel):
+                messages = listings.get(channel.id, [])
+                if not channel.members:
+                    stale.extend(messages)
+                    self.edits.cancel(channel.id)
+                    guild.room_states.pop(channel.id, None)
+                    self.store.touch(guild.config.guild_id, channel.id)
+                    try:
+                        await self.rest.submit(Priority.CHANNEL, f"channel:{channel.id}", "delete_channel", channel.delete)
+                        report.channels_deleted += 1
+                    except discord.errors.NotFound:
+                        pass
+                    return
+
+                state = guild.room_states.get(channel.id)
+                if state is None:
+                    state = guild.room_states[channel.id] = RoomState(owner_id=room_owner_id(channel), message_id=None, value=0, comment="")
+                    report.states_rebuilt += 1
+
+                # History is newest first, so without a stored ID the newest listing is kept
+                kept = None
+                if channel.category_id == guild.config.category_find and messages:
+                    kept = next((message for message in messages if message.id == state.message_id), messages[0])
+                    report.listings_adopted += 1
+                stale.extend(message for message in messages if message is not kept)
+                state.message_id = kept.id if kept else None
+                state.message = kept
+                state.value = 1 if kept else 0
+
+                if channel.category_id == guild.config.category_find or len(channel.members) < channel.user_limit:
+                    await self._handle_before_channel(guild, channel, message_channel)
+                self._index_room(guild, channel)
+                self._watch_idle(guild, channel)
+                self.store.touch(guild.config.guild_id, channel.id)
 
-        async with await self._get_channel_lock(channel.id):
-            if channel.category_id == self.config.category_create_room and channel.id in channel_limits:
-                await CreateRoom.create_room(self.logger, self.config.category_find, self.room_states, channel_limits[channel.id], member)
-                if channel.id in self.room_states:
-                    await self._ensure_message_created(channel, self.room_states[channel.id], message_channel)
-            elif channel.category_id in [self.config.category_filled, self.config.category_find]:
-                if channel.id in self.room_states:
-                    state = self.room_states[channel.id]
-                    if channel.category_id != self.config.category_filled and len(channel.members) == channel.user_limit:
-                        try:
-                            if state.message_id is not None:
-                                msg = await message_channel.fetch_message(state.message_id)
-                                await msg.delete()
-                            else:
-                                await self.logger.info(f"🟠 No message_id for channel {channel.id}, skipping message deletion.")
-                        except discord.errors.NotFound:
-                            await self.logger.info(f"🟠 Message {state.message_id} already deleted.")
-                        except Exception as e:
-                            await self.logger.error(f"🔴 Unexpected error while deleting message: {e}")
-                        category = discord.utils.get(channel.guild.categories, id=self.config.category_filled)
-                        if category:
-                            await channel.edit(category=category)
-                    elif state.value == 0:
-                        await self._ensure_message_created(channel, state, message_channel)
-                    elif state.value == 1:
-                        try:
-                            if state.message_id is not None:
-                                msg = await message_channel.fetch_message(state.message_id)
-                                await Message.update_participants_message(self.logger, self.localization, channel, state, msg)
-                            else:
-                                await self._ensure_message_created(channel, state, message_channel)
-                        except discord.errors.NotFound:
-                            await self._ensure_message_created(channel, state, message_channel)
-                        except Exception as e:
-                            await self.logger.error(f"🔴 Unexpected error while updating message: {e}")
+        results = await asyncio.gather(*(reconcile_room(channel) for channel in rooms.values()), return_exceptions=True)
+        for channel, result in zip(rooms.values(), results):
+            if isinstance(result, Exception):
+                await self.logger.error(f"🔴 Failed to reconcile room {channel.id}: {result}")
+
+        report.messages_deleted = await self._delete_messages(message_channel, stale)
+        if guild.board is not None:
+            self._schedule_board(guild, message_channel)
+        report.elapsed_ms = (time.perf_counter() - started) * 1000
+        return report
+
+    async def _delete_messages(self, message_channel: discord.TextChannel, messages: List[Union[discord.Message, discord.PartialMessage]]) -> int:
+        """Deletes messages from the listing channel, in bulk where Discord allows it.
+
+        Args:
+            message_channel: Text channel for messages.
+            messages: Messages to delete.
+
+        Returns:
+            int: Number of deleted messages.
+        """
+        chunks, old = split_for_bulk_delete(messages)
+        deleted = 0
+        for chunk in chunks:
+            try:
+                await self.rest.submit(Priority.DELETE_LISTING, f"messages:{message_channel.id}", "bulk_delete", lambda chunk=chunk: message_channel.delete_messages(chunk))
+                deleted += len(chunk)
+            except discord.errors.NotFound:
+                pass
+            except Exception as e:
+                await self.logger.error(f"🔴 Failed to bulk delete {len(chunk)} messages: {e}")
+        for message in old:
+            try:
+                await self.rest.submit(Priority.DELETE_LISTING, f"messages:{message_channel.id}", "delete_message", message.delete)
+                deleted += 1
+            except discord.errors.NotFound:
+                pass
+            except Exception as e:
+                await self.logger.error(f"🔴 Failed to delete message {message.id}: {e}")
+        return deleted
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        """Reconciles the room states of every guild once its cache is available"""
+        for guild in self.guilds.values():
+            # A new gateway session replaces the cached channel objects
+            guild.resolved.clear()
+        await asyncio.gather(*(self._start_guild(guild) for guild in self.guilds.values() if not guild.reconciled))
+
+    async def _start_guild(self, guild: GuildState) -> None:
+        """Reconciles one guild and starts its room pool.
+
+        Args:
+            guild: The guild to start.
+        """
+        guild_id = guild.config.guild_id
+        if guild_id != DEFAULT_GUILD and self.bot.get_guild(guild_id) is None:
+            return  # Served by another shard
+        guild.reconciled = True
+        waiting = False
+        while True:
+            try:
+                if await self.store.claim(guild_id):
+                    break
+            except Exception as e:
+                await self.logger.error(f"🔴 Failed to claim guild {guild_id}: {e}")
+            if not waiting:
+                await self.logger.info(f"🟠 Guild {guild_id} is served by another process, waiting for its lease.")
+                waiting = True
+            await asyncio.sleep(self.config.state_lease_ttl / 3)
+
+        message_channel = self.bot.get_channel(guild.config.text_channel_id)
+        if not message_channel:
+            await self.logger.error(f"🔴 Text channel {guild.config.text_channel_id} not found.")
+            return
+        guild.channels(self.bot, message_channel.guild)
+        try:
+            report = await asyncio.wait_for(self._reconcile(guild, message_channel), timeout=self.config.reconcile_timeout)
+            await self.logger.info(f"♻️ Reconciliation of guild {message_channel.guild.id} finished: {report}.")
+        except asyncio.TimeoutError:
+            await self.logger.error(f"🔴 Reconciliation of guild {message_channel.guild.id} did not finish within {self.config.reconcile_timeout} seconds.")
+        except Exception as e:
+            await self.logger.error(f"🔴 Error during reconciliation of guild {message_channel.guild.id}: {e}")
+
+        if guild.pool.enabled:
+            guild.pool.start(message_channel.guild)
+
+    def _lease_lost(self, guild_id: int) -> None:
+        """Forgets a guild this process no longer serves and waits to claim it again.
+
+        Its room states are dropped, since the process serving it now changes them; they
+        are read from the backend and reconciled once the lease is claimed again.
+
+        Args:
+            guild_id: ID the guild is configured under.
+        """
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            return
+        guild.pool.close()
+        for channel_id in guild.room_states:
+            self.edits.cancel(channel_id)
+            for purpose in ("idle", "listing", "unfill", "grace"):
+                self.timers.cancel((purpose, channel_id))
+        guild.room_states.clear()
+        guild.vacant.clear()
+        guild.open_rooms = FreeSlotIndex()
+        guild.reconciled = False
+        task = asyncio.create_task(self._start_guild(guild))
+        self._restarts.add(task)
+        task.add_done_callback(self._restarts.discard)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState) -> None:
         """Handler for voice state update events.
 
+        Only the rooms touched by the event are locked, so events in unrelated rooms are
+        handled concurrently. When one event touches two rooms, both locks are held and
+        the leave is always processed before the join. A lobby join is handled after the
+        locks are released, since the room it leads to is locked on its own.
+
         Args:
             member: The user whose voice state changed.
             before: The voice state before the change.
             after: The voice state after the change.
         """
-        message_channel = self.bot.get_channel(self.config.text_channel_id)
+        if self.recorder is not None:
+            guild = find_guild(self.guilds, member.guild.id)
+            if guild is not None:
+                self.recorder.voice(member.id, self._channel_ref(guild, before.channel), self._channel_ref(guild, after.channel))
+        if before.channel == after.channel:
+            # Mute, deafen, stream or video toggles do not change any room, only whether it is idle
+            registry.inc("events_skipped_total", reason="same_channel")
+            if self.config.room_idle_timeout and before.deaf + before.self_deaf != after.deaf + after.self_deaf:
+                guild = find_guild(self.guilds, member.guild.id)
+                if guild is not None and self.store.holds(guild.config.guild_id) and self._is_room(guild, after.channel):
+                    self._watch_idle(guild, after.channel)
+            return
+
+        guild = find_guild(self.guilds, member.guild.id)
+        if guild is None:
+            return
+        if not self.store.holds(guild.config.guild_id):
+            # Another process serves the guild; reconciliation catches up once the lease is claimed
+            registry.inc("events_skipped_total", reason="not_leased")
+            return
+        message_channel = guild.channels(self.bot, member.guild).listing
         if not message_channel:
-            await self.logger.error(f"🔴 Text channel {self.config.text_channel_id} not found.")
+            await self.logger.error(f"🔴 Text channel {guild.config.text_channel_id} not found.")
             return
 
-        async with self._lock:
+        before_room = before.channel if self._is_room(guild, before.channel) else None
+        after_room = after.channel if self._is_room(guild, after.channel) else None
+
+        registry.inc("events_total", event="voice_state")
+        started = time.perf_counter()
+        channel_id = (after.channel or before.channel).id
+        with registry.time("handler_seconds", event="voice_state"):
             try:
-                if before.channel and before.channel.category_id in [self.config.category_filled, self.config.category_find]:
-                    await self._handle_before_channel(before.channel, message_channel)
-                if after.channel:
-                    await self._handle_after_channel(after.channel, member, message_channel)
+                async with self._acquire_channels(before_room, after_room):
+                    try:
+                        if before_room:
+                            await self._handle_before_channel(guild, before_room, message_channel)
+                        if after_room:
+                            await self._handle_after_channel(guild, after_room, member, message_channel)
+                    finally:
+                        if after_room:
+                            guild.open_rooms.release(after_room.id, member.id)
+                        for room in (before_room, after_room):
+                            if room:
+                                self._index_room(guild, room)
+                                self._watch_idle(guild, room)
+                        self.store.touch(guild.config.guild_id, *(room.id for room in (before_room, after_room) if room))
+                # Lobby joins create, claim or match rooms, which take room locks of their own
+                if after.channel and not after_room:
+                    await self._handle_after_channel(guild, after.channel, member, message_channel)
             except Exception as e:
-                await self.logger.error(f"🔴 Error in voice state update: {e}")
+                await self.logger.error(
+                    f"🔴 Error in voice state update: {e}",
+                    event="voice_state", guild_id=member.guild.id, channel_id=channel_id, member_id=member.id
+                )
+        if self.logger.is_enabled(logging.DEBUG):
+            await self.logger.debug(
+                "⏱️ Voice state update handled", event="voice_state", guild_id=member.guild.id, channel_id=channel_id,
+                member_id=member.id, latency_ms=round((time.perf_counter() - started) * 1000, 3)
+            )
 
     @commands.Cog.listener()
     async def on_voice_channel_status_update(self, channel: discord.abc.GuildChannel, before: str, after: str) -> None:
@@ -190,25 +1117,107 @@ class Autoroomer(commands.Cog):
         if not isinstance(channel, discord.VoiceChannel):
             return
 
-        message_channel = self.bot.get_channel(self.config.text_channel_id)
+        guild = find_guild(self.guilds, channel.guild.id)
+        if guild is None:
+            return
+        if not self.store.holds(guild.config.guild_id):
+            registry.inc("events_skipped_total", reason="not_leased")
+            return
+        if self.recorder is not None:
+            self.recorder.status(self._channel_ref(guild, channel), after or "")
+        message_channel = guild.channels(self.bot, channel.guild).listing
         if not message_channel:
-            await self.logger.error(f"🔴 Text channel {self.config.text_channel_id} not found.")
+            await self.logger.error(f"🔴 Text channel {guild.config.text_channel_id} not found.")
             return
 
-        async with await self._get_channel_lock(channel.id):
-            try:
-                if channel.id in self.room_states and channel.category_id == self.config.category_find:
-                    state = self.room_states[channel.id]
-                    if state.message_id is None:
-                        await self._ensure_message_created(channel, state, message_channel)
-                    else:
-                        try:
-                            msg = await message_channel.fetch_message(state.message_id)
-                            state.comment = after or ""
-                            await Message.update_comment_message(self.logger, self.localization, state, msg)
-                        except discord.errors.NotFound:
-                            await self._ensure_message_created(channel, state, message_channel)
-                        except Exception as e:
-                            await self.logger.error(f"🔴 Unexpected error while updating comment message: {e}")
-            except Exception as e:
-                await self.logger.error(f"🔴 Error in voice channel status update: {e}")
\ No newline at end of file
+        registry.inc("events_total", event="channel_status")
+        started = time.perf_counter()
+        async with self._acquire_channels(channel):
+            with registry.time("handler_seconds", event="channel_status"):
+                try:
+                    if channel.id in guild.room_states and channel.category_id == guild.config.category_find:
+                        state = guild.room_states[channel.id]
+                        state.comment = after or ""
+                        if state.message_id is None:
+                            await self._ensure_message_created(guild, channel, state, message_channel)
+                        else:
+                            await self._schedule_update(guild, channel, state, message_channel)
+                        self.store.touch(guild.config.guild_id, channel.id)
+                except Exception as e:
+                    await self.logger.error(
+                        f"🔴 Error in voice channel status update: {e}",
+                        event="channel_status", guild_id=channel.guild.id, channel_id=channel.id
+                    )
+        if self.logger.is_enabled(logging.DEBUG):
+            await self.logger.debug(
+                "⏱️ Voice channel status update handled", event="channel_status", guild_id=channel.guild.id,
+                channel_id=channel.id, latency_ms=round((time.perf_counter() - started) * 1000, 3)
+            )
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        """Re-resolves the configured channels if one of them was created"""
+        self._invalidate_channels(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        """Re-resolves the configured channels if one of them was deleted"""
+        self._invalidate_channels(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel) -> None:
+        """Re-resolves the configured channels if one of them changed"""
+        self._invalidate_channels(after)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild) -> None:
+        """Re-resolves the configured channels of a guild that came back from an outage"""
+        state = find_guild(self.guilds, guild.id)
+        if state is not None:
+            state.invalidate(guild.id)
+
+    def _invalidate_channels(self, channel: discord.abc.GuildChannel) -> None:
+        """Drops the resolved channels of the channel's guild if the channel is one of the configured ones"""
+        guild = find_guild(self.guilds, channel.guild.id)
+        if guild is not None and channel.id in guild.channel_ids:
+            guild.invalidate(channel.guild.id)
+
+    @discord.slash_command(name="join", description="Join the fullest open room")
+    async def join(
+        self,
+        ctx: discord.ApplicationContext,
+        size: discord.Option(int, "Room size, any size if omitted", required=False, min_value=1) = None
+    ) -> None:
+        """Moves the member into the open room with the fewest free slots.
+
+        Args:
+            ctx: The context of the command.
+            size: User limit of the room; every lobby size of the guild if omitted.
+        """
+        guild = find_guild(self.guilds, ctx.guild.id) if ctx.guild else None
+        if guild is None:
+            await ctx.respond("❌ Rooms are not managed on this server.", ephemeral=True)
+            return
+        if not ctx.author.voice or not ctx.author.voice.channel:
+            await ctx.respond("❌ Join a voice channel first, then use this command again.", ephemeral=True)
+            return
+        await ctx.defer(ephemeral=True)
+        room = await self._match_room(guild, ctx.author, [size] if size else guild.config.sizes)
+        if room is None:
+            await ctx.respond("❌ No open room right now, join a lobby to create one.", ephemeral=True)
+        else:
+            await ctx.respond(f"✅ Moved you into {room.mention}.", ephemeral=True)
+
+    @discord.slash_command(name="reload_locale", description="Reload the localization file without restarting the bot")
+    @discord.default_permissions(administrator=True)
+    async def reload_locale(self, ctx: discord.ApplicationContext) -> None:
+        """Reloads the localization files; listings show the new texts from their next update on.
+
+        Args:
+            ctx: The context of the command.
+        """
+        invalid = await self.localization.reload()
+        if not invalid:
+            await ctx.respond("✅ Reloaded the localization files.", ephemeral=True)
+        else:
+            await ctx.respond(f"❌ {', '.join(invalid)} invalid, the previous translations are still in use.", ephemeral=True)
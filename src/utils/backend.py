@@ -0,0 +1,254 @@
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class BackendError(Exception):
+    """Raised when the shared state backend rejects a command or cannot be reached"""
+
+
+# Writes to one hash: (key, fields to set, fields to delete)
+HashWrite = Tuple[str, Dict[str, str], List[str]]
+
+
+class StateBackend(ABC):
+    """Shared key-value store holding the room states and guild leases of every bot process.
+
+    Room states live in one hash per guild; a lease is a key with an owner and an expiry,
+    held by the process currently serving the guild.
+    """
+
+    async def connect(self) -> None:
+        """Opens the connection"""
+
+    async def close(self) -> None:
+        """Closes the connection"""
+
+    @abstractmethod
+    async def read_hash(self, key: str) -> Dict[str, str]:
+        """Returns all fields of a hash"""
+
+    @abstractmethod
+    async def write_hashes(self, writes: Sequence[HashWrite]) -> None:
+        """Applies field updates and deletions to several hashes in one round trip"""
+
+    @abstractmethod
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Takes or renews a lease.
+
+        Args:
+            key: Key of the lease.
+            owner: Identifier of the calling process.
+            ttl: Seconds until the lease expires unless renewed.
+
+        Returns:
+            bool: True if ``owner`` holds the lease now.
+        """
+
+    @abstractmethod
+    async def release(self, key: str, owner: str) -> None:
+        """Gives up a lease if ``owner`` holds it"""
+
+
+class MemoryBackend(StateBackend):
+    __slots__ = ('hashes', 'leases')
+
+    def __init__(self):
+        """Backend kept in the memory of one process, for single-process runs and tests"""
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.leases: Dict[str, Tuple[str, float]] = {}
+
+    async def read_hash(self, key: str) -> Dict[str, str]:
+        return dict(self.hashes.get(key, {}))
+
+    async def write_hashes(self, writes: Sequence[HashWrite]) -> None:
+        for key, updates, deletes in writes:
+            fields = self.hashes.setdefault(key, {})
+            fields.update(updates)
+            for field in deletes:
+                fields.pop(field, None)
+            if not fields:
+                del self.hashes[key]
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.monotonic()
+        holder = self.leases.get(key)
+        if holder is not None and holder[0] != owner and holder[1] > now:
+            return False
+        self.leases[key] = (owner, now + ttl)
+        return True
+
+    async def release(self, key: str, owner: str) -> None:
+        holder = self.leases.get(key)
+        if holder is not None and holder[0] == owner:
+            del self.leases[key]
+
+
+# Lease scripts run on the server, so checking the holder and changing the key is one atomic step
+ACQUIRE_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder == false then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+if holder == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBackend(StateBackend):
+    __slots__ = ('host', 'port', 'db', 'password', '_reader', '_writer', '_lock')
+
+    def __init__(self, url: str):
+        """Backend on a Redis-compatible server, spoken to over RESP without extra dependencies.
+
+        Args:
+            url: Server address as ``redis://[:password@]host[:port][/db]``.
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        async with self._lock:
+            if self._writer is None:
+                await self._connect()
+
+    async def close(self) -> None:
+        self._reset()
+
+    async def execute(self, *commands: Sequence[Any]) -> List[Any]:
+        """Sends commands as one pipeline and returns their replies in order.
+
+        A connection that failed or was abandoned halfway through a pipeline is dropped,
+        since replies still in flight would be read as answers to the next commands;
+        the next call opens a new one.
+
+        Raises:
+            BackendError: If the server cannot be reached or answers a command with an error.
+        """
+        async with self._lock:
+            if self._writer is None:
+                await self._connect()
+            replies = await self._send(commands)
+        for reply in replies:
+            if isinstance(reply, BackendError):
+                raise reply
+        return replies
+
+    async def _connect(self) -> None:
+        """Opens the connection and selects the database; called with ``_lock`` held"""
+        try:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as e:
+            raise BackendError(f"Cannot reach the state backend at {self.host}:{self.port}: {e}") from e
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            for reply in await self._send(setup):
+                if isinstance(reply, BackendError):
+                    self._reset()
+                    raise reply
+
+    async def _send(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """Writes a pipeline and reads its replies; called with ``_lock`` held"""
+        try:
+            self._writer.write(b"".join(_encode(command) for command in commands))
+            await self._writer.drain()
+            return [await _read_reply(self._reader) for _ in commands]
+        except (OSError, asyncio.IncompleteReadError) as e:
+            self._reset()
+            raise BackendError(f"Lost the connection to the state backend: {e}") from e
+        except BaseException:
+            self._reset()
+            raise
+
+    def _reset(self) -> None:
+        if self._writer:
+            self._writer.close()
+        self._writer = None
+        self._reader = None
+
+    async def read_hash(self, key: str) -> Dict[str, str]:
+        (flat,) = await self.execute(("HGETALL", key))
+        return {flat[i]: flat[i + 1] for i in range(0, len(flat), 2)}
+
+    async def write_hashes(self, writes: Sequence[HashWrite]) -> None:
+        commands = []
+        for key, updates, deletes in writes:
+            if updates:
+                commands.append(("HSET", key, *(item for pair in updates.items() for item in pair)))
+            if deletes:
+                commands.append(("HDEL", key, *deletes))
+        if commands:
+            await self.execute(*commands)
+
+    async def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        (held,) = await self.execute(("EVAL", ACQUIRE_SCRIPT, 1, key, owner, max(1, int(ttl * 1000))))
+        return held == 1
+
+    async def release(self, key: str, owner: str) -> None:
+        await self.execute(("EVAL", RELEASE_SCRIPT, 1, key, owner))
+
+
+def create_backend(url: str) -> StateBackend:
+    """Creates the backend named by ``STATE_BACKEND``: ``memory`` or a ``redis://`` URL"""
+    if url == "memory":
+        return MemoryBackend()
+    if url.startswith("redis://"):
+        return RedisBackend(url)
+    raise ValueError(f"❌ Unknown state backend {url!r}, expected 'sqlite', 'memory' or a redis:// URL")
+
+
+def _encode(command: Sequence[Any]) -> bytes:
+    """Encodes one command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(command)]
+    for argument in command:
+        data = argument if isinstance(argument, bytes) else str(argument).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    """Reads one RESP reply; errors are returned as BackendError instances"""
+    line = await reader.readline()
+    if not line:
+        raise BackendError("The state backend closed the connection")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return BackendError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode()
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise BackendError(f"Unexpected reply from the state backend: {line!r}")
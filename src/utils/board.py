@@ -0,0 +1,138 @@
+import discord
+from typing import Iterable, List, Optional, Tuple, Union
+from .localization import BoardTemplate
+from .metrics import registry
+from .rest import Priority, RestScheduler
+
+# Characters of one page, below Discord's limit of 4096 for an embed description
+PAGE_CHARS = 4000
+
+# One open room on the board: (user limit, channel ID, connected members, comment)
+BoardRoom = Tuple[int, int, int, str]
+
+
+def paginate(template: BoardTemplate, rooms: Iterable[BoardRoom], page_chars: int = PAGE_CHARS) -> List[str]:
+    """Renders the open rooms grouped by size and splits them into pages.
+
+    Rooms are ordered by size and then by creation (channel ID). A size group that
+    continues on the next page repeats its heading there.
+
+    Args:
+        template: Compiled board template.
+        rooms: The open rooms.
+        page_chars: Maximum length of one page.
+
+    Returns:
+        List[str]: The text of each page; a single page with the empty text if there are no rooms.
+    """
+    pages: List[str] = []
+    lines: List[str] = []
+    length = 0
+    current_size = None
+    for size, channel_id, members, comment in sorted(rooms):
+        line = template.room(channel_id, members, size, comment)
+        if size != current_size:
+            line = f"{template.heading(size)}\n{line}"
+            if lines:
+                line = f"\n{line}"
+        if lines and length + len(line) + 1 > page_chars:
+            pages.append("\n".join(lines))
+            lines, length = [], 0
+            line = f"{template.heading(size)}\n{line}" if size == current_size else line.removeprefix("\n")
+        lines.append(line)
+        length += len(line) + 1
+        current_size = size
+    if lines or not pages:
+        pages.append("\n".join(lines) or template.empty)
+    return pages
+
+
+class Board:
+    __slots__ = ('logger', 'rest', 'pages', 'fingerprints')
+
+    def __init__(self, logger, rest: RestScheduler):
+        """The pinned messages listing every open room of a guild, edited page by page.
+
+        Each page remembers a fingerprint of its last sent content, so a refresh only
+        edits the pages whose rooms changed, sends pages that are new and deletes pages
+        that are no longer needed.
+
+        Args:
+            logger: Logger for recording events and errors.
+            rest: Scheduler for outbound Discord requests.
+        """
+        self.logger = logger
+        self.rest = rest
+        self.pages: List[Union[discord.Message, discord.PartialMessage]] = []
+        self.fingerprints: List[Optional[int]] = []
+
+    def adopt(self, messages: Iterable[discord.Message]) -> None:
+        """Takes over the board pages found in the listing channel, e.g. after a restart.
+
+        Args:
+            messages: The pinned board messages of the bot.
+        """
+        self.pages = sorted(messages, key=lambda message: message.id)
+        self.fingerprints = [
+            self._fingerprint(message.embeds[0].description or "", message.embeds[0].footer.text or "") if message.embeds else None
+            for message in self.pages
+        ]
+
+    async def refresh(self, template: BoardTemplate, rooms: Iterable[BoardRoom], channel: discord.TextChannel) -> None:
+        """Brings the pages in line with the open rooms.
+
+        Args:
+            template: Compiled board template.
+            rooms: The open rooms.
+            channel: The listing channel.
+        """
+        texts = paginate(template, rooms)
+        stale: List[Union[discord.Message, discord.PartialMessage]] = []
+        for index, text in enumerate(texts):
+            footer = template.footer(index + 1, len(texts))
+            fingerprint = self._fingerprint(text, footer)
+            if index < len(self.pages):
+                if self.fingerprints[index] == fingerprint:
+                    registry.inc("edits_skipped_total", reason="unchanged")
+                    continue
+                page = self.pages[index]
+                embed = template.build(text, index + 1, len(texts))
+                try:
+                    edited = await self.rest.submit(
+                        Priority.EDIT_LISTING, f"messages:{channel.id}", "edit_message", lambda: page.edit(embed=embed), merge_key=page.id
+                    )
+                except discord.errors.NotFound:
+                    # Pages must stay in order, so every page from the missing one on is sent again
+                    stale.extend(self.pages[index + 1:])
+                    del self.pages[index:], self.fingerprints[index:]
+                else:
+                    registry.inc("board_pages_edited_total")
+                    if edited is not None:
+                        self.pages[index] = edited
+                    self.fingerprints[index] = fingerprint if edited is not None else None
+                    continue
+            await self._send(template, text, index + 1, len(texts), fingerprint, channel)
+        stale.extend(self.pages[len(texts):])
+        del self.pages[len(texts):], self.fingerprints[len(texts):]
+        for page in stale:
+            try:
+                await self.rest.submit(Priority.DELETE_LISTING, f"messages:{channel.id}", "delete_message", page.delete)
+            except discord.errors.NotFound:
+                pass
+
+    async def _send(self, template: BoardTemplate, text: str, page: int, pages: int, fingerprint: int, channel: discord.TextChannel) -> None:
+        """Sends a new page at the end of the board and pins it"""
+        embed = template.build(text, page, pages)
+        message = await self.rest.submit(Priority.EDIT_LISTING, f"messages:{channel.id}", "send_message", lambda: channel.send(embed=embed))
+        registry.inc("board_pages_sent_total")
+        self.pages.append(message)
+        self.fingerprints.append(fingerprint)
+        try:
+            await self.rest.submit(Priority.EDIT_LISTING, f"messages:{channel.id}", "pin_message", message.pin)
+        except discord.errors.Forbidden:
+            await self.logger.error(f"❌ Missing permissions to pin board page {message.id} in channel {channel.id}.")
+
+    @staticmethod
+    def _fingerprint(text: str, footer: str) -> int:
+        """Returns a compact fingerprint of the content of a page"""
+        return hash((text, footer))
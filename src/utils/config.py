@@ -1,19 +1,58 @@
 import os
+import logging
 from dotenv import load_dotenv
+from .guilds import LISTING_MODES, load_guild_configs
+from .gateway import PROFILES
 
 
 class Config:    
     def __init__(self):
         load_dotenv()
         self.token = os.getenv("DISCORD_TOKEN")
-        self.text_channel_id = int(os.getenv("TEXT_CHANNEL_ID"))
-        self.voice_1 = int(os.getenv("VOICE_1"))
-        self.voice_2 = int(os.getenv("VOICE_2"))
-        self.voice_3 = int(os.getenv("VOICE_3"))
-        self.category_create_room = int(os.getenv("CATEGORY_CREATE_ROOM"))
-        self.category_find = int(os.getenv("CATEGORY_FIND"))
-        self.category_filled = int(os.getenv("CATEGORY_FILLED"))
+        self.text_channel_id = int(os.getenv("TEXT_CHANNEL_ID") or 0)
+        self.voice_1 = int(os.getenv("VOICE_1") or 0)
+        self.voice_2 = int(os.getenv("VOICE_2") or 0)
+        self.voice_3 = int(os.getenv("VOICE_3") or 0)
+        self.category_create_room = int(os.getenv("CATEGORY_CREATE_ROOM") or 0)
+        self.category_find = int(os.getenv("CATEGORY_FIND") or 0)
+        self.category_filled = int(os.getenv("CATEGORY_FILLED") or 0)
         self.lang = os.getenv("LANG")
+        self.guilds_file = os.getenv("GUILDS_FILE")
+        self.guilds = []
+        self.locale_reload_interval = float(os.getenv("LOCALE_RELOAD_INTERVAL", "0"))
+        self.edit_flush_window = float(os.getenv("EDIT_FLUSH_WINDOW", "0"))
+        self.listing_mode = os.getenv("LISTING_MODE") or "messages"
+        self.board_refresh_interval = float(os.getenv("BOARD_REFRESH_INTERVAL", "2.0"))
+        self.matchmaking = os.getenv("MATCHMAKING", "false").lower() in ("1", "true", "yes")
+        self.voice_record_file = os.getenv("VOICE_RECORD_FILE")
+        self.room_idle_timeout = float(os.getenv("ROOM_IDLE_TIMEOUT", "0"))
+        self.listing_retry_delay = float(os.getenv("LISTING_RETRY_DELAY", "5"))
+        self.listing_retry_attempts = int(os.getenv("LISTING_RETRY_ATTEMPTS", "5"))
+        self.room_grace_period = float(os.getenv("ROOM_GRACE_PERIOD", "0"))
+        self.filled_hysteresis = float(os.getenv("FILLED_HYSTERESIS", "0"))
+        self.state_db = os.getenv("STATE_DB", "data/rooms.db")
+        self.state_flush_interval = float(os.getenv("STATE_FLUSH_INTERVAL", "1.0"))
+        self.state_backend = os.getenv("STATE_BACKEND") or "sqlite"
+        self.state_lease_ttl = float(os.getenv("STATE_LEASE_TTL", "15"))
+        self.shard_count = int(os.getenv("SHARD_COUNT") or 0)
+        self.workers = int(os.getenv("WORKERS") or 1)
+        self.intents_profile = os.getenv("INTENTS_PROFILE") or "full"
+        self.reconcile_history_limit = int(os.getenv("RECONCILE_HISTORY_LIMIT", "500"))
+        self.reconcile_timeout = float(os.getenv("RECONCILE_TIMEOUT", "60"))
+        self.pool_min_size = int(os.getenv("POOL_MIN_SIZE", "0"))
+        self.pool_max_size = int(os.getenv("POOL_MAX_SIZE", "0"))
+        self.pool_horizon = float(os.getenv("POOL_HORIZON", "30"))
+        self.metrics_host = os.getenv("METRICS_HOST", "127.0.0.1")
+        self.metrics_port = int(os.getenv("METRICS_PORT") or 0)
+        self.log_level = os.getenv("LOG_LEVEL") or "INFO"
+        self.log_levels = dict(
+            entry.strip().split("=", 1) for entry in (os.getenv("LOG_LEVELS") or "").split(",") if "=" in entry
+        )
+        self.log_buffer_size = int(os.getenv("LOG_BUFFER_SIZE") or 10000)
+        self.log_file = os.getenv("LOG_FILE")
+        self.log_json_file = os.getenv("LOG_JSON_FILE")
+        self.log_max_bytes = int(os.getenv("LOG_MAX_BYTES") or 10485760)
+        self.log_backup_count = int(os.getenv("LOG_BACKUP_COUNT") or 5)
         self.logger = None
         
     async def initialize(self, logger):
@@ -24,4 +63,23 @@ class Config:
         if not self.lang.endswith('.json'):
             await self.logger.error("❌ LANG must reference a .json file (e.g., 'en' for 'en.json')")
             raise ValueError("❌ LANG must reference a .json file")
+        for level in (self.log_level, *self.log_levels.values()):
+            if level.upper() not in logging.getLevelNamesMapping():
+                await self.logger.error(f"❌ Unknown log level {level} in LOG_LEVEL or LOG_LEVELS")
+                raise ValueError("❌ Unknown log level")
+        if self.intents_profile not in PROFILES:
+            await self.logger.error(f"❌ INTENTS_PROFILE must be one of {', '.join(PROFILES)}")
+            raise ValueError("❌ Unknown INTENTS_PROFILE")
+        try:
+            self.guilds = load_guild_configs(self)
+        except ValueError as e:
+            await self.logger.error(str(e))
+            raise
+        for guild in self.guilds:
+            if guild.listing_mode not in LISTING_MODES:
+                await self.logger.error(f"❌ Guild {guild.guild_id or 'from .env'} has an unknown listing mode {guild.listing_mode}")
+                raise ValueError("❌ LISTING_MODE must be 'messages' or 'board'")
+            if not all([guild.text_channel_id, guild.category_create_room, guild.category_find, guild.category_filled]):
+                await self.logger.error(f"❌ Guild {guild.guild_id or 'from .env'} is missing its text channel or category IDs")
+                raise ValueError("❌ Text channel and category IDs are required for every guild")
         await self.logger.info("✅ Configuration loaded successfully")
\ No newline at end of file
@@ -0,0 +1,73 @@
+import asyncio
+from .metrics import registry
+from typing import Awaitable, Callable, Dict
+
+
+class EditScheduler:
+    __slots__ = ('window', 'logger', '_pending', '_tasks')
+
+    def __init__(self, window: float, logger):
+        """Collapses bursts of listing edits into one edit per room.
+
+        Args:
+            window: Flush window in seconds.
+            logger: Logger for recording events and errors.
+        """
+        self.window = window
+        self.logger = logger
+        self._pending: Dict[int, Callable[[], Awaitable[None]]] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def schedule(self, key: int, flush: Callable[[], Awaitable[None]]) -> None:
+        """Schedules an edit for a room, replacing any edit still waiting in the window.
+
+        The flush callback should render the room's state at the moment it runs, so the
+        single edit sent at the end of the window reflects every change made during it.
+
+        Args:
+            key: ID of the room (voice channel).
+            flush: Coroutine function that performs the edit.
+        """
+        if key in self._pending:
+            registry.inc("edits_skipped_total", reason="debounced")
+        self._pending[key] = flush
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._flush_later(key))
+
+    def cancel(self, key: int) -> None:
+        """Drops the pending edit of a room, e.g. because its listing is being deleted.
+
+        Args:
+            key: ID of the room (voice channel).
+        """
+        self._pending.pop(key, None)
+        task = self._tasks.pop(key, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
+    def close(self) -> None:
+        """Cancels all pending edits"""
+        for key in list(self._tasks):
+            self.cancel(key)
+
+    async def _flush_later(self, key: int) -> None:
+        """Waits for the flush window to pass and sends the latest edit of the room.
+
+        Args:
+            key: ID of the room (voice channel).
+        """
+        try:
+            await asyncio.sleep(self.window)
+            flush = self._pending.pop(key, None)
+            if flush is not None:
+                await flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            await self.logger.error(f"🔴 Error while flushing edit for channel {key}: {e}")
+        finally:
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+                if key in self._pending:
+                    # An edit was scheduled while this one was being sent
+                    self._tasks[key] = asyncio.create_task(self._flush_later(key))
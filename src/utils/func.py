@@ -1,8 +1,13 @@
 import discord
 from ..utils import views
-from typing import Dict, Optional, List
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from ..utils.rest import Priority, RestScheduler
+from ..utils.metrics import registry
+from ..utils.localization import EmbedTemplate
+from typing import Dict, Optional, List, Union
+from dataclasses import dataclass, field
+
+# Permissions granted to the member who owns a room
+OWNER_PERMISSIONS = {"connect": True, "mute_members": True, "move_members": True}
 
 
 @dataclass(slots=True)
@@ -11,22 +16,30 @@ class RoomState:
     message_id: Optional[int]
     value: int
     comment: str
+    message: Optional[Union[discord.Message, discord.PartialMessage]] = field(default=None, repr=False, compare=False)
+    invite: Optional[discord.Invite] = field(default=None, repr=False, compare=False)
+    fingerprint: Optional[int] = field(default=None, repr=False, compare=False)
 
 
 class CreateRoom:
     @staticmethod
     async def create_room(
         logger,
-        category_id: int,
+        rest: RestScheduler,
+        category: Optional[discord.CategoryChannel],
         room_states: Dict[int, RoomState],
         user_limit: int,
         member: discord.Member
-    ) -> None:
-        """Creates a voice channel and initializes its state.
+    ) -> Optional[discord.VoiceChannel]:
+        """Creates a voice channel owned by the member and initializes its state.
+
+        The owner's permissions are part of the creation request; moving the member is
+        left to the caller so it can overlap with posting the listing.
 
         Args:
             logger: Logger for recording events and errors.
-            category_id: ID of the category where the channel will be created.
+            rest: Scheduler for outbound Discord requests.
+            category: Category where the channel will be created.
             room_states: Dictionary of room states.
             user_limit: User limit for the channel.
             member: The user initiating the channel creation.
@@ -35,173 +48,227 @@ class CreateRoom:
             Optional[discord.VoiceChannel]: The created voice channel, or None if an error occurs.
         """
         try:
-            voice_channel = await member.guild.create_voice_channel(
+            guild = member.guild
+            voice_channel = await rest.submit(Priority.CHANNEL, f"channels:{guild.id}", "create_channel", lambda: guild.create_voice_channel(
                 name=f"Room_{user_limit}",
-                category=discord.utils.get(member.guild.categories, id=category_id),
-                user_limit=user_limit
-            )
+                category=category,
+                user_limit=user_limit,
+                overwrites={member: discord.PermissionOverwrite(**OWNER_PERMISSIONS)}
+            ))
             room_states[voice_channel.id] = RoomState(
                 owner_id=member.id,
                 message_id=None,
                 value=0,
                 comment=""
             )
-            await voice_channel.set_permissions(member, connect=True, mute_members=True, move_members=True)
-            await member.move_to(voice_channel)
+            return voice_channel
         except discord.errors.Forbidden:
             await logger.error(f"❌ Missing permissions to create channel in guild {member.guild.id}.")
         except Exception as e:
             await logger.error(f"❌ Error while creating the room: {e}")
+        return None
+
+    @staticmethod
+    async def move_member(
+        logger,
+        rest: RestScheduler,
+        member: discord.Member,
+        channel: discord.VoiceChannel
+    ) -> bool:
+        """Moves a member into their room.
+
+        Args:
+            logger: Logger for recording events and errors.
+            rest: Scheduler for outbound Discord requests.
+            member: The owner of the room.
+            channel: The room.
+
+        Returns:
+            bool: True if the member was moved.
+        """
+        try:
+            await rest.submit(Priority.MOVE_MEMBER, f"members:{member.guild.id}", "move_member", lambda: member.move_to(channel))
+            return True
+        except discord.errors.Forbidden:
+            await logger.error(f"❌ Missing permissions to move member {member.id}.")
+        except Exception as e:
+            await logger.error(f"❌ Error while moving member {member.id} into room {channel.id}: {e}")
+        return False
 
 
 class Message:
     @staticmethod
     async def create_message(
         logger,
+        rest: RestScheduler,
         localization,
         channel: discord.VoiceChannel,
         state: RoomState,
-        active_channel: discord.TextChannel
+        active_channel: discord.TextChannel,
+        participants: Optional[List[discord.Member]] = None
     ) -> None:
         """Creates an informational message about the voice channel.
 
+        The room's invite is created once and reused by every later listing of the room.
+
         Args:
             logger: Logger for recording events and errors.
+            rest: Scheduler for outbound Discord requests.
             localization: Localization object for texts.
             channel: The voice channel the message is about.
             state: The state of the room.
             active_channel: The text channel where the message will be sent.
+            participants: Members to list, if they differ from the channel's current members
+                (e.g. the owner while being moved in).
 
         Returns:
             Optional[discord.Message]: The created message, or None if an error occurs.
         """
         try:
-            embed_data = localization.get_text("embeds.create_message")
+            template = localization.embed("create_message")
             state.value = 1
-            embed = await Message._build_embed(embed_data, channel, state, channel.members)
-            invite = await channel.create_invite()
-            message = await active_channel.send(embed=embed, view=views.CreateInviteURL(invite))
+            with registry.time("embed_build_seconds"):
+                participant_field = template.participants(
+                    state.owner_id, [member.id for member in (channel.members if participants is None else participants)], channel.user_limit
+                )
+                comment_field = template.comment(state.comment)
+                embed = template.build(participant_field, comment_field)
+            if state.invite is None:
+                state.invite = await rest.submit(Priority.CHANNEL, f"channel:{channel.id}", "create_invite", channel.create_invite)
+            invite = state.invite
+            message = await rest.submit(Priority.EDIT_LISTING, f"messages:{active_channel.id}", "send_message", lambda: active_channel.send(
+                embed=embed, view=views.CreateInviteURL(invite)
+            ))
+            registry.inc("listings_sent_total")
             state.message_id = message.id
+            state.message = message
+            state.fingerprint = Message._fingerprint(participant_field, comment_field)
         except discord.errors.Forbidden:
             await logger.error(f"❌ Missing permissions to send message in channel {active_channel.id}.")
         except Exception as e:
             await logger.error(f"❌ Error while creating the message: {e}")
 
     @staticmethod
-    async def update_comment_message(
+    async def update_message(
         logger,
+        rest: RestScheduler,
         localization,
+        channel: discord.VoiceChannel,
         state: RoomState,
-        message: discord.Message
+        message: Union[discord.Message, discord.PartialMessage]
     ) -> None:
-        """Updates the comment in the informational message of the voice channel.
+        """Updates the participant list and the comment in the informational message of the voice channel.
+
+        Both fields are rendered from the current state, so a single call covers any
+        number of participant and comment changes made since the last edit. If the
+        rendered fields match the fingerprint of the last listing sent for the room, the
+        edit is skipped.
 
         Args:
             logger: Logger for recording events and errors.
+            rest: Scheduler for outbound Discord requests.
             localization: Localization object for texts.
+            channel: The voice channel.
             state: The state of the room.
             message: The message to update.
+
+        Raises:
+            discord.errors.NotFound: If the message no longer exists.
         """
         try:
-            # embed = message.embeds[0] if message.embeds else None
-            # if not embed:
-            #     await logger.error("❌ No embed found in the message to update")
-            #     return
-            
-            embed = message.embeds[0]
-            embed_data = localization.get_text("embeds.create_message")
-            embed.set_field_at(index=1, name="", value=embed_data["fields"][1]["value"].format(comment=state.comment), inline=False)
-            await message.edit(embed=embed)
+            template = localization.embed("create_message")
+            with registry.time("embed_build_seconds"):
+                participants = template.participants(state.owner_id, [member.id for member in channel.members], channel.user_limit)
+                comment = template.comment(state.comment)
+                fingerprint = Message._fingerprint(participants, comment)
+                if fingerprint == state.fingerprint:
+                    registry.inc("edits_skipped_total", reason="unchanged")
+                    return
+                embed = Message._current_embed(template, message, participants, comment)
+            # Set before the edit is queued, so identical updates arriving meanwhile are skipped too
+            state.fingerprint = fingerprint
+            await Message._edit(rest, state, message, embed)
+        except discord.errors.NotFound:
+            raise
         except discord.errors.Forbidden:
             await logger.error(f"❌ Missing permissions to edit message {message.id}.")
         except Exception as e:
-            await logger.error(f"❌ Error updating comment: {e}")
-
+            await logger.error(f"❌ Error updating message: {e}")
 
     @staticmethod
-    async def update_participants_message(
-        logger,
-        localization,
-        channel: discord.VoiceChannel,
-        state: RoomState,
-        message: discord.Message
-    ) -> None:
-        """Updates the list of participants in the informational message of the voice channel.
+    def _fingerprint(participants: str, comment: str) -> int:
+        """Returns a compact fingerprint of the fields of a listing that change over time.
 
         Args:
-            logger: Logger for recording events and errors.
-            localization: Localization object for texts.
-            channel: The voice channel.
-            state: The state of the room.
-            message: The message to update.
+            participants: Rendered participant list.
+            comment: Rendered comment.
+
+        Returns:
+            int: Hash of both fields.
         """
-        try:
-            embed = message.embeds[0]
-            embed_data = localization.get_text("embeds.create_message")
-            participants = channel.members
-            output = Message._build_participant_list(embed_data, channel, state, participants)
-            embed.set_field_at(index=0, name="", value="\n".join(output), inline=False)
-            await message.edit(embed=embed)
-        except discord.errors.Forbidden:
-            await logger.error(f"❌ Missing permissions to edit message {message.id}.")
-        except Exception as e:
-            await logger.error(f"❌ Error updating message: {e}")
+        return hash((participants, comment))
 
     @staticmethod
-    async def _build_embed(
-        embed_data: dict,
-        channel: discord.VoiceChannel,
-        state: RoomState,
-        participants: List[discord.Member]
+    def _current_embed(
+        template: EmbedTemplate,
+        message: Union[discord.Message, discord.PartialMessage],
+        participants: str,
+        comment: str
     ) -> discord.Embed:
-        """Creates an embed for the informational message.
+        """Returns the embed of the message with both fields replaced.
+
+        A full message already carries its embed, of which only the fields are replaced;
+        a partial message (known only by ID) does not, so the embed is built from the
+        template instead of fetched.
 
         Args:
-            embed_data: Localization data for the embed.
-            channel: The voice channel.
-            state: The state of the room.
-            participants: List of channel participants.
+            template: Compiled template of the listing embed.
+            message: The message being edited.
+            participants: The rendered participant field.
+            comment: The rendered comment field.
 
         Returns:
-            discord.Embed: The generated embed.
+            discord.Embed: The embed to send.
         """
-        output = Message._build_participant_list(embed_data, channel, state, participants)
-        embed = discord.Embed(title=embed_data["title"],description="",color=discord.Color(embed_data["color"]), timestamp=datetime.now(timezone.utc))
-        embed.add_field(name="", value="\n".join(output), inline=False)
-        embed.add_field(name="", value=embed_data["fields"][1]["value"].format(comment=state.comment), inline=False)
-        embed.set_author(name=embed_data["bot"]["name"], icon_url=embed_data["bot"]["url"])
-        embed.set_thumbnail(url=embed_data["thumbnail"]["url"])
-        embed.set_footer(text=embed_data["footer"]["text"], icon_url=embed_data["footer"]["icon_url"])
+        embeds = getattr(message, "embeds", None)
+        if not embeds:
+            return template.build(participants, comment)
+        embed = embeds[0]
+        embed.set_field_at(index=0, name="", value=participants, inline=False)
+        embed.set_field_at(index=1, name="", value=comment, inline=False)
         return embed
 
     @staticmethod
-    def _build_participant_list(
-        embed_data: dict,
-        channel: discord.VoiceChannel,
+    async def _edit(
+        rest: RestScheduler,
         state: RoomState,
-        participants: List[discord.Member]
-    ) -> List[str]:
-        """Creates a list of participants to embed in the message.
+        message: Union[discord.Message, discord.PartialMessage],
+        embed: discord.Embed
+    ) -> None:
+        """Edits the message and keeps the returned message as the room's handle.
 
-        Args:
-            embed_data: Localization data for the embed.
-            channel: Voice channel.
-            state: Room state.
-            participants: List of channel participants.
+        Edits of the same message that are still queued are merged into the newest one.
+        The room's fingerprint is cleared if the edit fails or is shed, so the next update
+        is sent even if it renders the same content.
 
-        Returns:
-            List[str]: A list of strings representing participants and available slots.
+        Args:
+            rest: Scheduler for outbound Discord requests.
+            state: The state of the room.
+            message: The message to edit.
+            embed: The new embed.
         """
-        output = []
-        for i in range(channel.user_limit):
-            if i < len(participants):
-                suffix = "[OWNER]" if participants[i].id == state.owner_id else ""
-                output.append(
-                    embed_data["fields"][0]["value"]["participant"].format(
-                        suffix=suffix,
-                        user_id=participants[i].id
-                    )
-                )
-            else:
-                output.append(embed_data["fields"][0]["value"]["free_slot"])
-        return output
\ No newline at end of file
+        try:
+            edited = await rest.submit(
+                Priority.EDIT_LISTING, f"messages:{message.channel.id}", "edit_message", lambda: message.edit(embed=embed), merge_key=message.id
+            )
+        except discord.errors.NotFound:
+            state.message = None
+            state.fingerprint = None
+            raise
+        except Exception:
+            state.fingerprint = None
+            raise
+        if edited is None:
+            # Shed by the scheduler, the listing still shows older content
+            state.fingerprint = None
+        state.message = edited or message
@@ -0,0 +1,74 @@
+import discord
+from typing import Any, Dict
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Profiles selectable with INTENTS_PROFILE
+PROFILES = ("minimal", "full")
+
+
+def gateway_options(profile: str) -> Dict[str, Any]:
+    """Returns the intents and cache options of the bot for a profile.
+
+    ``full``, the default, requests every intent and caches every member and the recent
+    messages. ``minimal`` is opt-in: it receives only guild and voice state events, caches
+    only the members connected to voice, skips chunking the member lists at startup and
+    keeps no message cache, which is everything the autoroomer itself needs.
+
+    Args:
+        profile: One of ``PROFILES``.
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for ``commands.Bot``.
+
+    Raises:
+        ValueError: If the profile is unknown.
+    """
+    if profile == "minimal":
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.voice_states = True
+        member_cache_flags = discord.MemberCacheFlags.none()
+        member_cache_flags.voice = True
+        return {
+            "intents": intents,
+            "member_cache_flags": member_cache_flags,
+            "chunk_guilds_at_startup": False,
+            "max_messages": None
+        }
+    if profile == "full":
+        intents = discord.Intents.all()
+        return {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.from_intents(intents),
+            "chunk_guilds_at_startup": True
+        }
+    raise ValueError(f"❌ Unknown intents profile {profile!r}, expected one of {', '.join(PROFILES)}")
+
+
+def cache_sizes(bot: discord.Client) -> Dict[str, int]:
+    """Counts the objects held in the bot's cache.
+
+    Args:
+        bot: A connected bot.
+
+    Returns:
+        Dict[str, int]: Number of cached guilds, channels, members, users and messages.
+    """
+    return {
+        "guilds": len(bot.guilds),
+        "channels": sum(len(guild.channels) for guild in bot.guilds),
+        "members": sum(len(guild.members) for guild in bot.guilds),
+        "users": len(bot.users),
+        "messages": len(bot.cached_messages)
+    }
+
+
+def peak_rss_kb() -> int:
+    """Returns the peak resident memory of the process in KiB, or 0 where it is unknown"""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
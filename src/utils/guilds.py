@@ -0,0 +1,152 @@
+import json
+import discord
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+from .func import RoomState
+from .localization import Localization
+from .pool import RoomPool
+from .board import Board
+from .matchmaking import FreeSlotIndex
+
+# Guild ID of the configuration read from .env, which serves every guild without its own entry
+DEFAULT_GUILD = 0
+# Per-room listing messages, or one paginated board of all open rooms
+LISTING_MODES = ("messages", "board")
+
+
+@dataclass(slots=True)
+class GuildConfig:
+    guild_id: int
+    text_channel_id: int
+    category_create_room: int
+    category_find: int
+    category_filled: int
+    lobbies: Dict[int, int]
+    lang: str
+    listing_mode: str = "messages"
+    room_categories: FrozenSet[int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.room_categories = frozenset((self.category_find, self.category_filled))
+
+    @property
+    def sizes(self) -> List[int]:
+        """User limits of the guild's lobbies"""
+        return sorted(set(self.lobbies.values()))
+
+
+@dataclass(slots=True)
+class ResolvedChannels:
+    listing: Optional[discord.TextChannel]
+    create_room: Optional[discord.CategoryChannel]
+    find: Optional[discord.CategoryChannel]
+    filled: Optional[discord.CategoryChannel]
+
+
+@dataclass(slots=True)
+class GuildState:
+    config: GuildConfig
+    localization: Localization
+    pool: RoomPool
+    room_states: Dict[int, RoomState] = field(default_factory=dict)
+    reconciled: bool = False
+    board: Optional[Board] = None
+    open_rooms: FreeSlotIndex = field(default_factory=FreeSlotIndex)
+    vacant: Dict[int, Dict[int, None]] = field(default_factory=dict)
+    resolved: Dict[int, ResolvedChannels] = field(default_factory=dict)
+    channel_ids: FrozenSet[int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.channel_ids = frozenset((
+            self.config.text_channel_id, self.config.category_create_room,
+            self.config.category_find, self.config.category_filled
+        ))
+
+    def channels(self, bot, guild: discord.Guild) -> ResolvedChannels:
+        """Returns the configured channels of a Discord guild, resolving them on first use.
+
+        The result is cached until ``invalidate`` is called for the guild, so the event
+        path does one dictionary lookup instead of scanning the guild's categories.
+
+        Args:
+            bot: The bot, which finds the listing channel.
+            guild: The Discord guild the event came from.
+
+        Returns:
+            ResolvedChannels: The listing channel and the three categories, None where missing.
+        """
+        resolved = self.resolved.get(guild.id)
+        if resolved is None:
+            resolved = self.resolved[guild.id] = ResolvedChannels(
+                listing=bot.get_channel(self.config.text_channel_id),
+                create_room=guild.get_channel(self.config.category_create_room),
+                find=guild.get_channel(self.config.category_find),
+                filled=guild.get_channel(self.config.category_filled)
+            )
+        return resolved
+
+    def invalidate(self, guild_id: int) -> None:
+        """Drops the resolved channels of a Discord guild after one of them was created, changed or deleted"""
+        self.resolved.pop(guild_id, None)
+
+
+def load_guild_configs(config) -> List[GuildConfig]:
+    """Reads the per-guild configuration.
+
+    Without ``GUILDS_FILE`` the single guild set up in .env is used for every guild.
+    The file maps guild IDs to objects with ``text_channel_id``, ``category_create_room``,
+    ``category_find``, ``category_filled``, ``lobbies`` (lobby channel ID to user limit),
+    an optional ``lang``, which defaults to ``LANG``, and an optional ``listing_mode``,
+    which defaults to ``LISTING_MODE``.
+
+    Args:
+        config: The bot's configuration.
+
+    Returns:
+        List[GuildConfig]: One entry per configured guild.
+
+    Raises:
+        ValueError: If the file cannot be read or an entry is incomplete.
+    """
+    if not config.guilds_file:
+        lobbies = {config.voice_1: 2, config.voice_2: 3, config.voice_3: 4}
+        return [GuildConfig(
+            guild_id=DEFAULT_GUILD,
+            text_channel_id=config.text_channel_id,
+            category_create_room=config.category_create_room,
+            category_find=config.category_find,
+            category_filled=config.category_filled,
+            lobbies={channel_id: size for channel_id, size in lobbies.items() if channel_id},
+            lang=config.lang,
+            listing_mode=config.listing_mode
+        )]
+
+    path = Path(config.guilds_file)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"❌ Could not read guild configuration {path}: {e}") from e
+
+    guilds = []
+    for guild_id, entry in entries.items():
+        try:
+            guilds.append(GuildConfig(
+                guild_id=int(guild_id),
+                text_channel_id=int(entry["text_channel_id"]),
+                category_create_room=int(entry["category_create_room"]),
+                category_find=int(entry["category_find"]),
+                category_filled=int(entry["category_filled"]),
+                lobbies={int(channel_id): int(size) for channel_id, size in entry["lobbies"].items()},
+                lang=entry.get("lang", config.lang),
+                listing_mode=entry.get("listing_mode", config.listing_mode)
+            ))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"❌ Invalid configuration of guild {guild_id} in {path}: {e!r}") from e
+    return guilds
+
+
+def find_guild(guilds: Dict[int, GuildState], guild_id: int) -> Optional[GuildState]:
+    """Returns the state of a guild, falling back to the .env guild if it is configured"""
+    return guilds.get(guild_id) or guilds.get(DEFAULT_GUILD)
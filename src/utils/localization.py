@@ -1,30 +1,330 @@
 import json
 import asyncio
 import aiofiles
+import discord
 from pathlib import Path
-from typing import Dict
+from string import Formatter
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+# Suffix marking the owner in the participant list
+OWNER_SUFFIX = "[OWNER]"
+
+
+def _bind(template: str, **values) -> str:
+    """Substitutes some fields of a format string and keeps the others as placeholders"""
+    output = []
+    for literal, name, spec, conversion in Formatter().parse(template):
+        output.append(literal.replace("{", "{{").replace("}", "}}"))
+        if name is None:
+            continue
+        if name in values:
+            output.append(format(values[name], spec).replace("{", "{{").replace("}", "}}"))
+        else:
+            output.append("{" + name + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}")
+    return "".join(output)
+
+
+class EmbedTemplate:
+    __slots__ = ('title', 'description', 'color', 'author', 'thumbnail', 'footer',
+                 'free_slot', '_owner_line', '_member_line', '_comment')
+
+    def __init__(self, data: dict):
+        """Embed definition of a locale compiled once at load.
+
+        The static parts (title, color, author, thumbnail, footer) are built once and
+        shared by every embed, the participant line is pre-bound for owners and other
+        members, and the free-slot line is rendered once.
+
+        Args:
+            data: The embed definition from the locale file.
+        """
+        fields = data["fields"]
+        self.title = data["title"]
+        self.description = data.get("description", "")
+        self.color = discord.Color(data["color"])
+        self.author = discord.EmbedAuthor(name=data["bot"]["name"], icon_url=data["bot"]["url"])
+        self.thumbnail = discord.EmbedMedia(url=data["thumbnail"]["url"])
+        self.footer = discord.EmbedFooter(text=data["footer"]["text"], icon_url=data["footer"]["icon_url"])
+        participant = fields[0]["value"]["participant"]
+        self.free_slot = fields[0]["value"]["free_slot"]
+        self._owner_line = _bind(participant, suffix=OWNER_SUFFIX).format
+        self._member_line = _bind(participant, suffix="").format
+        self._comment = fields[1]["value"].format
+
+    def participants(self, owner_id: int, member_ids: Iterable[int], user_limit: int) -> str:
+        """Renders the participant field.
+
+        Args:
+            owner_id: ID of the room owner.
+            member_ids: IDs of the members in the room, in channel order.
+            user_limit: Number of slots of the room.
+
+        Returns:
+            str: One line per slot, members first and free slots after them.
+        """
+        lines = []
+        for member_id in member_ids:
+            if len(lines) == user_limit:
+                break
+            lines.append(self._owner_line(user_id=member_id) if member_id == owner_id else self._member_line(user_id=member_id))
+        lines.extend([self.free_slot] * (user_limit - len(lines)))
+        return "\n".join(lines)
+
+    def comment(self, comment: str) -> str:
+        """Renders the comment field"""
+        return self._comment(comment=comment)
+
+    def build(self, participants: str, comment: str) -> discord.Embed:
+        """Creates an embed from the static parts and the two rendered fields.
+
+        Args:
+            participants: The rendered participant field.
+            comment: The rendered comment field.
+
+        Returns:
+            discord.Embed: The embed of a listing.
+        """
+        return discord.Embed(
+            title=self.title,
+            description=self.description,
+            color=self.color,
+            timestamp=datetime.now(timezone.utc),
+            author=self.author,
+            thumbnail=self.thumbnail,
+            footer=self.footer,
+            fields=[
+                discord.EmbedField(name="", value=participants, inline=False),
+                discord.EmbedField(name="", value=comment, inline=False)
+            ]
+        )
+
+
+class BoardTemplate:
+    __slots__ = ('title', 'color', 'author', 'thumbnail', 'empty', '_heading', '_room', '_footer', '_footer_icon')
+
+    def __init__(self, data: dict):
+        """Definition of the open-rooms board compiled once at load.
+
+        Args:
+            data: The board definition from the locale file.
+        """
+        self.title = data["title"]
+        self.color = discord.Color(data["color"])
+        self.author = discord.EmbedAuthor(name=data["bot"]["name"], icon_url=data["bot"]["url"])
+        self.thumbnail = discord.EmbedMedia(url=data["thumbnail"]["url"])
+        self.empty = data["empty"]
+        self._heading = data["heading"].format
+        self._room = data["room"].format
+        self._footer = data["footer"]["text"].format
+        self._footer_icon = data["footer"]["icon_url"]
+
+    def heading(self, size: int) -> str:
+        """Renders the heading of the rooms of one size"""
+        return self._heading(size=size)
+
+    def room(self, channel_id: int, members: int, size: int, comment: str) -> str:
+        """Renders the line of one room"""
+        return self._room(channel_id=channel_id, members=members, size=size, comment=comment)
+
+    def footer(self, page: int, pages: int) -> str:
+        """Renders the footer of a page"""
+        return self._footer(page=page, pages=pages)
+
+    def build(self, text: str, page: int, pages: int) -> discord.Embed:
+        """Creates the embed of one page.
+
+        Args:
+            text: The rendered rooms of the page.
+            page: Number of the page, starting at 1.
+            pages: Number of pages.
+
+        Returns:
+            discord.Embed: The embed of the page.
+        """
+        return discord.Embed(
+            title=self.title,
+            description=text,
+            color=self.color,
+            timestamp=datetime.now(timezone.utc),
+            author=self.author,
+            thumbnail=self.thumbnail,
+            footer=discord.EmbedFooter(text=self.footer(page, pages), icon_url=self._footer_icon)
+        )
+
+
+# Keys each embed definition needs, with the format fields each string may use
+EMBED_SCHEMAS: Dict[str, Dict[Tuple[Union[str, int], ...], Optional[FrozenSet[str]]]] = {
+    "create_message": {
+        ("title",): frozenset(),
+        ("fields", 0, "value", "participant"): frozenset({"suffix", "user_id"}),
+        ("fields", 0, "value", "free_slot"): frozenset(),
+        ("fields", 1, "value"): frozenset({"comment"}),
+        ("bot", "name"): None,
+        ("bot", "url"): None,
+        ("thumbnail", "url"): None,
+        ("footer", "text"): None,
+        ("footer", "icon_url"): None,
+    },
+    "board": {
+        ("title",): frozenset(),
+        ("heading",): frozenset({"size"}),
+        ("room",): frozenset({"channel_id", "members", "size", "comment"}),
+        ("empty",): frozenset(),
+        ("bot", "name"): None,
+        ("bot", "url"): None,
+        ("thumbnail", "url"): None,
+        ("footer", "text"): frozenset({"page", "pages"}),
+        ("footer", "icon_url"): None,
+    },
+}
+# Compiled form of each embed
+TEMPLATES = {"create_message": EmbedTemplate, "board": BoardTemplate}
+# Embeds every locale must define; "board" is only needed by guilds in board mode
+REQUIRED_EMBEDS = ("create_message",)
+
+
+def validate(translations: dict) -> List[str]:
+    """Checks that a locale defines every embed the bot renders.
+
+    Args:
+        translations: The parsed locale file.
+
+    Returns:
+        List[str]: Descriptions of the problems found; empty if the locale is usable.
+    """
+    embeds = translations.get("embeds") if isinstance(translations, dict) else None
+    if not isinstance(embeds, dict):
+        return ["missing 'embeds'"]
+    problems = []
+    for name in REQUIRED_EMBEDS:
+        if not isinstance(embeds.get(name), dict):
+            problems.append(f"missing 'embeds.{name}'")
+    for name, schema in EMBED_SCHEMAS.items():
+        data = embeds.get(name)
+        if data is None:
+            continue
+        if not isinstance(data, dict):
+            problems.append(f"'embeds.{name}' is not an object")
+            continue
+        if not isinstance(data.get("color"), int):
+            problems.append(f"'embeds.{name}.color' must be an integer")
+        for path, allowed in schema.items():
+            key = ".".join(["embeds", name, *map(str, path)])
+            value = data
+            try:
+                for part in path:
+                    value = value[part]
+            except (KeyError, IndexError, TypeError):
+                problems.append(f"missing '{key}'")
+                continue
+            if not isinstance(value, str):
+                problems.append(f"'{key}' must be a string")
+            elif allowed is not None:
+                try:
+                    used = {field for _, field, _, _ in Formatter().parse(value) if field is not None}
+                except ValueError as e:
+                    problems.append(f"'{key}' is not a valid format string: {e}")
+                    continue
+                if used - allowed:
+                    problems.append(f"'{key}' uses unknown fields {', '.join(sorted(used - allowed))}")
+    return problems
+
 
 class Localization:
-    __slots__ = ('translations', 'locales_dir', 'logger')
-    
+    __slots__ = ('translations', 'templates', 'locale_file', 'locales_dir', 'logger', '_mtime', '_watcher')
+
     def __init__(self, locale_file: str, logger, locales_dir: str = "locales"):
+        """Translations of one locale and the embed templates compiled from them.
+
+        Nothing is loaded until ``load_locale`` is awaited, which is part of startup.
+
+        Args:
+            locale_file: Name of the locale file, e.g. ``"en.json"``.
+            logger: Logger for recording events and errors.
+            locales_dir: Directory of the locale files.
+        """
         self.translations: Dict[str, str] = {}
+        self.templates: Dict[str, EmbedTemplate] = {}
+        self.locale_file = locale_file
         self.locales_dir = Path(locales_dir)
         self.logger = logger
-        asyncio.create_task(self.load_locale(locale_file))
+        self._mtime = 0.0
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def load_locale(self, locale_file: Optional[str] = None) -> None:
+        """Load one localization file asynchronously, validate it and compile its embeds.
+
+        The translations and templates are swapped in together once the file has been
+        read, validated and compiled; if any step fails, the loaded locale stays in use.
 
-    async def load_locale(self, locale_file: str) -> None:
-        """Load one localization file asynchronously"""
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is not valid JSON or lacks keys the embeds need.
+        """
+        locale_file = locale_file or self.locale_file
         file_path = self.locales_dir / locale_file
         if not file_path.exists():
             await self.logger.error(f"❌ Localization file {file_path} was not found")
             raise FileNotFoundError(f"❌ Localization file {file_path} was not found")
-        
+
+        mtime = file_path.stat().st_mtime
         async with aiofiles.open(file_path, mode='r', encoding='utf-8') as f:
             content = await f.read()
-            self.translations = json.loads(content)
+        try:
+            translations = json.loads(content)
+            problems = validate(translations)
+            if problems:
+                raise ValueError("; ".join(problems))
+            templates = {name: TEMPLATES[name](data) for name, data in translations["embeds"].items() if name in TEMPLATES}
+        except ValueError as e:
+            await self.logger.error(f"❌ Invalid localization file {file_path}: {e}")
+            raise ValueError(f"❌ Invalid localization file {file_path}: {e}") from e
+
+        self.translations, self.templates = translations, templates
+        self.locale_file, self._mtime = locale_file, mtime
         await self.logger.info(f"✅ Loaded localization file: {locale_file}")
 
+    async def reload(self) -> bool:
+        """Reloads the current locale file in place.
+
+        Returns:
+            bool: True if the new translations are in use, False if the old ones were kept.
+        """
+        try:
+            await self.load_locale()
+            return True
+        except (FileNotFoundError, ValueError):
+            await self.logger.error(f"🔴 Keeping the previous translations of {self.locale_file}")
+            return False
+
+    def watch(self, interval: float) -> None:
+        """Starts reloading the locale file whenever its modification time changes.
+
+        Args:
+            interval: Seconds between checks; 0 disables watching.
+        """
+        if interval > 0 and self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    def close(self) -> None:
+        """Stops watching the locale file"""
+        if self._watcher:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def _watch(self, interval: float) -> None:
+        """Polls the modification time of the locale file"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = (self.locales_dir / self.locale_file).stat().st_mtime
+            except OSError:
+                continue
+            if mtime != self._mtime:
+                self._mtime = mtime
+                await self.reload()
+
     def get_text(self, key: str, **kwargs) -> str:
         """Get a translated string with support for nested keys and formatting"""
         translation = self.translations
@@ -32,4 +332,59 @@ class Localization:
             translation = translation.get(part, f"❌ Missing translation: {key}")
             if isinstance(translation, str):
                 break
-        return translation.format(**kwargs) if kwargs and isinstance(translation, str) else translation
\ No newline at end of file
+        return translation.format(**kwargs) if kwargs and isinstance(translation, str) else translation
+
+    def embed(self, name: str) -> Union[EmbedTemplate, BoardTemplate]:
+        """Get the compiled template of an embed, e.g. ``"create_message"``"""
+        return self.templates[name]
+
+
+class Locales:
+    __slots__ = ('logger', 'locales_dir', '_locales')
+
+    def __init__(self, logger, locales_dir: str = "locales"):
+        """The loaded locales, one Localization per file, shared by every guild using it.
+
+        Args:
+            logger: Logger for recording events and errors.
+            locales_dir: Directory of the locale files.
+        """
+        self.logger = logger
+        self.locales_dir = locales_dir
+        self._locales: Dict[str, Localization] = {}
+
+    async def load(self, locale_file: str) -> Localization:
+        """Loads a locale file unless it is already loaded.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+            ValueError: If the file is invalid.
+        """
+        localization = self._locales.get(locale_file)
+        if localization is None:
+            localization = Localization(locale_file, self.logger, self.locales_dir)
+            await localization.load_locale()
+            self._locales[locale_file] = localization
+        return localization
+
+    def get(self, locale_file: str) -> Localization:
+        """Returns a loaded locale"""
+        return self._locales[locale_file]
+
+    async def reload(self) -> List[str]:
+        """Reloads every locale file in place.
+
+        Returns:
+            List[str]: Files that were invalid and kept their previous translations.
+        """
+        return [name for name, localization in self._locales.items() if not await localization.reload()]
+
+    def watch(self, interval: float) -> None:
+        """Reloads each locale file whenever it changes; 0 disables watching"""
+        for localization in self._locales.values():
+            localization.watch(interval)
+
+    def close(self) -> None:
+        """Stops watching the locale files"""
+        for localization in self._locales.values():
+            localization.close()
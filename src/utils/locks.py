@@ -0,0 +1,109 @@
+import time
+import asyncio
+from typing import Dict, Hashable, List, Tuple
+
+
+class _Entry:
+    __slots__ = ('lock', 'users', 'contended')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+        self.contended = 0
+
+
+class LockTable:
+    __slots__ = ('_entries', 'acquisitions', 'contended', 'wait_seconds')
+
+    def __init__(self):
+        """Locks created on demand per key and freed as soon as nobody holds or waits for them.
+
+        Every holder and waiter counts as a user of the key's lock; the entry is removed
+        when the last one leaves, so the table only holds keys with events in flight.
+        A lock is never dropped while in use, so a waiter always takes over the same
+        lock the previous holder released.
+        """
+        self._entries: Dict[Hashable, _Entry] = {}
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def acquire(self, key: Hashable) -> None:
+        """Waits for the lock of a key and takes it"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.users += 1
+        self.acquisitions += 1
+        # An unlocked lock can still make the caller wait behind a woken waiter that has
+        # not run yet, so a cancelled wait has to give up its use in either case
+        contended = entry.lock.locked()
+        if contended:
+            self.contended += 1
+            entry.contended += 1
+        started = time.perf_counter()
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            self._leave(key, entry)
+            raise
+        finally:
+            if contended:
+                self.wait_seconds += time.perf_counter() - started
+
+    def release(self, key: Hashable) -> None:
+        """Releases the lock of a key; the entry is freed if nobody else waits for it"""
+        entry = self._entries[key]
+        entry.lock.release()
+        self._leave(key, entry)
+
+    async def acquire_many(self, *keys: Hashable) -> List[Hashable]:
+        """Takes the locks of several keys in ascending key order.
+
+        The fixed order means two callers locking the same keys cannot deadlock. If
+        waiting is interrupted, the locks taken so far are released.
+
+        Args:
+            keys: Keys to lock; duplicates are ignored.
+
+        Returns:
+            List[Hashable]: The locked keys, to be passed to ``release_many``.
+        """
+        held = []
+        try:
+            for key in sorted(set(keys)):
+                await self.acquire(key)
+                held.append(key)
+        except BaseException:
+            self.release_many(held)
+            raise
+        return held
+
+    def release_many(self, keys: List[Hashable]) -> None:
+        """Releases locks taken by ``acquire_many`` in reverse order"""
+        for key in reversed(keys):
+            self.release(key)
+
+    def waiting(self) -> int:
+        """Returns the number of callers waiting for a lock"""
+        return sum(entry.users - entry.lock.locked() for entry in self._entries.values())
+
+    def hottest(self, count: int = 5) -> List[Tuple[Hashable, int]]:
+        """Returns the live keys that were waited for most often since they were created.
+
+        Args:
+            count: Number of keys to return.
+
+        Returns:
+            List[Tuple[Hashable, int]]: Pairs of key and contended acquisitions, most contended first.
+        """
+        contended = [(key, entry.contended) for key, entry in self._entries.items() if entry.contended]
+        return sorted(contended, key=lambda item: item[1], reverse=True)[:count]
+
+    def _leave(self, key: Hashable, entry: _Entry) -> None:
+        entry.users -= 1
+        if entry.users == 0:
+            del self._entries[key]
@@ -1,57 +1,252 @@
-import logging
+import os
 import sys
-import asyncio
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Deque, Dict, List, Optional, TextIO, Tuple
 
-class AsyncLogger:
-    __slots__ = ('logger', 'queue', 'handler', '_running', '_task')
-    
-    def __init__(self, name: str, level: int = logging.INFO):
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(level)
-        self.queue = asyncio.Queue()
-        self._task = None
-        
-        if not self.logger.handlers:
-            self.handler = logging.StreamHandler(sys.stdout)
-            self.handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-            self.logger.addHandler(self.handler)
-        
+# Record waiting in the buffer: (created, logger name, level, message, structured fields)
+_Record = Tuple[float, str, int, str, Dict[str, Any]]
+
+
+class _Done:
+    """Awaitable that is already complete, so ``await logger.info(...)`` never suspends"""
+    __slots__ = ()
+
+    def __await__(self):
+        return iter(())
+
+
+_DONE = _Done()
+
+
+def _format_text(record: _Record) -> str:
+    """Formats a record like ``%(asctime)s - %(name)s - %(levelname)s - %(message)s``, fields appended as key=value"""
+    created, name, level, message, fields = record
+    asctime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))
+    line = f"{asctime},{int(created % 1 * 1000):03d} - {name} - {logging.getLevelName(level)} - {message}"
+    if fields:
+        line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+    return line + "\n"
+
+
+def _format_json(record: _Record) -> str:
+    """Formats a record as one JSON line, fields as top-level keys"""
+    created, name, level, message, fields = record
+    return json.dumps({
+        "time": datetime.fromtimestamp(created, timezone.utc).isoformat(timespec="milliseconds"),
+        "logger": name,
+        "level": logging.getLevelName(level),
+        "message": message,
+        **fields
+    }, ensure_ascii=False, default=str) + "\n"
+
+
+class LogSink:
+    __slots__ = ('stream', 'path', 'max_bytes', 'backup_count', 'json', '_size')
+
+    def __init__(self, stream: Optional[TextIO] = None, path: Optional[str] = None,
+                 max_bytes: int = 0, backup_count: int = 0, json_lines: bool = False):
+        """Destination of log records, written a batch at a time from the writer thread.
+
+        Args:
+            stream: Stream to write to, e.g. ``sys.stdout``; ignored if ``path`` is set.
+            path: File to append to.
+            max_bytes: Size at which the file is rotated; 0 never rotates.
+            backup_count: Rotated files to keep as ``path.1`` ... ``path.N``.
+            json_lines: Whether to write JSON lines instead of text.
+        """
+        self.stream = stream
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.json = json_lines
+        self._size = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.stream = open(path, "a", encoding="utf-8")
+            self._size = self.stream.tell()
+
+    def write(self, records: List[_Record]) -> None:
+        """Writes a batch of records and flushes once"""
+        formatter = _format_json if self.json else _format_text
+        data = "".join(formatter(record) for record in records)
+        if self.path and self.max_bytes and self.backup_count and self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self.stream.write(data)
+        self.stream.flush()
+        self._size += len(data)
+
+    def _rotate(self) -> None:
+        """Shifts ``path`` to ``path.1``, ``path.1`` to ``path.2`` and so on"""
+        self.stream.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+        self.stream = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+
+
+class LogPipeline:
+    __slots__ = ('buffer', 'sinks', 'batch_size', 'dropped', '_wakeup', '_running', '_thread', '_loggers')
+
+    def __init__(self, sinks: Optional[List[LogSink]] = None, capacity: int = 10000, batch_size: int = 256):
+        """Bounded ring buffer fed by every logger and drained by one writer thread.
+
+        When the buffer is full, the oldest records are dropped and counted in ``dropped``.
+
+        Args:
+            sinks: Destinations of the records; stdout by default.
+            capacity: Records the buffer holds.
+            batch_size: Records written per sink call.
+        """
+        self.buffer: Deque[_Record] = deque(maxlen=capacity)
+        self.sinks = sinks if sinks is not None else [LogSink(sys.stdout)]
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._wakeup = threading.Event()
         self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._loggers = 0
 
-    async def log(self, level: int, message: str):
-        """Asynchronously adds a message to the log queue"""
-        await self.queue.put((level, message))
-
-    async def info(self, message: str):
-        """Asynchronous method for INFO level logs"""
-        await self.log(logging.INFO, message)
-
-    async def error(self, message: str):
-        """Asynchronous method for ERROR level logs"""
-        await self.log(logging.ERROR, message)
-    
-    async def process_logs(self):
-        """Processes messages from the log queue"""
-        self._running = True
-        while self._running:
-            try:
-                level, message = await self.queue.get()
-                self.logger.log(level, message)
-                self.queue.task_done()
-            except asyncio.CancelledError:
-                self._running = False
-                break
+    def put(self, record: _Record) -> None:
+        """Adds a record without waiting"""
+        buffer = self.buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append(record)
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def attach(self) -> None:
+        """Registers a logger and starts the writer thread with the first one"""
+        self._loggers += 1
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._write_loop, name="logger", daemon=True)
+            self._thread.start()
 
-    def stop(self):
-        """Stops processing logs"""
+    def detach(self, timeout: float = 5.0) -> None:
+        """Unregisters a logger; with the last one the buffer is written and the thread stops.
+
+        Args:
+            timeout: Seconds to wait for the buffer to be written.
+        """
+        self._loggers -= 1
+        if self._loggers > 0 or self._thread is None:
+            return
         self._running = False
-        if self._task:
-            self._task.cancel()
-        self.logger.handlers.clear()
-        print(f"❌ {self.logger.name} has been stopped")
-
-async def setup_async_logger(name: str) -> AsyncLogger:
-    """Creates and returns an asynchronous logger"""
-    logger = AsyncLogger(name)
-    logger._task = asyncio.create_task(logger.process_logs())
-    return logger
\ No newline at end of file
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _write_loop(self) -> None:
+        """Writes the buffered records in batches until stopped and the buffer is empty"""
+        buffer = self.buffer
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while buffer:
+                batch = [buffer.popleft() for _ in range(min(self.batch_size, len(buffer)))]
+                for sink in self.sinks:
+                    try:
+                        sink.write(batch)
+                    except (OSError, ValueError) as e:
+                        sys.stderr.write(f"❌ Failed to write {len(batch)} log records to {sink.path or 'stream'}: {e}\n")
+            if not self._running:
+                break
+
+
+class AsyncLogger:
+    __slots__ = ('name', 'level', 'pipeline')
+
+    def __init__(self, name: str, pipeline: LogPipeline, level: int = logging.INFO):
+        """Named handle on the shared pipeline.
+
+        Records below ``level`` are discarded before anything is built or enqueued.
+        ``info``, ``error`` and ``debug`` return at once; awaiting the result is optional.
+        Keyword arguments are kept as structured fields, e.g. ``guild_id`` or ``latency_ms``.
+
+        Args:
+            name: Name shown in every record.
+            pipeline: The pipeline the records are written through.
+            level: Lowest level that is logged.
+        """
+        self.name = name
+        self.pipeline = pipeline
+        self.level = level
+
+    def is_enabled(self, level: int) -> bool:
+        """Whether records of a level are logged, to skip building costly messages"""
+        return level >= self.level
+
+    def log(self, level: int, message: str, **fields: Any) -> Awaitable[None]:
+        """Adds a message to the pipeline without waiting"""
+        if level >= self.level:
+            self.pipeline.put((time.time(), self.name, level, message, fields))
+        return _DONE
+
+    def debug(self, message: str, **fields: Any) -> Awaitable[None]:
+        """Logs a message at DEBUG level"""
+        return self.log(logging.DEBUG, message, **fields)
+
+    def info(self, message: str, **fields: Any) -> Awaitable[None]:
+        """Logs a message at INFO level"""
+        return self.log(logging.INFO, message, **fields)
+
+    def error(self, message: str, **fields: Any) -> Awaitable[None]:
+        """Logs a message at ERROR level"""
+        return self.log(logging.ERROR, message, **fields)
+
+    def stop(self) -> None:
+        """Detaches from the pipeline; the last logger to stop writes what is left"""
+        self.pipeline.detach()
+        print(f"❌ {self.name} has been stopped")
+
+
+# Pipeline shared by every logger of the process, created by the first setup_async_logger call
+_pipeline: Optional[LogPipeline] = None
+
+
+def _create_pipeline(config) -> LogPipeline:
+    """Builds the pipeline with stdout and the file sinks selected by the ``log_*`` settings"""
+    if config is None:
+        return LogPipeline()
+    sinks = [LogSink(sys.stdout)]
+    if config.log_file:
+        sinks.append(LogSink(path=config.log_file, max_bytes=config.log_max_bytes, backup_count=config.log_backup_count))
+    if config.log_json_file:
+        sinks.append(LogSink(path=config.log_json_file, max_bytes=config.log_max_bytes, backup_count=config.log_backup_count, json_lines=True))
+    return LogPipeline(sinks, capacity=config.log_buffer_size)
+
+
+def log_level(name: str, config=None) -> int:
+    """Returns the level of a logger: its entry in ``LOG_LEVELS``, else ``LOG_LEVEL``, else INFO"""
+    if config is None:
+        return logging.INFO
+    level = config.log_levels.get(name, config.log_level)
+    return logging.getLevelNamesMapping().get(level.upper(), logging.INFO)
+
+
+async def setup_async_logger(name: str, config=None) -> AsyncLogger:
+    """Creates a logger feeding the process-wide pipeline.
+
+    Args:
+        name: Name of the logger.
+        config: The bot's configuration; its ``log_*`` settings select the levels, and
+            for the first logger the buffer size and the optional file sinks. Without
+            it the logger writes INFO and above to stdout only.
+
+    Returns:
+        AsyncLogger: The running logger.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = _create_pipeline(config)
+    logger = AsyncLogger(name, _pipeline, log_level(name, config))
+    _pipeline.attach()
+    return logger
@@ -0,0 +1,110 @@
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+
+class FreeSlotIndex:
+    __slots__ = ('_buckets', '_positions', '_reserved')
+
+    def __init__(self):
+        """Open rooms of a guild indexed by size and number of free slots.
+
+        Each size keeps one bucket per free-slot count, and each bucket keeps its rooms in
+        the order they were added, so the fullest open room of a size is found by looking
+        at no more buckets than the size has slots, however many rooms are open. Updates
+        move a room between two buckets in constant time.
+
+        Members being moved into a room are kept as reservations until their join event
+        is handled, because the room's member list does not include them before that.
+        """
+        self._buckets: Dict[int, Dict[int, Dict[int, None]]] = {}
+        self._positions: Dict[int, Tuple[int, int]] = {}
+        self._reserved: Dict[int, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._positions
+
+    def update(self, channel_id: int, size: int, free: int) -> None:
+        """Records the free slots of a room; rooms without a free slot are removed.
+
+        Args:
+            channel_id: ID of the room.
+            size: User limit of the room.
+            free: Number of free slots.
+        """
+        position = self._positions.get(channel_id)
+        if position == (size, free):
+            return
+        if position is not None:
+            self._remove(channel_id, position)
+        if free > 0:
+            self._buckets.setdefault(size, {}).setdefault(free, {})[channel_id] = None
+            self._positions[channel_id] = (size, free)
+
+    def discard(self, channel_id: int) -> None:
+        """Removes a room that is deleted, filled or no longer listed"""
+        position = self._positions.get(channel_id)
+        if position is not None:
+            self._remove(channel_id, position)
+
+    def best(self, sizes: Iterable[int], exclude: Optional[int] = None) -> Optional[int]:
+        """Returns the open room with the fewest free slots among the given sizes.
+
+        Ties go to the smaller size, then to the room that has waited longest.
+
+        Args:
+            sizes: User limits to consider.
+            exclude: ID of a room that must not be returned, e.g. the member's current one.
+
+        Returns:
+            Optional[int]: ID of the room, or None if no room of these sizes has a free slot.
+        """
+        best = None
+        for size in sorted(sizes):
+            for free, rooms in sorted(self._buckets.get(size, {}).items()):
+                if best is not None and free >= best[0]:
+                    break
+                channel_id = next((channel_id for channel_id in rooms if channel_id != exclude), None)
+                if channel_id is not None:
+                    best = (free, channel_id)
+                    break
+        return best[1] if best else None
+
+    def reserve(self, channel_id: int, member_id: int) -> None:
+        """Holds a slot of a room for a member who is being moved into it.
+
+        Args:
+            channel_id: ID of the room.
+            member_id: ID of the member being moved.
+        """
+        self._reserved.setdefault(channel_id, set()).add(member_id)
+
+    def release(self, channel_id: int, member_id: int) -> None:
+        """Drops a reservation once the member's join event is handled or the move failed"""
+        members = self._reserved.get(channel_id)
+        if members is not None:
+            members.discard(member_id)
+            if not members:
+                del self._reserved[channel_id]
+
+    def reserved(self, channel_id: int) -> FrozenSet[int]:
+        """Returns the members with a reservation in a room"""
+        return frozenset(self._reserved.get(channel_id, ()))
+
+    def forget(self, channel_id: int) -> None:
+        """Removes a deleted room together with its reservations"""
+        self.discard(channel_id)
+        self._reserved.pop(channel_id, None)
+
+    def counts(self) -> Dict[int, int]:
+        """Returns the number of open rooms per size"""
+        return {size: sum(map(len, buckets.values())) for size, buckets in self._buckets.items() if buckets}
+
+    def _remove(self, channel_id: int, position: Tuple[int, int]) -> None:
+        size, free = position
+        buckets = self._buckets[size]
+        del buckets[free][channel_id]
+        if not buckets[free]:
+            del buckets[free]
+        del self._positions[channel_id]
@@ -0,0 +1,231 @@
+import time
+import asyncio
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Upper bounds in seconds, suited to Discord REST round trips
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Upper bounds in seconds for in-process stages (lock waits, embed builds)
+FAST_BUCKETS: Tuple[float, ...] = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_Labels = Tuple[Tuple[str, str], ...]
+_Sample = Union[float, Dict[_Labels, float]]
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        """Fixed-bucket histogram of durations in seconds.
+
+        Args:
+            bounds: Sorted upper bounds of the buckets; larger values fall into an overflow bucket.
+        """
+        self.bounds = tuple(bounds)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Records one duration"""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Returns the upper bound of the bucket holding the q-quantile (inf if it overflowed)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def __str__(self) -> str:
+        if not self.count:
+            return "no samples"
+        return (
+            f"n={self.count} avg={self.sum / self.count * 1000:.0f} ms "
+            f"p50<={self.quantile(0.5) * 1000:.0f} ms p99<={self.quantile(0.99) * 1000:.0f} ms"
+        )
+
+
+class _Timer:
+    __slots__ = ('registry', 'name', 'labels', 'started')
+
+    def __init__(self, registry: 'Registry', name: str, labels: _Labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.registry._observe(self.name, self.labels, time.perf_counter() - self.started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Registry:
+    __slots__ = ('enabled', 'prefix', '_counters', '_histograms', '_bounds', '_callbacks')
+
+    def __init__(self, prefix: str = "autoroomer"):
+        """Process-wide store of counters, histograms and gauges.
+
+        While disabled, ``inc``, ``observe`` and ``time`` return immediately, so the
+        instrumentation left in the hot paths costs one attribute check.
+
+        Args:
+            prefix: Prefix of every exported metric name.
+        """
+        self.enabled = False
+        self.prefix = prefix
+        self._counters: Dict[str, Dict[_Labels, float]] = {}
+        self._histograms: Dict[str, Dict[_Labels, Histogram]] = {}
+        self._bounds: Dict[str, Sequence[float]] = {}
+        self._callbacks: Dict[str, Tuple[str, Callable[[], _Sample]]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Increments a counter"""
+        if not self.enabled:
+            return
+        series = self._counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Records a duration in a histogram"""
+        if self.enabled:
+            self._observe(name, tuple(sorted(labels.items())), seconds)
+
+    def time(self, name: str, **labels: str) -> Union[_Timer, _NullTimer]:
+        """Returns a context manager recording the duration of its block in a histogram"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, tuple(sorted(labels.items())))
+
+    def buckets(self, name: str, bounds: Sequence[float]) -> None:
+        """Sets the bucket bounds of a histogram before its first sample"""
+        self._bounds[name] = bounds
+
+    def histogram(self, name: str) -> Histogram:
+        """Returns the unlabelled histogram of a name; it is recorded even while disabled"""
+        series = self._histograms.setdefault(name, {})
+        if () not in series:
+            series[()] = Histogram(self._bounds.get(name, DEFAULT_BUCKETS))
+        return series[()]
+
+    def register(self, name: str, kind: str, callback: Callable[[], _Sample]) -> None:
+        """Registers a gauge or counter read at scrape time.
+
+        Args:
+            name: Metric name without prefix.
+            kind: ``"gauge"`` or ``"counter"``.
+            callback: Returns the value, or a mapping of label tuples to values.
+        """
+        self._callbacks[name] = (kind, callback)
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format"""
+        lines: List[str] = []
+        for name, series in self._counters.items():
+            lines.append(f"# TYPE {self.prefix}_{name} counter")
+            lines.extend(f"{self.prefix}_{name}{_format(labels)} {value}" for labels, value in series.items())
+        for name, (kind, callback) in self._callbacks.items():
+            sample = callback()
+            lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+            if isinstance(sample, dict):
+                lines.extend(f"{self.prefix}_{name}{_format(labels)} {value}" for labels, value in sample.items())
+            else:
+                lines.append(f"{self.prefix}_{name} {sample}")
+        for name, series in self._histograms.items():
+            lines.append(f"# TYPE {self.prefix}_{name} histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{self.prefix}_{name}_bucket{_format(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{self.prefix}_{name}_bucket{_format(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{self.prefix}_{name}_sum{_format(labels)} {histogram.sum}")
+                lines.append(f"{self.prefix}_{name}_count{_format(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _observe(self, name: str, labels: _Labels, seconds: float) -> None:
+        series = self._histograms.setdefault(name, {})
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(self._bounds.get(name, DEFAULT_BUCKETS))
+        histogram.observe(seconds)
+
+
+def _format(labels: _Labels) -> str:
+    """Formats a label tuple as ``{key="value",...}``"""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class MetricsServer:
+    __slots__ = ('registry', 'host', 'port', '_server')
+
+    def __init__(self, registry: Registry, host: str, port: int):
+        """Minimal HTTP endpoint answering every request with the registry in Prometheus format.
+
+        Args:
+            registry: The registry to expose.
+            host: Interface to listen on.
+            port: Port to listen on.
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> None:
+        """Starts listening"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    def close(self) -> None:
+        """Stops listening"""
+        if self._server:
+            self._server.close()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answers one scrape"""
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = self.registry.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+registry = Registry()
+registry.buckets("lock_wait_seconds", FAST_BUCKETS)
+registry.buckets("handler_seconds", FAST_BUCKETS)
+registry.buckets("embed_build_seconds", FAST_BUCKETS)
@@ -0,0 +1,180 @@
+import math
+import time
+import asyncio
+import discord
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+from .func import OWNER_PERMISSIONS
+from .rest import Priority, RestScheduler
+
+
+class RoomPool:
+    __slots__ = ('logger', 'rest', 'category_id', 'min_size', 'max_size', 'horizon',
+                 'claimed', 'missed', 'guild', '_rooms', '_rates', '_updated', '_wakeup', '_task')
+
+    def __init__(
+        self,
+        logger,
+        rest: RestScheduler,
+        category_id: int,
+        sizes: Iterable[int],
+        min_size: int,
+        max_size: int,
+        horizon: float
+    ):
+        """Keeps hidden, pre-created rooms of every size ready to be handed out on a lobby join.
+
+        The number of rooms kept per size follows the recent join rate: it is the number of
+        claims expected within ``horizon`` seconds, bounded by ``min_size`` and ``max_size``.
+
+        Args:
+            logger: Logger for recording events and errors.
+            rest: Scheduler for outbound Discord requests.
+            category_id: ID of the category where the hidden rooms are kept.
+            sizes: User limits to keep rooms for.
+            min_size: Rooms kept per size when nobody is joining.
+            max_size: Upper bound of rooms kept per size; 0 disables the pool.
+            horizon: Seconds of joins the pool should absorb without creating channels.
+        """
+        self.logger = logger
+        self.rest = rest
+        self.category_id = category_id
+        self.min_size = min_size
+        self.max_size = max_size
+        self.horizon = horizon
+        self.claimed = 0
+        self.missed = 0
+        self.guild: Optional[discord.Guild] = None
+        self._rooms: Dict[int, Deque[discord.VoiceChannel]] = {size: deque() for size in sizes}
+        self._rates: Dict[int, float] = {size: 0.0 for size in self._rooms}
+        self._updated: Dict[int, float] = {size: time.monotonic() for size in self._rooms}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the pool is configured to keep any rooms"""
+        return self.max_size > 0
+
+    def start(self, guild: discord.Guild) -> None:
+        """Adopts hidden rooms left over from a previous run and starts refilling the pool.
+
+        Args:
+            guild: The guild the rooms belong to.
+        """
+        self.guild = guild
+        category = guild.get_channel(self.category_id)
+        if isinstance(category, discord.CategoryChannel):
+            for channel in category.voice_channels:
+                if channel.user_limit in self._rooms and not channel.members and _is_pooled(channel):
+                    self._rooms[channel.user_limit].append(channel)
+        if self._task is None:
+            self._task = asyncio.create_task(self._refill_loop())
+
+    def close(self) -> None:
+        """Stops refilling the pool; the hidden rooms stay for the next run or ``start``"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for rooms in self._rooms.values():
+            rooms.clear()
+
+    def size(self, user_limit: int) -> int:
+        """Returns the number of rooms ready for a user limit"""
+        return len(self._rooms.get(user_limit, ()))
+
+    def target(self, user_limit: int) -> int:
+        """Returns the number of rooms the pool aims to keep for a user limit"""
+        expected = math.ceil(self._rate(user_limit, time.monotonic()) * self.horizon)
+        return max(self.min_size, min(self.max_size, expected))
+
+    async def claim(self, user_limit: int, member: discord.Member, category: Optional[discord.CategoryChannel]) -> Optional[discord.VoiceChannel]:
+        """Hands a ready room to a member with a single channel edit.
+
+        The edit moves the room into ``category`` and replaces the hiding overwrite with
+        the owner's permissions; moving the member is left to the caller.
+
+        Args:
+            user_limit: User limit of the requested room.
+            member: The future owner of the room.
+            category: Category the room is moved to.
+
+        Returns:
+            Optional[discord.VoiceChannel]: The claimed room, or None if the pool is empty or the edit failed.
+        """
+        self._record_claim(user_limit)
+        rooms = self._rooms.get(user_limit)
+        while rooms:
+            channel = rooms.popleft()
+            try:
+                await self.rest.submit(Priority.CHANNEL, f"channel:{channel.id}", "edit_channel", lambda: channel.edit(
+                    category=category,
+                    overwrites={member: discord.PermissionOverwrite(**OWNER_PERMISSIONS)}
+                ))
+            except discord.errors.NotFound:
+                continue
+            except Exception as e:
+                # The room is still hidden and intact, so it stays in the pool for the next claim
+                rooms.appendleft(channel)
+                await self.logger.error(f"🔴 Failed to claim pooled room {channel.id}: {e}")
+                return None
+            self.claimed += 1
+            return channel
+        self.missed += 1
+        return None
+
+    def _rate(self, user_limit: int, now: float) -> float:
+        """Returns the exponentially decayed claim rate (claims per second) of a user limit"""
+        return self._rates[user_limit] * math.exp(-(now - self._updated[user_limit]) / self.horizon)
+
+    def _record_claim(self, user_limit: int) -> None:
+        """Adds one claim to the rate of a user limit and wakes the refill task"""
+        if user_limit not in self._rates:
+            return
+        now = time.monotonic()
+        self._rates[user_limit] = self._rate(user_limit, now) + 1 / self.horizon
+        self._updated[user_limit] = now
+        self._wakeup.set()
+
+    async def _refill_loop(self) -> None:
+        """Creates or removes hidden rooms until every size matches its target"""
+        while True:
+            for user_limit, rooms in self._rooms.items():
+                try:
+                    while len(rooms) < self.target(user_limit):
+                        rooms.append(await self._create(user_limit))
+                    while len(rooms) > self.target(user_limit):
+                        channel = rooms.pop()
+                        await self.rest.submit(Priority.CHANNEL, f"channel:{channel.id}", "delete_channel", channel.delete)
+                except discord.errors.NotFound:
+                    pass
+                except Exception as e:
+                    await self.logger.error(f"🔴 Failed to refill the room pool for size {user_limit}: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.horizon)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _create(self, user_limit: int) -> discord.VoiceChannel:
+        """Creates one hidden room"""
+        guild = self.guild
+        return await self.rest.submit(Priority.CHANNEL, f"channels:{guild.id}", "create_channel", lambda: guild.create_voice_channel(
+            name=f"Room_{user_limit}",
+            category=guild.get_channel(self.category_id),
+            user_limit=user_limit,
+            overwrites={guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+        ))
+
+
+def _is_pooled(channel: discord.VoiceChannel) -> bool:
+    """Checks whether a channel is a room as ``_create`` leaves it: named after its size,
+    with a single overwrite hiding it from @everyone and no owner"""
+    overwrites = channel.overwrites
+    overwrite = overwrites.get(channel.guild.default_role)
+    return (
+        channel.name == f"Room_{channel.user_limit}"
+        and len(overwrites) == 1
+        and overwrite is not None
+        and overwrite.view_channel is False
+    )
@@ -0,0 +1,85 @@
+import re
+import discord
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Tuple, Union
+
+# Bulk deletion only accepts messages younger than 14 days; keep a margin for clock skew
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+BULK_DELETE_MAX_COUNT = 100
+
+_USER_MENTION = re.compile(r"<@!?(\d+)>")
+
+
+@dataclass(slots=True)
+class ReconcileReport:
+    restored: int = 0
+    restore_ms: float = 0.0
+    rooms_scanned: int = 0
+    messages_scanned: int = 0
+    states_rebuilt: int = 0
+    states_dropped: int = 0
+    listings_adopted: int = 0
+    channels_deleted: int = 0
+    messages_deleted: int = 0
+    elapsed_ms: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"scanned {self.rooms_scanned} rooms and {self.messages_scanned} messages in {self.elapsed_ms:.0f} ms, "
+            f"restored {self.restored} states from the store in {self.restore_ms:.1f} ms, rebuilt {self.states_rebuilt}, dropped {self.states_dropped}, "
+            f"adopted {self.listings_adopted} listings, deleted {self.channels_deleted} empty rooms "
+            f"and {self.messages_deleted} stale messages"
+        )
+
+
+def mentioned_user_ids(message: discord.Message) -> List[int]:
+    """Returns the IDs of the users listed in a recruitment message, in listing order.
+
+    Args:
+        message: A recruitment message sent by the bot.
+
+    Returns:
+        List[int]: IDs of the mentioned users (role mentions are ignored).
+    """
+    if not message.embeds:
+        return []
+    return [int(user_id) for field in message.embeds[0].fields for user_id in _USER_MENTION.findall(field.value or "")]
+
+
+def room_owner_id(channel: discord.VoiceChannel) -> int:
+    """Recovers the owner of a room from its permission overwrites.
+
+    The owner is the member that was granted ``move_members`` on creation; if there is
+    none, the first connected member takes over.
+
+    Args:
+        channel: A non-empty room.
+
+    Returns:
+        int: ID of the owner.
+    """
+    for target, overwrite in channel.overwrites.items():
+        if isinstance(target, discord.Member) and overwrite.move_members:
+            return target.id
+    return channel.members[0].id
+
+
+def split_for_bulk_delete(
+    messages: Iterable[Union[discord.Message, discord.PartialMessage]]
+) -> Tuple[List[List[Union[discord.Message, discord.PartialMessage]]], List[Union[discord.Message, discord.PartialMessage]]]:
+    """Splits messages into bulk-deletable chunks and messages that must be deleted one by one.
+
+    Args:
+        messages: Messages to delete.
+
+    Returns:
+        Tuple: Chunks of at most 100 recent messages, and the messages too old for bulk deletion.
+    """
+    cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE
+    recent = []
+    old = []
+    for message in messages:
+        (recent if message.created_at > cutoff else old).append(message)
+    chunks = [recent[i:i + BULK_DELETE_MAX_COUNT] for i in range(0, len(recent), BULK_DELETE_MAX_COUNT)]
+    return chunks, old
@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from .logger import LogPipeline, LogSink
+
+# Where a voice event starts or ends: ("lobby", size), ("room", channel ID), ("other", 0) or None outside voice
+ChannelRef = Optional[Tuple[str, int]]
+
+
+class _EventSink(LogSink):
+    __slots__ = ()
+
+    def write(self, records: List[tuple]) -> None:
+        """Appends the fields of each record as one compact JSON line"""
+        self.stream.write("".join(json.dumps(record[4], separators=(",", ":"), ensure_ascii=False) + "\n" for record in records))
+        self.stream.flush()
+
+
+class _Pseudonyms:
+    __slots__ = ('limit', '_ids', '_next')
+
+    def __init__(self, limit: int):
+        """Numbers snowflakes in order of first appearance, forgetting the least recently seen
+        beyond ``limit``; a forgotten snowflake gets a new number when it shows up again"""
+        self.limit = limit
+        self._ids: Dict[int, int] = {}
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get(self, snowflake: int) -> int:
+        index = self._ids.pop(snowflake, None)
+        if index is None:
+            index = self._next
+            self._next += 1
+            if len(self._ids) >= self.limit:
+                del self._ids[next(iter(self._ids))]
+        # Reinserting keeps the dict ordered from least to most recently seen
+        self._ids[snowflake] = index
+        return index
+
+
+class VoiceRecorder:
+    __slots__ = ('path', 'pipeline', 'started', '_key', '_members', '_rooms')
+
+    def __init__(self, path: str, capacity: int = 10000, max_ids: int = 100000):
+        """Append-only JSON-lines log of the voice events the cog receives, for replay.
+
+        Events go through a ``LogPipeline`` of their own, so recording costs the event
+        handler one buffer append. Member and room IDs are replaced by their order of
+        first appearance in the recording and channel statuses by a keyed digest, so a
+        recording can be shared without identifying anyone; the mapping only lives in
+        memory and keeps the ``max_ids`` most recently seen members and rooms.
+
+        Every run starts with a ``start`` line holding ``epoch`` (wall-clock start time);
+        the lines after it hold ``at`` (seconds since that start) and ``event``: ``voice``
+        with ``member``, ``before`` and ``after`` (``lobby:<size>``, ``room:<n>``, ``other``
+        or null), or ``status`` with ``channel`` and ``text``. Numbers restart with each
+        run, since the mapping of the previous process is gone.
+
+        Args:
+            path: File to append to.
+            capacity: Events buffered before the oldest are dropped.
+            max_ids: Members and rooms each remembered before the least recently seen are forgotten.
+        """
+        self.path = path
+        self.pipeline = LogPipeline([_EventSink(path=path)], capacity=capacity)
+        self.pipeline.attach()
+        self.started = time.monotonic()
+        self._key = os.urandom(16)
+        self._members = _Pseudonyms(max_ids)
+        self._rooms = _Pseudonyms(max_ids)
+        self._put({"event": "start", "epoch": round(time.time(), 3)})
+
+    def voice(self, member_id: int, before: ChannelRef, after: ChannelRef) -> None:
+        """Records a voice state update.
+
+        Args:
+            member_id: ID of the member whose voice state changed.
+            before: Where the member was.
+            after: Where the member is now.
+        """
+        self._put({"event": "voice", "member": self._members.get(member_id), "before": self._ref(before), "after": self._ref(after)})
+
+    def status(self, channel: ChannelRef, text: str) -> None:
+        """Records a voice channel status change.
+
+        Args:
+            channel: The channel whose status changed.
+            text: The new status.
+        """
+        digest = hashlib.blake2b(text.encode(), digest_size=4, key=self._key).hexdigest() if text else ""
+        self._put({"event": "status", "channel": self._ref(channel), "text": digest})
+
+    def close(self) -> None:
+        """Writes the buffered events and stops the writer thread"""
+        self.pipeline.detach()
+
+    def _put(self, fields: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        self.pipeline.put((time.time(), "recorder", logging.INFO, "", {"at": round(now - self.started, 3), **fields}))
+
+    def _ref(self, ref: ChannelRef) -> Optional[str]:
+        if ref is None:
+            return None
+        kind, value = ref
+        if kind == "room":
+            return f"room:{self._rooms.get(value)}"
+        return f"lobby:{value}" if kind == "lobby" else kind
@@ -0,0 +1,303 @@
+import time
+import asyncio
+import discord
+from .metrics import registry
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+
+class Priority(IntEnum):
+    """Priority classes of outbound requests, most urgent first"""
+    MOVE_MEMBER = 0
+    CHANNEL = 1
+    DELETE_LISTING = 2
+    EDIT_LISTING = 3
+
+
+@dataclass(slots=True)
+class _Request:
+    priority: Priority
+    bucket: str
+    operation: str
+    call: Callable[[], Awaitable[Any]]
+    merge_key: Optional[Hashable]
+    futures: List[asyncio.Future] = field(default_factory=list)
+    retries: int = 0
+
+
+# Queue of one priority class: requests of one bucket, mergeable or not
+_QueueKey = Tuple[str, bool]
+
+
+class _BucketState:
+    __slots__ = ('in_flight', 'blocked_until')
+
+    def __init__(self):
+        self.in_flight = 0
+        self.blocked_until = 0.0
+
+
+class RestScheduler:
+    __slots__ = ('logger', 'concurrency', 'max_queued_edits', 'max_retries',
+                 'shed', 'merged', 'rate_limited', '_queues', '_buckets', '_merge', '_sending', '_wakeup', '_task')
+
+    def __init__(
+        self,
+        logger,
+        concurrency: int = 1,
+        max_queued_edits: int = 20,
+        max_retries: int = 3
+    ):
+        """Central queue for Discord writes with priority classes.
+
+        Rate limits are left to py-cord's HTTP client, which reads each bucket's budget
+        from the response headers and waits before exhausting it. The scheduler only keeps
+        ``concurrency`` requests per bucket in flight, so a backlog waits here, where urgent
+        requests overtake cosmetic ones and listing edits are merged or shed. A 429 that
+        still reaches the scheduler pauses its bucket for the response's ``Retry-After``.
+
+        Buckets are named ``"<kind>:<id>"``, after the major parameter of the route.
+        Each priority class keeps one queue per bucket, and mergeable requests get a queue
+        of their own, so finding the next request only looks at the head of each queue and
+        shedding edits only at the front of one. Queues of a class are served round-robin.
+
+        Args:
+            logger: Logger for recording events and errors.
+            concurrency: Requests of one bucket sent at the same time.
+            max_queued_edits: Listing edits allowed to wait on one busy bucket before the oldest are shed.
+            max_retries: How many times a request answered with 429 is queued again.
+        """
+        self.logger = logger
+        self.concurrency = concurrency
+        self.max_queued_edits = max_queued_edits
+        self.max_retries = max_retries
+        self.shed = 0
+        self.merged = 0
+        self.rate_limited = 0
+        self._queues: Dict[Priority, Dict[_QueueKey, Deque[_Request]]] = {priority: {} for priority in Priority}
+        self._buckets: Dict[str, _BucketState] = {}
+        self._merge: Dict[Hashable, _Request] = {}
+        self._sending: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        priority: Priority,
+        bucket: str,
+        operation: str,
+        call: Callable[[], Awaitable[Any]],
+        merge_key: Optional[Hashable] = None
+    ) -> Any:
+        """Queues a request and waits for its result.
+
+        A request with a ``merge_key`` replaces a queued, not yet sent request with the
+        same key; both callers receive the result of the newer call.
+
+        Args:
+            priority: Priority class of the request.
+            bucket: Rate-limit bucket of the request, e.g. ``"messages:<channel_id>"``.
+            operation: Kind of call, e.g. ``"edit_channel"``, labelling its duration in ``rest_seconds``.
+            call: Coroutine function that performs the request.
+            merge_key: Key identifying requests that supersede each other.
+
+        Returns:
+            Any: The result of the call, or None if the request was shed.
+
+        Raises:
+            Exception: Whatever the call raised.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        queued = self._merge.get(merge_key) if merge_key is not None else None
+        if queued is not None:
+            queued.call = call
+            queued.futures.append(future)
+            self.merged += 1
+            registry.inc("edits_skipped_total", reason="merged")
+        else:
+            request = _Request(priority, bucket, operation, call, merge_key, [future])
+            self._queue(request).append(request)
+            if merge_key is not None:
+                self._merge[merge_key] = request
+                if priority == Priority.EDIT_LISTING:
+                    self._shed_edits(bucket)
+            self._wakeup.set()
+        return await future
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Returns the number of queued requests per priority class"""
+        return {priority.name: sum(map(len, queues.values())) for priority, queues in self._queues.items()}
+
+    def close(self) -> None:
+        """Stops the dispatcher and cancels every queued and in-flight request"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in self._sending:
+            task.cancel()
+        for queues in self._queues.values():
+            for queue in queues.values():
+                for request in queue:
+                    for future in request.futures:
+                        future.cancel()
+            queues.clear()
+        self._merge.clear()
+
+    def _queue(self, request: _Request) -> Deque[_Request]:
+        """Get or create the queue a request waits in; it is dropped again once empty"""
+        queues = self._queues[request.priority]
+        key = (request.bucket, request.merge_key is not None)
+        queue = queues.get(key)
+        if queue is None:
+            queue = queues[key] = deque()
+        return queue
+
+    def _bucket(self, name: str) -> _BucketState:
+        """Get or create the state of a bucket; it is dropped again once the bucket is idle"""
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = _BucketState()
+        return bucket
+
+    def _delay(self, name: str, now: float) -> Optional[float]:
+        """Returns how long a bucket is paused after a 429, 0 if a request may go now, or None while it is busy"""
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            return 0.0
+        if now < bucket.blocked_until:
+            return bucket.blocked_until - now
+        return 0.0 if bucket.in_flight < self.concurrency else None
+
+    def _shed_edits(self, bucket: str) -> None:
+        """Drops the oldest mergeable listing edits of a busy bucket beyond ``max_queued_edits``.
+
+        Only requests with a merge key are shed: they are superseded by a later edit of the
+        same message anyway, while a listing that is being sent must not be lost.
+        """
+        if self._delay(bucket, time.monotonic()) == 0:
+            return
+        queue = self._queues[Priority.EDIT_LISTING][(bucket, True)]
+        while len(queue) > self.max_queued_edits:
+            request = queue.popleft()
+            self._forget(request)
+            for future in request.futures:
+                if not future.done():
+                    future.set_result(None)
+            self.shed += 1
+            registry.inc("edits_skipped_total", reason="shed")
+
+    def _forget(self, request: _Request) -> None:
+        """Removes a request from the merge index once it can no longer absorb newer calls"""
+        if request.merge_key is not None and self._merge.get(request.merge_key) is request:
+            del self._merge[request.merge_key]
+
+    def _next(self, now: float) -> Tuple[Optional[_Request], Optional[float]]:
+        """Pops the most urgent request whose bucket can take it.
+
+        Returns:
+            Tuple[Optional[_Request], Optional[float]]: The request to send, or None and the
+            time until a paused bucket resumes (None if only a finishing request can free one).
+        """
+        wait = None
+        for queues in self._queues.values():
+            for key, queue in queues.items():
+                # Callers that gave up leave their requests behind; they are dropped unsent
+                while queue and all(future.done() for future in queue[0].futures):
+                    self._forget(queue.popleft())
+                if not queue:
+                    del queues[key]
+                    return None, 0.0
+                delay = self._delay(key[0], now)
+                if delay == 0:
+                    request = queue.popleft()
+                    self._forget(request)
+                    # The queue goes to the back of its class, so other buckets get their turn
+                    del queues[key]
+                    if queue:
+                        queues[key] = queue
+                    return request, None
+                if delay is not None:
+                    wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    async def _run(self) -> None:
+        """Sends queued requests in priority order as their buckets allow"""
+        while True:
+            request, wait = self._next(time.monotonic())
+            if request is not None:
+                self._bucket(request.bucket).in_flight += 1
+                task = asyncio.create_task(self._send(request))
+                self._sending.add(task)
+                task.add_done_callback(self._sending.discard)
+                continue
+            if wait == 0.0:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, request: _Request) -> None:
+        """Performs one request and resolves its callers, queueing it again after a 429"""
+        try:
+            with registry.time("rest_seconds", bucket=request.bucket.split(":", 1)[0], priority=request.priority.name, operation=request.operation):
+                result = await request.call()
+        except discord.errors.HTTPException as e:
+            if e.status == 429:
+                registry.inc("rest_rate_limited_total")
+            if e.status == 429 and request.retries < self.max_retries:
+                self.rate_limited += 1
+                request.retries += 1
+                bucket = self._bucket(request.bucket)
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + _retry_after(e))
+                await self.logger.info(f"🟠 Rate limited on {request.bucket}, retrying ({request.retries}/{self.max_retries}).")
+                self._queue(request).appendleft(request)
+                return
+            self._resolve(request, exception=e)
+        except asyncio.CancelledError:
+            for future in request.futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            self._resolve(request, exception=e)
+        else:
+            if request.merge_key is not None:
+                registry.inc("edits_sent_total")
+            self._resolve(request, result=result)
+        finally:
+            self._finish(request.bucket)
+
+    def _finish(self, name: str) -> None:
+        """Frees the slot of a finished request and wakes the dispatcher"""
+        bucket = self._buckets[name]
+        bucket.in_flight -= 1
+        if not bucket.in_flight and bucket.blocked_until <= time.monotonic():
+            del self._buckets[name]
+        self._wakeup.set()
+
+    @staticmethod
+    def _resolve(request: _Request, result: Any = None, exception: Optional[BaseException] = None) -> None:
+        """Passes the outcome of a request to every caller still waiting for it"""
+        for future in request.futures:
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+
+
+def _retry_after(error: discord.errors.HTTPException) -> float:
+    """Reads the retry delay of a 429 response, defaulting to one second"""
+    headers = getattr(error.response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", 1.0))
+    except (TypeError, ValueError):
+        return 1.0
+
@@ -0,0 +1,366 @@
+import os
+import json
+import socket
+import time
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from .func import RoomState
+from .backend import StateBackend, create_backend
+
+# Row of the rooms table: (channel_id, owner_id, message_id, value, comment, guild_id)
+_Row = Tuple[int, int, Optional[int], int, str, int]
+
+
+class BaseRoomStore(ABC):
+    __slots__ = ('logger', 'interval', 'on_lost', '_guilds', '_dirty', '_task', '_write_lock')
+
+    def __init__(self, logger, interval: float = 1.0):
+        """Durable copy of the room states with write-behind batching.
+
+        Event handlers only mark rooms as dirty; a background task writes all dirty rooms
+        in one batch every ``interval`` seconds.
+
+        Args:
+            logger: Logger for recording events and errors.
+            interval: Seconds between two batch flushes.
+        """
+        self.logger = logger
+        self.interval = interval
+        # Called with the guild ID when this process stops serving a guild it had claimed
+        self.on_lost: Optional[Callable[[int], None]] = None
+        self._guilds: Dict[int, Dict[int, RoomState]] = {}
+        self._dirty: Set[Tuple[int, int]] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+
+    @abstractmethod
+    async def load(self, guilds: Dict[int, Dict[int, RoomState]]) -> int:
+        """Opens the store and fills the room states of every guild with its stored rooms.
+
+        The dicts are kept as the source of later flushes, so they must be the cog's live
+        dicts. Rooms of guilds that are no longer configured stay in the store untouched.
+
+        Args:
+            guilds: Dictionary of room states per guild ID to fill.
+
+        Returns:
+            int: Number of restored rooms.
+        """
+
+    async def claim(self, guild_id: int) -> bool:
+        """Makes this process the one serving a guild.
+
+        Args:
+            guild_id: ID the guild is configured under.
+
+        Returns:
+            bool: True if the guild may be served, False if another process holds it.
+        """
+        return True
+
+    def holds(self, guild_id: int) -> bool:
+        """Checks whether this process currently serves a guild, i.e. a claim of it succeeded and was not lost"""
+        return True
+
+    def touch(self, guild_id: int, *channel_ids: int) -> None:
+        """Marks rooms as changed; deleted rooms are removed from the store on the next flush.
+
+        Args:
+            guild_id: ID the rooms' guild is configured under.
+            channel_ids: IDs of the changed rooms.
+        """
+        self._dirty.update((guild_id, channel_id) for channel_id in channel_ids)
+        if self._task is None and self._is_open():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def flush(self) -> None:
+        """Writes all dirty rooms in one batch"""
+        if not self._dirty or not self._is_open():
+            return
+        dirty = set(self._dirty)
+        upserts, deletes = self._collect()
+        async with self._write_lock:
+            try:
+                await self._persist(upserts, deletes)
+            except Exception as e:
+                self._dirty.update(dirty)
+                await self.logger.error(f"🔴 Failed to persist {len(dirty)} room states: {e}")
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stops the background flush and writes what is left"""
+
+    @abstractmethod
+    def _is_open(self) -> bool:
+        """Checks whether the store is loaded and not closed yet"""
+
+    @abstractmethod
+    async def _persist(self, upserts: List[_Row], deletes: List[Tuple[int, int]]) -> None:
+        """Writes one batch of rows to upsert and (channel ID, guild ID) pairs to delete"""
+
+    def _collect(self) -> Tuple[List[_Row], List[Tuple[int, int]]]:
+        """Takes the dirty rooms and turns them into rows to upsert and (channel ID, guild ID) pairs to delete"""
+        dirty, self._dirty = self._dirty, set()
+        upserts = []
+        deletes = []
+        for guild_id, channel_id in dirty:
+            state = self._guilds.get(guild_id, {}).get(channel_id)
+            if state is None:
+                deletes.append((channel_id, guild_id))
+            else:
+                upserts.append((channel_id, state.owner_id, state.message_id, state.value, state.comment, guild_id))
+        return upserts, deletes
+
+    async def _flush_loop(self) -> None:
+        """Flushes dirty rooms every ``interval`` seconds"""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+
+class RoomStore(BaseRoomStore):
+    __slots__ = ('path', '_conn', '_conn_lock', '_pending')
+
+    def __init__(self, path: str, logger, interval: float = 1.0):
+        """Room states in a local SQLite (WAL) database, written from a worker thread.
+
+        Args:
+            path: Path to the database file.
+            logger: Logger for recording events and errors.
+            interval: Seconds between two batch flushes.
+        """
+        super().__init__(logger, interval)
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        # Held by whichever thread writes; close waits for a flush running in a worker thread
+        self._conn_lock = threading.Lock()
+        # Batch of the flush in progress, written by close if its worker thread has not started yet
+        self._pending: Optional[Tuple[List[_Row], List[Tuple[int, int]]]] = None
+
+    async def load(self, guilds: Dict[int, Dict[int, RoomState]]) -> int:
+        return await asyncio.to_thread(self._load, guilds)
+
+    def _load(self, guilds: Dict[int, Dict[int, RoomState]]) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rooms ("
+            "channel_id INTEGER PRIMARY KEY, owner_id INTEGER NOT NULL, message_id INTEGER, "
+            "value INTEGER NOT NULL, comment TEXT NOT NULL, guild_id INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(rooms)")}
+        if "guild_id" not in columns:
+            # Databases of single-guild versions belong to the guild configured in .env
+            self._conn.execute("ALTER TABLE rooms ADD COLUMN guild_id INTEGER NOT NULL DEFAULT 0")
+        rows = self._conn.execute("SELECT guild_id, channel_id, owner_id, message_id, value, comment FROM rooms").fetchall()
+        restored = 0
+        for guild_id, channel_id, owner_id, message_id, value, comment in rows:
+            if guild_id in guilds:
+                guilds[guild_id][channel_id] = RoomState(owner_id=owner_id, message_id=message_id, value=value, comment=comment)
+                restored += 1
+        self._guilds = guilds
+        return restored
+
+    def close(self) -> None:
+        """Stops the background flush, writes what is left and closes the database.
+
+        The final write is synchronous so that it also completes during interpreter shutdown.
+        It waits for a flush already writing in a worker thread, and takes over the batch of
+        one that has not started yet, so no collected room is lost.
+        """
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        with self._conn_lock:
+            if self._conn is None:
+                return
+            upserts, deletes = self._collect()
+            if self._pending is not None:
+                # Rooms collected again since carry the newer state
+                newer = {(row[0], row[5]) for row in upserts}.union(deletes)
+                pending_upserts, pending_deletes = self._pending
+                upserts = [row for row in pending_upserts if (row[0], row[5]) not in newer] + upserts
+                deletes = [key for key in pending_deletes if key not in newer] + deletes
+                self._pending = None
+            try:
+                self._write(upserts, deletes)
+            finally:
+                self._conn.close()
+                self._conn = None
+
+    def _is_open(self) -> bool:
+        return self._conn is not None
+
+    async def _persist(self, upserts: List[_Row], deletes: List[Tuple[int, int]]) -> None:
+        self._pending = (upserts, deletes)
+        await asyncio.to_thread(self._write_pending, self._pending)
+
+    def _write_pending(self, batch: Tuple[List[_Row], List[Tuple[int, int]]]) -> None:
+        """Writes the batch of a flush in a worker thread, unless close has taken it over"""
+        with self._conn_lock:
+            if self._pending is not batch:
+                return
+            self._pending = None
+            if self._conn is not None:
+                self._write(*batch)
+
+    def _write(self, upserts: Iterable[tuple], deletes: Iterable[tuple]) -> None:
+        """Runs one write transaction; the caller holds ``_conn_lock``"""
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO rooms (channel_id, owner_id, message_id, value, comment, guild_id) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET owner_id=excluded.owner_id, message_id=excluded.message_id, "
+                "value=excluded.value, comment=excluded.comment, guild_id=excluded.guild_id",
+                upserts
+            )
+            self._conn.executemany("DELETE FROM rooms WHERE channel_id = ? AND guild_id = ?", deletes)
+
+
+class SharedRoomStore(BaseRoomStore):
+    __slots__ = ('backend', 'prefix', 'owner', 'lease_ttl', '_leases', '_open', '_renewer')
+
+    def __init__(self, backend: StateBackend, logger, interval: float = 1.0, lease_ttl: float = 15.0, prefix: str = "autoroomer"):
+        """Room states in a backend shared by all bot processes, so any of them can take over a guild.
+
+        A guild's rooms are read when its lease is claimed, and only guilds whose lease
+        this process holds are written. Leases are renewed every third of ``lease_ttl``;
+        if a process dies, another one can claim its guilds once the leases expire. A lease
+        that could not be renewed for ``lease_ttl`` seconds, e.g. while the backend is
+        unreachable, is given up and reported through ``on_lost``, since another process
+        may hold it by then.
+
+        Args:
+            backend: The shared backend.
+            logger: Logger for recording events and errors.
+            interval: Seconds between two batch flushes.
+            lease_ttl: Seconds a guild stays claimed without renewal.
+            prefix: Prefix of every key.
+        """
+        super().__init__(logger, interval)
+        self.backend = backend
+        self.prefix = prefix
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_ttl = lease_ttl
+        # Guilds claimed by this process, with the time their lease was last taken or renewed
+        self._leases: Dict[int, float] = {}
+        self._open = False
+        self._renewer: Optional[asyncio.Task] = None
+
+    async def load(self, guilds: Dict[int, Dict[int, RoomState]]) -> int:
+        """Connects to the backend; rooms are read per guild by ``claim``"""
+        await self.backend.connect()
+        self._guilds = guilds
+        self._open = True
+        return 0
+
+    async def claim(self, guild_id: int) -> bool:
+        if not self.holds(guild_id):
+            # The lease runs from before the request, so it is never assumed to last longer than it does
+            requested = time.monotonic()
+            if not await self.backend.acquire(self._lease_key(guild_id), self.owner, self.lease_ttl):
+                return False
+            self._leases[guild_id] = requested
+            room_states = self._guilds.setdefault(guild_id, {})
+            for channel_id, encoded in (await self.backend.read_hash(self._rooms_key(guild_id))).items():
+                owner_id, message_id, value, comment = json.loads(encoded)
+                room_states.setdefault(int(channel_id), RoomState(owner_id=owner_id, message_id=message_id, value=value, comment=comment))
+        if self._renewer is None:
+            self._renewer = asyncio.create_task(self._renew_loop())
+        return True
+
+    def holds(self, guild_id: int) -> bool:
+        renewed = self._leases.get(guild_id)
+        return renewed is not None and time.monotonic() - renewed < self.lease_ttl
+
+    def close(self) -> None:
+        """Stops the background tasks; what is left is written and the leases are released in the background"""
+        for task in (self._task, self._renewer):
+            if task:
+                task.cancel()
+        self._task = self._renewer = None
+        if self._open:
+            self._open = False
+            try:
+                asyncio.get_running_loop().create_task(self._shutdown())
+            except RuntimeError:
+                pass  # The event loop is gone; the leases expire on their own
+
+    def _is_open(self) -> bool:
+        return self._open
+
+    async def _persist(self, upserts: List[_Row], deletes: List[Tuple[int, int]]) -> None:
+        writes: Dict[int, Tuple[Dict[str, str], List[str]]] = {}
+        for channel_id, owner_id, message_id, value, comment, guild_id in upserts:
+            if self.holds(guild_id):
+                writes.setdefault(guild_id, ({}, []))[0][str(channel_id)] = json.dumps([owner_id, message_id, value, comment])
+        for channel_id, guild_id in deletes:
+            if self.holds(guild_id):
+                writes.setdefault(guild_id, ({}, []))[1].append(str(channel_id))
+        await self.backend.write_hashes([(self._rooms_key(guild_id), updates, removed) for guild_id, (updates, removed) in writes.items()])
+
+    async def _shutdown(self) -> None:
+        """Writes the remaining rooms, releases the leases and disconnects"""
+        try:
+            upserts, deletes = self._collect()
+            await self._persist(upserts, deletes)
+            for guild_id in self._leases:
+                await self.backend.release(self._lease_key(guild_id), self.owner)
+        except Exception as e:
+            await self.logger.error(f"🔴 Failed to hand over the room states: {e}")
+        finally:
+            self._leases.clear()
+            await self.backend.close()
+
+    async def _renew_loop(self) -> None:
+        """Renews the leases of the claimed guilds and gives up the ones that were taken over or ran out"""
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            for guild_id in list(self._leases):
+                requested = time.monotonic()
+                try:
+                    renewed = await self.backend.acquire(self._lease_key(guild_id), self.owner, self.lease_ttl)
+                except Exception as e:
+                    await self.logger.error(f"🔴 Failed to renew the lease of guild {guild_id}: {e}")
+                    if not self.holds(guild_id):
+                        await self._lose(guild_id, "its lease expired while the state backend was unreachable")
+                    continue
+                if renewed:
+                    self._leases[guild_id] = requested
+                else:
+                    await self._lose(guild_id, "it was taken over by another process")
+
+    async def _lose(self, guild_id: int, reason: str) -> None:
+        """Stops serving a guild whose lease is no longer held"""
+        if self._leases.pop(guild_id, None) is None:
+            return
+        await self.logger.error(f"🔴 Guild {guild_id} is no longer served here: {reason}.")
+        if self.on_lost is not None:
+            self.on_lost(guild_id)
+
+    def _rooms_key(self, guild_id: int) -> str:
+        return f"{self.prefix}:rooms:{guild_id}"
+
+    def _lease_key(self, guild_id: int) -> str:
+        return f"{self.prefix}:lease:{guild_id}"
+
+
+def open_store(config, logger) -> BaseRoomStore:
+    """Creates the room store selected by ``STATE_BACKEND``.
+
+    Args:
+        config: The bot's configuration.
+        logger: Logger for recording events and errors.
+
+    Returns:
+        BaseRoomStore: The SQLite store for ``sqlite``, otherwise a shared store on the named backend.
+    """
+    if config.state_backend == "sqlite":
+        return RoomStore(config.state_db, logger, config.state_flush_interval)
+    return SharedRoomStore(create_backend(config.state_backend), logger, config.state_flush_interval, config.state_lease_ttl)
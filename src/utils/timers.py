@@ -0,0 +1,119 @@
+import math
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+
+class _Timer:
+    __slots__ = ('key', 'callback', 'rounds', 'slot')
+
+    def __init__(self, key: Hashable, callback: Callable[[], Awaitable[None]], rounds: int, slot: int):
+        self.key = key
+        self.callback = callback
+        self.rounds = rounds
+        self.slot = slot
+
+
+class TimerWheel:
+    __slots__ = ('logger', 'tick', 'fired', '_slots', '_timers', '_cursor', '_task', '_running')
+
+    def __init__(self, logger, tick: float = 1.0, slots: int = 512):
+        """Keyed one-shot timers on a hashed timer wheel driven by a single task.
+
+        A timer lands in the slot its deadline falls into, with the number of full turns
+        of the wheel still to wait. Scheduling and cancelling are dictionary operations,
+        and each tick only looks at the timers of one slot, so tens of thousands of
+        pending timers cost no more than their entries. Timers fire up to one ``tick``
+        late. The driving task only runs while timers are pending.
+
+        Args:
+            logger: Logger for recording events and errors.
+            tick: Resolution in seconds.
+            slots: Slots of the wheel; timers due within ``tick * slots`` need no extra turns.
+        """
+        self.logger = logger
+        self.tick = tick
+        self.fired = 0
+        self._slots: List[Dict[Hashable, _Timer]] = [{} for _ in range(slots)]
+        self._timers: Dict[Hashable, _Timer] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], Awaitable[None]]) -> None:
+        """Runs a callback after a delay, replacing the pending timer of the same key.
+
+        Args:
+            key: Identifies the timer, e.g. ``("idle", channel_id)``.
+            delay: Seconds to wait.
+            callback: Coroutine function to run; it runs as a task of its own.
+        """
+        self.cancel(key)
+        # The next tick may be due at any moment, so one more tick keeps timers from firing early
+        ticks = math.ceil(max(0.0, delay) / self.tick) + 1
+        slot = (self._cursor + ticks) % len(self._slots)
+        self._slots[slot][key] = self._timers[key] = _Timer(key, callback, (ticks - 1) // len(self._slots), slot)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def cancel(self, key: Hashable) -> bool:
+        """Drops the pending timer of a key.
+
+        Returns:
+            bool: True if a timer was pending.
+        """
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._slots[timer.slot][key]
+        return True
+
+    def close(self) -> None:
+        """Drops every pending timer and cancels the callbacks still running"""
+        self._timers.clear()
+        for slot in self._slots:
+            slot.clear()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
+
+    async def _run(self) -> None:
+        """Advances the wheel one slot per tick, catching up on ticks missed while the loop was busy"""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        try:
+            while self._timers:
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+                while next_tick <= loop.time() and self._timers:
+                    next_tick += self.tick
+                    self._advance()
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    def _advance(self) -> None:
+        """Moves the cursor to the next slot and starts the timers due in it"""
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+        for key, timer in list(slot.items()):
+            if timer.rounds:
+                timer.rounds -= 1
+                continue
+            del slot[key], self._timers[key]
+            self.fired += 1
+            task = asyncio.create_task(self._fire(timer))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, timer: _Timer) -> None:
+        try:
+            await timer.callback()
+        except Exception as e:
+            await self.logger.error(f"🔴 Error in timer {timer.key}: {e}")
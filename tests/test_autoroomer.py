@@ -0,0 +1,44 @@
+import asyncio
+from tools.simulation import LoadTest, random_traffic
+
+
+def test_concurrent_traffic_never_overfills_rooms():
+    """Random joins and leaves leave no room above its limit and no lock behind"""
+    async def main():
+        test = LoadTest(limits="none", seed=1)
+        report = await test.run(random_traffic(500, 100, sorted(test.world.lobbies), seed=1))
+        overfull = [room for room in test.world.rooms() if len(room._fake_members) > room.user_limit]
+        test.close()
+        return report, overfull
+
+    report, overfull = asyncio.run(main())
+    assert overfull == []
+    assert report.locks_left == 0
+
+
+def test_lost_lease_drops_the_guild_and_reclaims_it():
+    """Rooms of a guild whose lease cannot be renewed are dropped, then restored once the backend is back"""
+    async def main():
+        test = LoadTest(limits="none", state_backend="memory", state_lease_ttl=0.3)
+        await test.run(random_traffic(200, 100, sorted(test.world.lobbies), seed=2))
+        cog = test.cog
+        guild_id, guild = next(iter(cog.guilds.items()))
+        rooms = set(guild.room_states)
+        backend = cog.store.backend
+
+        async def unreachable(*args):
+            raise ConnectionError("backend down")
+
+        backend.acquire = unreachable
+        await asyncio.sleep(0.6)
+        during_outage = (cog.store.holds(guild_id), len(guild.room_states))
+        del backend.acquire
+        await asyncio.sleep(0.5)
+        after_recovery = (cog.store.holds(guild_id), guild.reconciled, set(guild.room_states))
+        test.close()
+        return rooms, during_outage, after_recovery
+
+    rooms, during_outage, after_recovery = asyncio.run(main())
+    assert rooms
+    assert during_outage == (False, 0)
+    assert after_recovery == (True, True, rooms)
@@ -0,0 +1,58 @@
+import asyncio
+from src.utils.debounce import EditScheduler
+from tools.fakes import FakeLogger
+
+
+def test_burst_is_flushed_once_with_the_latest_edit():
+    """Edits scheduled within the window collapse into the last one"""
+    async def main():
+        edits = EditScheduler(0.05, FakeLogger())
+        sent = []
+        for value in range(3):
+            edits.schedule(1, lambda value=value: _append(sent, value))
+        await asyncio.sleep(0.1)
+        return edits, sent
+
+    edits, sent = asyncio.run(main())
+    assert sent == [2]
+    assert not edits._tasks
+
+
+def test_cancel_drops_the_pending_edit():
+    """A cancelled room sends nothing, while other rooms still flush"""
+    async def main():
+        edits = EditScheduler(0.05, FakeLogger())
+        sent = []
+        edits.schedule(1, lambda: _append(sent, 1))
+        edits.schedule(2, lambda: _append(sent, 2))
+        edits.cancel(1)
+        await asyncio.sleep(0.1)
+        return edits, sent
+
+    edits, sent = asyncio.run(main())
+    assert sent == [2]
+    assert not edits._tasks
+
+
+def test_edit_scheduled_during_a_flush_is_sent_afterwards():
+    """An edit arriving while the previous one is being sent gets a window of its own"""
+    async def main():
+        edits = EditScheduler(0.02, FakeLogger())
+        sent = []
+
+        async def slow_flush():
+            edits.schedule(1, lambda: _append(sent, "second"))
+            await asyncio.sleep(0.01)
+            sent.append("first")
+
+        edits.schedule(1, slow_flush)
+        await asyncio.sleep(0.1)
+        return edits, sent
+
+    edits, sent = asyncio.run(main())
+    assert sent == ["first", "second"]
+    assert not edits._tasks
+
+
+async def _append(sent, value):
+    sent.append(value)
@@ -0,0 +1,32 @@
+import asyncio
+from src.utils.func import Message
+from tools.simulation import LoadTest
+
+
+def test_unchanged_listing_is_not_edited():
+    """Updates rendering the same fields as the last sent listing send no edit"""
+    async def main():
+        test = LoadTest(limits="none")
+        await test.setup()
+        world = test.world
+        member = test.members[0]
+        world.set_voice(member, world.lobbies[2])
+        await test.drain()
+        guild = next(iter(test.cog.guilds.values()))
+        room = member.voice_channel
+        state = guild.room_states[room.id]
+
+        async def update():
+            await Message.update_message(test.logger, test.cog.rest, guild.localization, room, state, state.message)
+            return world.http.calls["edit_message"]
+
+        edits = [world.http.calls["edit_message"], await update()]
+        state.comment = "ranked only"
+        edits.append(await update())
+        edits.append(await update())
+        test.close()
+        return edits, test.logger.errors
+
+    edits, errors = asyncio.run(main())
+    assert edits == [0, 0, 1, 1]
+    assert errors == []
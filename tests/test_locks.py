@@ -0,0 +1,64 @@
+import asyncio
+from src.utils.locks import LockTable
+
+
+def test_acquire_many_takes_keys_in_order_without_deadlock():
+    """Two callers locking the same keys in opposite orders both finish"""
+    async def main():
+        locks = LockTable()
+        order = []
+
+        async def worker(name, keys):
+            held = await locks.acquire_many(*keys)
+            order.append((name, held))
+            await asyncio.sleep(0.01)
+            locks.release_many(held)
+
+        await asyncio.wait_for(asyncio.gather(worker("a", (1, 2, 3)), worker("b", (3, 2, 1))), timeout=1.0)
+        return locks, order
+
+    locks, order = asyncio.run(main())
+    assert [held for _, held in order] == [[1, 2, 3], [1, 2, 3]]
+    assert len(locks) == 0
+    assert locks.contended == 1
+
+
+def test_acquire_many_releases_taken_locks_when_cancelled():
+    """A caller cancelled while waiting for its second key gives back the first"""
+    async def main():
+        locks = LockTable()
+        await locks.acquire(2)
+        waiter = asyncio.create_task(locks.acquire_many(1, 2))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        locks.release(2)
+        return locks
+
+    locks = asyncio.run(main())
+    assert len(locks) == 0
+    assert locks.waiting() == 0
+
+
+def test_cancelled_uncontended_acquire_frees_its_entry():
+    """An acquire of an unlocked lock that still has to wait leaves no entry behind when cancelled"""
+    async def main():
+        locks = LockTable()
+        await locks.acquire("room")
+        woken = asyncio.create_task(locks.acquire("room"))
+        await asyncio.sleep(0)
+
+        async def release_and_acquire():
+            # The lock is unlocked now, but the woken waiter has not run yet
+            locks.release("room")
+            await locks.acquire("room")
+
+        late = asyncio.create_task(release_and_acquire())
+        await asyncio.sleep(0)
+        late.cancel()
+        await asyncio.gather(late, return_exceptions=True)
+        await woken
+        locks.release("room")
+        return locks
+
+    assert len(asyncio.run(main())) == 0
@@ -0,0 +1,81 @@
+import asyncio
+import discord
+from src.utils.pool import RoomPool
+from src.utils.rest import RestScheduler
+from tools.fakes import FakeDiscord, FakeLogger, FakeResponse
+
+
+async def _hidden_room(world: FakeDiscord, name: str, user_limit: int, owner=None) -> discord.VoiceChannel:
+    overwrites = {world.guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+    if owner is not None:
+        overwrites[owner] = discord.PermissionOverwrite(connect=True)
+    return await world.guild.create_voice_channel(name, category=world.category_create_room, user_limit=user_limit, overwrites=overwrites)
+
+
+def _pool(world: FakeDiscord, logger: FakeLogger) -> RoomPool:
+    return RoomPool(logger, RestScheduler(logger), world.category_create_room.id, (2, 3), min_size=1, max_size=1, horizon=60.0)
+
+
+def test_start_adopts_only_rooms_the_pool_created():
+    """Renamed or owned hidden rooms stay out of the pool"""
+    async def main():
+        world = FakeDiscord()
+        member = world.add_members(1)[0]
+        pooled = await _hidden_room(world, "Room_2", 2)
+        await _hidden_room(world, "Private", 3)
+        await _hidden_room(world, "Room_3", 3, owner=member)
+        pool = _pool(world, FakeLogger())
+        pool.start(world.guild)
+        adopted = {size: list(pool._rooms[size]) for size in (2, 3)}
+        pool.close()
+        return pooled, adopted
+
+    pooled, adopted = asyncio.run(main())
+    assert adopted == {2: [pooled], 3: []}
+
+
+def test_failed_claim_keeps_the_room_in_the_pool():
+    """A room whose edit fails is put back for the next claim"""
+    async def main():
+        world = FakeDiscord()
+        member = world.add_members(1)[0]
+        logger = FakeLogger()
+        room = await _hidden_room(world, "Room_2", 2)
+        pool = _pool(world, logger)
+        pool.start(world.guild)
+
+        async def failing_edit(**kwargs):
+            raise discord.errors.HTTPException(FakeResponse(500, "Internal Server Error"), "try again")
+
+        room.edit = failing_edit
+        failed = await pool.claim(2, member, world.category_find)
+        size_after_failure = pool.size(2)
+        del room.edit
+        claimed = await pool.claim(2, member, world.category_find)
+        pool.close()
+        return world, room, failed, size_after_failure, claimed, logger.errors
+
+    world, room, failed, size_after_failure, claimed, errors = asyncio.run(main())
+    assert failed is None
+    assert size_after_failure == 1
+    assert claimed is room
+    assert room.category_id == world.category_find.id
+    assert len(errors) == 1
+
+
+def test_claim_skips_rooms_deleted_meanwhile():
+    """A pooled room that no longer exists is dropped and the next one is handed out"""
+    async def main():
+        world = FakeDiscord()
+        member = world.add_members(1)[0]
+        gone = await _hidden_room(world, "Room_2", 2)
+        kept = await _hidden_room(world, "Room_2", 2)
+        pool = _pool(world, FakeLogger())
+        pool.start(world.guild)
+        await gone.delete()
+        claimed = await pool.claim(2, member, world.category_find)
+        pool.close()
+        return kept, claimed
+
+    kept, claimed = asyncio.run(main())
+    assert claimed is kept
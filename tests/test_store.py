@@ -0,0 +1,144 @@
+import asyncio
+from src.utils.backend import MemoryBackend, RedisBackend
+from src.utils.func import RoomState
+from src.utils.store import RoomStore, SharedRoomStore
+from tools.fakes import FakeLogger, FakeRedisServer
+
+
+def test_sqlite_store_restores_rooms_after_restart(tmp_path):
+    """Rooms touched before close are loaded again by the next process; deleted ones are gone"""
+    path = tmp_path / "rooms.db"
+
+    async def first_run():
+        store = RoomStore(str(path), FakeLogger())
+        rooms = {}
+        await store.load({1: rooms})
+        rooms[10] = RoomState(owner_id=100, message_id=1000, value=1, comment="hi")
+        rooms[11] = RoomState(owner_id=101, message_id=None, value=0, comment="")
+        store.touch(1, 10, 11)
+        await store.flush()
+        del rooms[11]
+        rooms[10].comment = "changed"
+        store.touch(1, 10, 11)
+        store.close()
+
+    async def second_run():
+        store = RoomStore(str(path), FakeLogger())
+        rooms = {}
+        restored = await store.load({1: rooms})
+        store.close()
+        return restored, rooms
+
+    asyncio.run(first_run())
+    restored, rooms = asyncio.run(second_run())
+    assert restored == 1
+    assert rooms == {10: RoomState(owner_id=100, message_id=1000, value=1, comment="changed")}
+
+
+def test_shared_store_restores_rooms_when_claiming():
+    """A process claiming a guild reads the rooms the previous holder wrote"""
+    async def main():
+        backend = MemoryBackend()
+        previous = SharedRoomStore(backend, FakeLogger())
+        rooms = {}
+        await previous.load({1: rooms})
+        assert await previous.claim(1)
+        rooms[10] = RoomState(owner_id=100, message_id=1000, value=1, comment="")
+        previous.touch(1, 10)
+        await previous._shutdown()
+
+        store = SharedRoomStore(backend, FakeLogger())
+        restored = {}
+        await store.load({1: restored})
+        assert await store.claim(1)
+        return restored
+
+    assert asyncio.run(main()) == {10: RoomState(owner_id=100, message_id=1000, value=1, comment="")}
+
+
+def test_lease_is_given_up_when_renewal_keeps_failing():
+    """A lease that cannot be renewed for its TTL is dropped and reported once"""
+    async def main():
+        backend = MemoryBackend()
+        store = SharedRoomStore(backend, FakeLogger(), lease_ttl=0.15)
+        lost = []
+        store.on_lost = lost.append
+        await store.load({1: {}})
+        assert await store.claim(1)
+
+        async def unreachable(*args):
+            raise ConnectionError("backend down")
+
+        backend.acquire = unreachable
+        await asyncio.sleep(0.1)
+        still_held = store.holds(1)
+        await asyncio.sleep(0.2)
+        store.close()
+        return still_held, store.holds(1), lost
+
+    still_held, held, lost = asyncio.run(main())
+    assert still_held
+    assert not held
+    assert lost == [1]
+
+
+def test_lease_taken_over_by_another_process_is_reported():
+    """A renewal refused by the backend drops the lease right away"""
+    async def main():
+        backend = MemoryBackend()
+        store = SharedRoomStore(backend, FakeLogger(), lease_ttl=0.15)
+        lost = []
+        store.on_lost = lost.append
+        await store.load({1: {}})
+        assert await store.claim(1)
+        backend.leases[store._lease_key(1)] = ("other", float("inf"))
+        await asyncio.sleep(0.1)
+        store.close()
+        return store.holds(1), lost
+
+    assert asyncio.run(main()) == (False, [1])
+
+
+def test_redis_leases_are_exclusive_and_released_by_their_owner_only():
+    """Lease scripts compare the owner before renewing or deleting"""
+    async def main():
+        server = FakeRedisServer()
+        await server.start()
+        first, second = RedisBackend(server.url), RedisBackend(server.url + "/1")
+        try:
+            results = [
+                await first.acquire("lease", "a", 1.0),
+                await second.acquire("lease", "b", 1.0),
+                await first.acquire("lease", "a", 1.0),
+            ]
+            await second.release("lease", "b")
+            results.append(await second.acquire("lease", "b", 1.0))
+            await first.release("lease", "a")
+            results.append(await second.acquire("lease", "b", 1.0))
+        finally:
+            await first.close()
+            await second.close()
+            server.close()
+        return results
+
+    assert asyncio.run(main()) == [True, False, True, False, True]
+
+
+def test_redis_backend_reconnects_after_a_cancelled_call():
+    """A pipeline abandoned halfway does not leave replies for the next command"""
+    async def main():
+        server = FakeRedisServer()
+        await server.start()
+        backend = RedisBackend(server.url)
+        try:
+            await backend.write_hashes([("rooms", {"10": "x"}, [])])
+            call = asyncio.create_task(backend.execute(*[("PING",)] * 1000))
+            await asyncio.sleep(0)
+            call.cancel()
+            await asyncio.gather(call, return_exceptions=True)
+            return await backend.read_hash("rooms")
+        finally:
+            await backend.close()
+            server.close()
+
+    assert asyncio.run(main()) == {"10": "x"}
@@ -0,0 +1,649 @@
+import time
+import asyncio
+import logging
+import discord
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime, timezone
+from itertools import count
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from src.utils.backend import ACQUIRE_SCRIPT, RELEASE_SCRIPT
+from src.utils.guilds import load_guild_configs
+
+
+# Discord's route limits per bucket kind as (requests, seconds)
+DEFAULT_LIMITS: Dict[str, Tuple[int, float]] = {
+    "members": (10, 10.0),
+    "channels": (5, 10.0),
+    "channel": (5, 5.0),
+    "messages": (5, 5.0),
+}
+
+
+class Bucket:
+    __slots__ = ('capacity', 'per', 'tokens', 'updated')
+
+    def __init__(self, capacity: int, per: float):
+        """Token bucket standing in for one Discord rate-limit bucket.
+
+        Args:
+            capacity: Number of requests allowed per window.
+            per: Length of the window in seconds.
+        """
+        self.capacity = capacity
+        self.per = per
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def delay(self, now: float) -> float:
+        """Returns how long to wait before the next request may be sent (0 if it may go now)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.per)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) * self.per / self.capacity
+
+    def take(self) -> None:
+        """Consumes one request from the budget"""
+        self.tokens -= 1
+
+
+class FakeResponse:
+    __slots__ = ('status', 'reason', 'headers')
+
+    def __init__(self, status: int, reason: str, headers: Optional[Dict[str, str]] = None):
+        """Minimal stand-in for an aiohttp response, as read by discord.HTTPException"""
+        self.status = status
+        self.reason = reason
+        self.headers = headers or {}
+
+
+def not_found(what: str) -> discord.errors.NotFound:
+    """Builds the NotFound error Discord answers for a missing object"""
+    return discord.errors.NotFound(FakeResponse(404, "Not Found"), {"message": f"Unknown {what}", "code": 10003})
+
+
+class FakeHTTPBackend:
+    __slots__ = ('limits', 'default_limit', 'latency', 'client_limiter', 'calls', 'rate_limited', '_buckets')
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[int, float]]] = None,
+        default_limit: Tuple[int, float] = (5, 5.0),
+        latency: float = 0.0,
+        client_limiter: bool = False
+    ):
+        """Offline Discord REST endpoint that enforces a token bucket per rate-limit bucket.
+
+        Args:
+            limits: Limits per bucket kind as ``(requests, seconds)``.
+            default_limit: Limit for bucket kinds missing from ``limits``.
+            latency: Simulated round-trip time of every request in seconds.
+            client_limiter: Wait for an exhausted bucket as py-cord's HTTP client does,
+                instead of answering with a 429.
+        """
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.default_limit = default_limit
+        self.latency = latency
+        self.client_limiter = client_limiter
+        self.calls: Counter = Counter()
+        self.rate_limited = 0
+        self._buckets: Dict[str, Bucket] = {}
+
+    def call(self, bucket: str, result: Any = None) -> Callable[[], Awaitable[Any]]:
+        """Returns a coroutine function performing one request against a bucket, for use with RestScheduler.submit"""
+        return lambda: self.request(bucket, result)
+
+    async def request(self, bucket: str, result: Any = None, op: Optional[str] = None) -> Any:
+        """Performs one request.
+
+        Args:
+            bucket: Rate-limit bucket of the request, e.g. ``"messages:1"``.
+            result: Value returned on success.
+            op: Name the request is counted under in ``calls``; defaults to the bucket kind.
+
+        Returns:
+            Any: ``result``.
+
+        Raises:
+            discord.errors.HTTPException: With status 429 if the bucket is exhausted and there is no client limiter.
+        """
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        kind = bucket.split(":", 1)[0]
+        limiter = self._buckets.get(bucket)
+        if limiter is None:
+            limiter = self._buckets[bucket] = Bucket(*self.limits.get(kind, self.default_limit))
+        retry_after = limiter.delay(time.monotonic())
+        while retry_after and self.client_limiter:
+            await asyncio.sleep(retry_after)
+            retry_after = limiter.delay(time.monotonic())
+        if retry_after:
+            self.rate_limited += 1
+            response = FakeResponse(429, "Too Many Requests", {"Retry-After": f"{retry_after:.3f}"})
+            raise discord.errors.HTTPException(response, {"message": "You are being rate limited.", "code": 0})
+        limiter.take()
+        self.calls[op or kind] += 1
+        return result
+
+
+class FakeLogger:
+    __slots__ = ('errors', 'echo')
+
+    def __init__(self, echo: bool = False):
+        """Logger with the AsyncLogger interface that keeps errors for the report.
+
+        Args:
+            echo: Whether to print every record.
+        """
+        self.errors: List[str] = []
+        self.echo = echo
+
+    def is_enabled(self, level: int) -> bool:
+        return level >= logging.INFO
+
+    async def debug(self, message: str, **fields) -> None:
+        pass
+
+    async def info(self, message: str, **fields) -> None:
+        if self.echo:
+            print(message, fields or "")
+
+    async def error(self, message: str, **fields) -> None:
+        self.errors.append(message)
+        if self.echo:
+            print(message, fields or "")
+
+
+class FakeUser:
+    __slots__ = ('id',)
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+class FakeRole:
+    __slots__ = ('id', 'name')
+
+    def __init__(self, role_id: int, name: str):
+        """Role usable as a key of permission overwrites, like discord.Role"""
+        self.id = role_id
+        self.name = name
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FakeRole) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class FakeInvite:
+    __slots__ = ('code', 'url')
+
+    def __init__(self, code: str):
+        self.code = code
+        self.url = f"https://discord.gg/{code}"
+
+
+class FakeMember(discord.Member):
+    id = 0
+    guild = None
+
+    def __init__(self, world: 'FakeDiscord', member_id: int):
+        """Guild member whose moves go through the fake REST layer and produce voice events"""
+        self.world = world
+        self.id = member_id
+        self.guild = world.guild
+        self.voice_channel: Optional['FakeVoiceChannel'] = None
+        self.self_mute = False
+        self.self_deaf = False
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FakeMember) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self) -> str:
+        return f"<FakeMember id={self.id}>"
+
+    @property
+    def voice(self) -> Optional[SimpleNamespace]:
+        if self.voice_channel is None:
+            return None
+        return SimpleNamespace(channel=self.voice_channel, self_mute=self.self_mute, self_deaf=self.self_deaf, deaf=False)
+
+    async def move_to(self, channel: Optional['FakeVoiceChannel'], **kwargs) -> None:
+        await self.world.http.request(f"members:{self.guild.id}", op="move_member")
+        if channel is not None and channel.id not in self.world.channels:
+            raise not_found("Channel")
+        if self.voice_channel is None:
+            raise discord.errors.HTTPException(FakeResponse(400, "Bad Request"), "Target user is not connected to voice.")
+        self.world.set_voice(self, channel)
+
+
+class FakeCategory(discord.CategoryChannel):
+    def __init__(self, world: 'FakeDiscord', category_id: int, name: str):
+        self.world = world
+        self.id = category_id
+        self.name = name
+        self.guild = world.guild
+
+    def __repr__(self) -> str:
+        return f"<FakeCategory id={self.id} name={self.name!r}>"
+
+    @property
+    def voice_channels(self) -> List['FakeVoiceChannel']:
+        return [channel for channel in self.world.channels.values() if isinstance(channel, FakeVoiceChannel) and channel.category_id == self.id]
+
+
+class FakeVoiceChannel(discord.VoiceChannel):
+    def __init__(self, world: 'FakeDiscord', channel_id: int, name: str, category_id: Optional[int], user_limit: int, overwrites: Optional[dict] = None):
+        """Voice channel whose member list is driven by the fake gateway"""
+        self.world = world
+        self.id = channel_id
+        self.name = name
+        self.guild = world.guild
+        self.category_id = category_id
+        self.user_limit = user_limit
+        self.status = ""
+        self._fake_members: List[FakeMember] = []
+        self._fake_overwrites = dict(overwrites or {})
+
+    def __repr__(self) -> str:
+        return f"<FakeVoiceChannel id={self.id} name={self.name!r} members={len(self._fake_members)}>"
+
+    @property
+    def members(self) -> List[FakeMember]:
+        return list(self._fake_members)
+
+    @property
+    def overwrites(self) -> dict:
+        return dict(self._fake_overwrites)
+
+    async def edit(self, *, category: Optional[FakeCategory] = None, overwrites: Optional[dict] = None, **kwargs) -> 'FakeVoiceChannel':
+        await self.world.http.request(f"channel:{self.id}", op="edit_channel")
+        self._check_exists()
+        if category is not None:
+            self.category_id = category.id
+        if overwrites is not None:
+            self._fake_overwrites = dict(overwrites)
+        return self
+
+    async def set_permissions(self, target, **permissions) -> None:
+        await self.world.http.request(f"channel:{self.id}", op="set_permissions")
+        self._check_exists()
+        self._fake_overwrites[target] = discord.PermissionOverwrite(**permissions)
+
+    async def delete(self, **kwargs) -> None:
+        await self.world.http.request(f"channel:{self.id}", op="delete_channel")
+        self._check_exists()
+        for member in list(self._fake_members):
+            self.world.set_voice(member, None)
+        del self.world.channels[self.id]
+
+    async def create_invite(self, **kwargs) -> FakeInvite:
+        await self.world.http.request(f"channel:{self.id}", op="create_invite")
+        self._check_exists()
+        return FakeInvite(f"room{self.id}")
+
+    def _check_exists(self) -> None:
+        if self.id not in self.world.channels:
+            raise not_found("Channel")
+
+
+class FakeMessage:
+    __slots__ = ('channel', 'id', 'author', 'embeds', 'view', 'created_at', 'pinned')
+
+    def __init__(self, channel: 'FakeTextChannel', message_id: int, author: FakeUser, embeds: List[discord.Embed], view=None):
+        self.channel = channel
+        self.id = message_id
+        self.author = author
+        self.embeds = embeds
+        self.view = view
+        self.created_at = datetime.now(timezone.utc)
+        self.pinned = False
+
+    async def edit(self, embed: Optional[discord.Embed] = None, **kwargs) -> 'FakeMessage':
+        await self.channel.world.http.request(f"messages:{self.channel.id}", op="edit_message")
+        self._check_exists()
+        if embed is not None:
+            self.embeds = [embed]
+        return self
+
+    async def pin(self, **kwargs) -> None:
+        await self.channel.world.http.request(f"messages:{self.channel.id}", op="pin_message")
+        self._check_exists()
+        self.pinned = True
+
+    async def delete(self, **kwargs) -> None:
+        await self.channel.world.http.request(f"messages:{self.channel.id}", op="delete_message")
+        self._check_exists()
+        del self.channel.messages[self.id]
+
+    def _check_exists(self) -> None:
+        if self.channel.messages.get(self.id) is not self:
+            raise not_found("Message")
+
+
+class FakeTextChannel:
+    def __init__(self, world: 'FakeDiscord', channel_id: int):
+        """Listing channel keeping its messages in memory"""
+        self.world = world
+        self.id = channel_id
+        self.guild = world.guild
+        self.category_id = None
+        self.messages: Dict[int, FakeMessage] = {}
+
+    async def send(self, embed: Optional[discord.Embed] = None, view=None, **kwargs) -> FakeMessage:
+        await self.world.http.request(f"messages:{self.id}", op="send_message")
+        message = FakeMessage(self, self.world.snowflake(), self.world.user, [embed] if embed else [], view)
+        self.messages[message.id] = message
+        return message
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return self.messages.get(message_id) or FakeMessage(self, message_id, self.world.user, [])
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        await self.world.http.request(f"messages:{self.id}", op="fetch_message")
+        if message_id not in self.messages:
+            raise not_found("Message")
+        return self.messages[message_id]
+
+    async def history(self, limit: Optional[int] = 100, **kwargs) -> AsyncIterator[FakeMessage]:
+        await self.world.http.request(f"messages:{self.id}", op="history")
+        for message_id in sorted(self.messages, reverse=True)[:limit]:
+            yield self.messages[message_id]
+
+    async def delete_messages(self, messages: Iterable, **kwargs) -> None:
+        await self.world.http.request(f"messages:{self.id}", op="bulk_delete")
+        for message in messages:
+            self.messages.pop(message.id, None)
+
+
+class FakeGuild:
+    def __init__(self, world: 'FakeDiscord', guild_id: int):
+        self.world = world
+        self.id = guild_id
+        self.default_role = FakeRole(guild_id, "@everyone")
+
+    @property
+    def categories(self) -> List[FakeCategory]:
+        return [channel for channel in self.world.channels.values() if isinstance(channel, FakeCategory)]
+
+    def get_channel(self, channel_id: int):
+        return self.world.channels.get(channel_id)
+
+    async def create_voice_channel(self, name: str, category: Optional[FakeCategory] = None, user_limit: int = 0, overwrites: Optional[dict] = None, **kwargs) -> FakeVoiceChannel:
+        await self.world.http.request(f"channels:{self.id}", op="create_channel")
+        channel = FakeVoiceChannel(self.world, self.world.snowflake(), name, category.id if category else None, user_limit, overwrites)
+        self.world.channels[channel.id] = channel
+        return channel
+
+
+class FakeDiscord:
+    def __init__(self, http: Optional[FakeHTTPBackend] = None, lobby_sizes: Tuple[int, ...] = (2, 3, 4), first_id: int = 1 << 60):
+        """In-memory guild with the categories, lobbies and listing channel the Autoroomer expects.
+
+        Voice state changes are delivered to the registered listeners as separate tasks,
+        like the gateway does.
+
+        Args:
+            http: REST backend that every fake request goes through.
+            lobby_sizes: User limits of the lobby channels to create.
+            first_id: First snowflake handed out; worlds sharing a state backend need disjoint ranges.
+        """
+        self.http = http or FakeHTTPBackend()
+        self._ids = count(first_id)
+        self.user = FakeUser(self.snowflake())
+        self.guild = FakeGuild(self, self.snowflake())
+        self.channels: Dict[int, Any] = {}
+        self.category_create_room = self._add(FakeCategory(self, self.snowflake(), "Create room"))
+        self.category_find = self._add(FakeCategory(self, self.snowflake(), "Find"))
+        self.category_filled = self._add(FakeCategory(self, self.snowflake(), "Filled"))
+        self.text_channel = self._add(FakeTextChannel(self, self.snowflake()))
+        self.lobbies: Dict[int, FakeVoiceChannel] = {
+            size: self._add(FakeVoiceChannel(self, self.snowflake(), f"Create {size}", self.category_create_room.id, 0))
+            for size in lobby_sizes
+        }
+        self.members: List[FakeMember] = []
+        self.voice_listeners: List[Callable[[FakeMember, Any, Any], Awaitable[None]]] = []
+        self.tasks: set = set()
+
+    def snowflake(self) -> int:
+        """Returns a new, increasing ID"""
+        return next(self._ids)
+
+    def add_members(self, amount: int) -> List[FakeMember]:
+        """Adds members to the guild"""
+        members = [FakeMember(self, self.snowflake()) for _ in range(amount)]
+        self.members.extend(members)
+        return members
+
+    def get_channel(self, channel_id: int):
+        """Looks up a channel like Bot.get_channel"""
+        return self.channels.get(channel_id)
+
+    def rooms(self) -> List[FakeVoiceChannel]:
+        """Returns the rooms currently listed in the "find" category"""
+        return self.category_find.voice_channels
+
+    def set_voice(self, member: FakeMember, channel: Optional[FakeVoiceChannel]) -> None:
+        """Connects, moves or disconnects a member and dispatches the voice state update"""
+        before = member.voice_channel
+        if before is channel:
+            return
+        if before is not None:
+            before._fake_members.remove(member)
+        if channel is not None:
+            channel._fake_members.append(member)
+        member.voice_channel = channel
+        before_state = SimpleNamespace(channel=before, self_mute=member.self_mute, self_deaf=member.self_deaf, deaf=False)
+        after_state = SimpleNamespace(channel=channel, self_mute=member.self_mute, self_deaf=member.self_deaf, deaf=False)
+        for listener in self.voice_listeners:
+            task = asyncio.create_task(listener(member, before_state, after_state))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    def toggle_mute(self, member: FakeMember) -> None:
+        """Dispatches the voice state update of a member muting or unmuting in place"""
+        if member.voice_channel is None:
+            return
+        member.self_mute = not member.self_mute
+        before_state = SimpleNamespace(channel=member.voice_channel, self_mute=not member.self_mute, self_deaf=member.self_deaf, deaf=False)
+        after_state = SimpleNamespace(channel=member.voice_channel, self_mute=member.self_mute, self_deaf=member.self_deaf, deaf=False)
+        for listener in self.voice_listeners:
+            task = asyncio.create_task(listener(member, before_state, after_state))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    def toggle_deafen(self, member: FakeMember) -> None:
+        """Dispatches the voice state update of a member deafening or undeafening in place"""
+        if member.voice_channel is None:
+            return
+        member.self_deaf = not member.self_deaf
+        before_state = SimpleNamespace(channel=member.voice_channel, self_mute=member.self_mute, self_deaf=not member.self_deaf, deaf=False)
+        after_state = SimpleNamespace(channel=member.voice_channel, self_mute=member.self_mute, self_deaf=member.self_deaf, deaf=False)
+        for listener in self.voice_listeners:
+            task = asyncio.create_task(listener(member, before_state, after_state))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    def _add(self, channel):
+        self.channels[channel.id] = channel
+        return channel
+
+
+def fake_config(world: FakeDiscord, **overrides) -> SimpleNamespace:
+    """Builds an Autoroomer configuration pointing at the fake guild.
+
+    Args:
+        world: The fake guild.
+        overrides: Settings that differ from the defaults below.
+
+    Returns:
+        SimpleNamespace: Object with the attributes of ``Config``.
+    """
+    sizes = sorted(world.lobbies)
+    settings = dict(
+        token="fake",
+        text_channel_id=world.text_channel.id,
+        voice_1=world.lobbies[sizes[0]].id,
+        voice_2=world.lobbies[sizes[1]].id,
+        voice_3=world.lobbies[sizes[2]].id,
+        category_create_room=world.category_create_room.id,
+        category_find=world.category_find.id,
+        category_filled=world.category_filled.id,
+        lang="en.json",
+        guilds_file=None,
+        locale_reload_interval=0.0,
+        edit_flush_window=0.0,
+        listing_mode="messages",
+        board_refresh_interval=0.0,
+        matchmaking=False,
+        voice_record_file=None,
+        room_idle_timeout=0.0,
+        listing_retry_delay=5.0,
+        listing_retry_attempts=5,
+        room_grace_period=0.0,
+        filled_hysteresis=0.0,
+        state_db=":memory:",
+        state_flush_interval=1.0,
+        state_backend="sqlite",
+        state_lease_ttl=15.0,
+        shard_count=0,
+        workers=1,
+        intents_profile="minimal",
+        reconcile_history_limit=500,
+        reconcile_timeout=60.0,
+        pool_min_size=0,
+        pool_max_size=0,
+        pool_horizon=30.0,
+        metrics_host="127.0.0.1",
+        metrics_port=0,
+        log_level="INFO",
+        log_levels={},
+        log_buffer_size=10000,
+        log_file=None,
+        log_json_file=None,
+        log_max_bytes=10485760,
+        log_backup_count=5,
+    )
+    settings.update(overrides)
+    config = SimpleNamespace(**settings)
+    if "guilds" not in overrides:
+        config.guilds = [replace(guild, guild_id=world.guild.id) for guild in load_guild_configs(config)]
+    return config
+
+
+class FakeRedisServer:
+    __slots__ = ('host', 'port', 'commands', '_values', '_hashes', '_expiry', '_server')
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """Local stand-in for a Redis server with the commands RedisBackend uses.
+
+        Args:
+            host: Interface to listen on.
+            port: Port to listen on; 0 picks a free one, see ``url`` after ``start``.
+        """
+        self.host = host
+        self.port = port
+        self.commands: Counter = Counter()
+        self._values: Dict[str, str] = {}
+        self._hashes: Dict[str, Dict[str, str]] = {}
+        self._expiry: Dict[str, float] = {}
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def close(self) -> None:
+        if self._server:
+            self._server.close()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                arguments = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    arguments.append((await reader.readexactly(length + 2))[:-2].decode())
+                writer.write(self._execute(arguments[0].upper(), arguments[1:]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def _execute(self, command: str, arguments: List[str]) -> bytes:
+        """Runs one command and returns its RESP reply"""
+        self.commands[command] += 1
+        for key in [key for key, deadline in self._expiry.items() if deadline <= time.monotonic()]:
+            self._values.pop(key, None)
+            del self._expiry[key]
+        if command in ("PING", "SELECT", "AUTH"):
+            return b"+OK\r\n" if command != "PING" else b"+PONG\r\n"
+        if command == "GET":
+            return _bulk(self._values.get(arguments[0]))
+        if command == "SET":
+            key, value, options = arguments[0], arguments[1], [option.upper() for option in arguments[2:]]
+            if ("NX" in options and key in self._values) or ("XX" in options and key not in self._values):
+                return _bulk(None)
+            self._values[key] = value
+            self._expiry.pop(key, None)
+            if "PX" in options:
+                self._expiry[key] = time.monotonic() + int(arguments[2 + options.index("PX") + 1]) / 1000
+            return b"+OK\r\n"
+        if command == "PEXPIRE":
+            if arguments[0] not in self._values:
+                return b":0\r\n"
+            self._expiry[arguments[0]] = time.monotonic() + int(arguments[1]) / 1000
+            return b":1\r\n"
+        if command == "DEL":
+            removed = sum(self._values.pop(key, None) is not None or self._hashes.pop(key, None) is not None for key in arguments)
+            return b":%d\r\n" % removed
+        if command == "EVAL" and arguments[0] in (ACQUIRE_SCRIPT, RELEASE_SCRIPT):
+            key, owner = arguments[2], arguments[3]
+            holder = self._values.get(key)
+            if arguments[0] == RELEASE_SCRIPT:
+                if holder != owner:
+                    return b":0\r\n"
+                del self._values[key]
+                self._expiry.pop(key, None)
+                return b":1\r\n"
+            if holder not in (None, owner):
+                return b":0\r\n"
+            self._values[key] = owner
+            self._expiry[key] = time.monotonic() + int(arguments[4]) / 1000
+            return b":1\r\n"
+        if command == "HSET":
+            fields = self._hashes.setdefault(arguments[0], {})
+            added = 0
+            for field, value in zip(arguments[1::2], arguments[2::2]):
+                added += field not in fields
+                fields[field] = value
+            return b":%d\r\n" % added
+        if command == "HDEL":
+            fields = self._hashes.get(arguments[0], {})
+            removed = sum(fields.pop(field, None) is not None for field in arguments[1:])
+            return b":%d\r\n" % removed
+        if command == "HGETALL":
+            fields = self._hashes.get(arguments[0], {})
+            return b"*%d\r\n" % (2 * len(fields)) + b"".join(_bulk(item) for pair in fields.items() for item in pair)
+        return f"-ERR unknown command '{command}'\r\n".encode()
+
+
+def _bulk(value: Optional[str]) -> bytes:
+    """Encodes a RESP bulk string, or the null bulk string for None"""
+    if value is None:
+        return b"$-1\r\n"
+    data = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
@@ -0,0 +1,361 @@
+import json
+import time
+import random
+import asyncio
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import quantiles
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+from src.cogs.autoroomer import Autoroomer
+from src.utils.localization import Locales
+from .fakes import DEFAULT_LIMITS, FakeDiscord, FakeHTTPBackend, FakeLogger, FakeMember, FakeVoiceChannel, fake_config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+UNLIMITED = (1_000_000, 1.0)
+LIMITS = {
+    "discord": DEFAULT_LIMITS,
+    "strict": {kind: (max(1, capacity // 2), per) for kind, (capacity, per) in DEFAULT_LIMITS.items()},
+    "none": {kind: UNLIMITED for kind in DEFAULT_LIMITS},
+}
+
+
+@dataclass(slots=True)
+class Action:
+    at: float
+    member: int
+    action: str
+    size: int = 0
+    owner: int = -1
+    text: str = ""
+    room: int = -1
+
+
+@dataclass(slots=True)
+class LoadReport:
+    events: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    rest_calls: Counter = field(default_factory=Counter)
+    rate_limited: int = 0
+    peak_memory_kb: Optional[int] = None
+    errors: List[str] = field(default_factory=list)
+    locks_left: int = 0
+    lock_contended: int = 0
+    lock_wait: float = 0.0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def rest_per_event(self) -> float:
+        return sum(self.rest_calls.values()) / self.events if self.events else 0.0
+
+    def percentile(self, q: int) -> float:
+        """Returns the q-th percentile of the handler latency in seconds"""
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return quantiles(self.latencies, n=100, method="inclusive")[q - 1]
+
+    def __str__(self) -> str:
+        calls = ", ".join(f"{op}={amount}" for op, amount in self.rest_calls.most_common())
+        memory = f"{self.peak_memory_kb / 1024:.1f} MiB" if self.peak_memory_kb is not None else "n/a"
+        return (
+            f"events:         {self.events} in {self.elapsed:.2f} s ({self.events_per_second:.0f} events/s)\n"
+            f"handler p50/99: {self.percentile(50) * 1000:.2f} / {self.percentile(99) * 1000:.2f} ms\n"
+            f"rest calls:     {sum(self.rest_calls.values())} ({self.rest_per_event:.2f} per event, {self.rate_limited} x 429)\n"
+            f"                {calls}\n"
+            f"room locks:     {self.lock_contended} contended, {self.lock_wait * 1000:.1f} ms waited, {self.locks_left} left after drain\n"
+            f"peak memory:    {memory}\n"
+            f"errors:         {len(self.errors)}"
+        )
+
+
+def random_traffic(events: int, members: int, sizes: List[int], seed: int = 0, rate: float = 0.0) -> Iterator[Action]:
+    """Generates random join/leave/status/mute traffic.
+
+    Members outside voice join a lobby or an open room, members in voice leave, hop to
+    another room, change their room's status or toggle their mute.
+
+    Args:
+        events: Number of actions to generate.
+        members: Number of members taking part.
+        sizes: Lobby sizes.
+        seed: Seed of the random generator.
+        rate: Mean actions per second (Poisson arrivals); 0 sends them back to back.
+
+    Yields:
+        Action: The next action; ``"join"`` without an owner means "any open room".
+    """
+    rng = random.Random(seed)
+    at = 0.0
+    for _ in range(events):
+        if rate:
+            at += rng.expovariate(rate)
+        roll = rng.random()
+        action = "lobby" if roll < 0.25 else "join" if roll < 0.45 else "leave" if roll < 0.7 else "status" if roll < 0.8 else "mute"
+        yield Action(at=at, member=rng.randrange(members), action=action, size=rng.choice(sizes), text=f"status {rng.randrange(10)}")
+
+
+def scripted_traffic(path: Path) -> Iterator[Action]:
+    """Reads actions from a JSON-lines file.
+
+    Each line holds ``at`` (seconds), ``member`` (index) and ``action`` (``lobby``, ``join``,
+    ``leave``, ``status`` or ``mute``) plus ``size`` for lobbies, ``owner`` (index) for joining a
+    member's room and ``text`` for status changes.
+
+    Args:
+        path: Path to the script.
+
+    Yields:
+        Action: The scripted actions in file order.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield Action(**json.loads(line))
+
+
+def _parse_ref(ref: Optional[str]) -> Tuple[Optional[str], int]:
+    """Splits a recorded channel reference like ``lobby:2`` or ``room:7`` into kind and number"""
+    if ref is None:
+        return None, 0
+    kind, _, value = ref.partition(":")
+    return kind, int(value or 0)
+
+
+def recorded_traffic(path: Path, speed: float = 0.0) -> Iterator[Action]:
+    """Turns a voice event recording (``VOICE_RECORD_FILE``) into user actions.
+
+    Moves from a lobby into a room are what the bot did in response to the lobby join,
+    so they are not replayed; the first member moved into a room is remembered as its
+    owner, and later joins and status changes of that room go to the room the replaying
+    bot gave that member. Moves to channels the bot does not manage count as leaves.
+
+    A recording appended to by several runs is split at their ``start`` lines: each run
+    is played after the previous one, with its members and rooms numbered after those
+    of the earlier runs, since the same number means someone else in another run.
+
+    Args:
+        path: Path to the recording.
+        speed: Playback speed relative to the recording; 0 plays it as fast as possible.
+
+    Yields:
+        Action: The recorded user actions in order.
+    """
+    owners: Dict[int, int] = {}
+    # Offsets of the current run: start time and first member and room numbers
+    run_at = last_at = 0.0
+    run_member = run_room = 0
+    members = rooms = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["event"] == "start":
+                run_at, run_member, run_room = last_at, members, rooms
+                continue
+            last_at = run_at + record["at"]
+            at = last_at / speed if speed else 0.0
+            if record["event"] == "status":
+                kind, room = _parse_ref(record["channel"])
+                if kind == "room":
+                    room += run_room
+                    rooms = max(rooms, room + 1)
+                    yield Action(at=at, member=0, action="status", owner=owners.get(room, -1), text=record["text"], room=room)
+                continue
+            member = record["member"] + run_member
+            members = max(members, member + 1)
+            before, before_value = _parse_ref(record["before"])
+            after, after_value = _parse_ref(record["after"])
+            if after == "room":
+                after_value += run_room
+                rooms = max(rooms, after_value + 1)
+            if record["before"] == record["after"]:
+                yield Action(at=at, member=member, action="mute")
+            elif after == "lobby":
+                yield Action(at=at, member=member, action="lobby", size=after_value)
+            elif after == "room" and before == "lobby":
+                owners.setdefault(after_value, member)
+            elif after == "room":
+                yield Action(at=at, member=member, action="join", owner=owners.get(after_value, -1), room=after_value)
+            elif before in ("lobby", "room"):
+                yield Action(at=at, member=member, action="leave")
+
+
+class LoadTest:
+    def __init__(
+        self,
+        members: int = 200,
+        latency: float = 0.0,
+        limits: str = "discord",
+        seed: int = 0,
+        first_id: int = 1 << 60,
+        cog_class: Type[Autoroomer] = Autoroomer,
+        **config
+    ):
+        """Runs the real Autoroomer cog against an in-memory guild.
+
+        Args:
+            members: Number of guild members available to the traffic.
+            latency: Simulated REST round-trip time in seconds.
+            limits: ``"discord"`` enforces Discord's route limits, waited for by the HTTP
+                client as py-cord does, ``"strict"`` lets the fake Discord allow half of them
+                and answer with 429s so that retries show up, and ``"none"``
+                lifts every limit to measure the bot's own cost.
+            seed: Seed for choices the traffic leaves open.
+            first_id: First snowflake of the fake guild; runs sharing a state backend need disjoint ranges.
+            cog_class: The cog to run, e.g. a variant of ``Autoroomer`` to compare against.
+            config: Overrides of the cog configuration (see ``fake_config``).
+        """
+        if limits not in LIMITS:
+            raise ValueError(f"Unknown limits {limits!r}, expected one of {', '.join(LIMITS)}")
+        self.limits = limits
+        http = FakeHTTPBackend(LIMITS[limits], UNLIMITED if limits == "none" else (5, 5.0), latency, client_limiter=limits == "discord")
+        self.world = FakeDiscord(http, first_id=first_id)
+        self.members: List[FakeMember] = self.world.add_members(members)
+        self.config = fake_config(self.world, **config)
+        self.logger = FakeLogger()
+        self.rng = random.Random(seed)
+        self.report = LoadReport()
+        self.recorded_rooms: Dict[int, FakeVoiceChannel] = {}
+        self.cog_class = cog_class
+        self.cog = None
+
+    async def setup(self) -> None:
+        """Loads the localization and creates the cog"""
+        localization = Locales(self.logger)
+        for guild in self.config.guilds:
+            await localization.load(guild.lang)
+        guild = self.world.guild
+        bot = SimpleNamespace(
+            get_channel=self.world.get_channel,
+            get_guild=lambda guild_id: guild if guild_id == guild.id else None,
+            user=self.world.user
+        )
+        self.cog = self.cog_class(bot, localization, self.config, self.logger)
+        await self.cog.setup()
+        if self.limits == "none":
+            self.cog.rest.concurrency = UNLIMITED[0]
+        self.world.voice_listeners.append(self._on_voice_state_update)
+        await self.cog.on_ready()
+
+    async def run(self, actions: Iterator[Action], trace_memory: bool = False) -> LoadReport:
+        """Plays the actions in real time and waits until the cog has finished all work.
+
+        Args:
+            actions: The traffic to play.
+            trace_memory: Measure the peak of Python allocations with tracemalloc
+                (slower) instead of the peak RSS of the process.
+
+        Returns:
+            LoadReport: Throughput, handler latency, REST usage and memory of the run.
+        """
+        if self.cog is None:
+            await self.setup()
+        if trace_memory:
+            tracemalloc.start()
+        self.world.http.calls.clear()
+        started = time.perf_counter()
+        for action in actions:
+            delay = action.at - (time.perf_counter() - started)
+            await asyncio.sleep(max(0.0, delay))
+            self.apply(action)
+        await self.drain()
+        self.report.elapsed = time.perf_counter() - started
+        self.report.rest_calls = Counter(self.world.http.calls)
+        self.report.rate_limited = self.world.http.rate_limited
+        self.report.errors = list(self.logger.errors)
+        self.report.locks_left = len(self.cog.locks)
+        self.report.lock_contended = self.cog.locks.contended
+        self.report.lock_wait = self.cog.locks.wait_seconds
+        if trace_memory:
+            self.report.peak_memory_kb = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        elif resource is not None:
+            self.report.peak_memory_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return self.report
+
+    def apply(self, action: Action) -> None:
+        """Performs one user action against the fake guild"""
+        member = self.members[action.member % len(self.members)]
+        world = self.world
+        if action.action == "lobby":
+            if action.size in world.lobbies:
+                world.set_voice(member, world.lobbies[action.size])
+        elif action.action == "join":
+            if action.room >= 0:
+                room = self._recorded_room(action)
+                rooms = [room] if room is not None else []
+            elif action.owner >= 0:
+                room = self.members[action.owner % len(self.members)].voice_channel
+                rooms = [room] if room is not None and room.category_id == world.category_find.id else []
+            else:
+                rooms = [room for room in world.rooms() if len(room._fake_members) < room.user_limit]
+            if rooms:
+                world.set_voice(member, self.rng.choice(rooms))
+        elif action.action == "leave":
+            world.set_voice(member, None)
+        elif action.action == "status":
+            room = self._recorded_room(action) if action.room >= 0 else member.voice_channel
+            if room is not None and room.category_id == world.category_find.id:
+                before, room.status = room.status, action.text
+                self._spawn(self._timed(self.cog.on_voice_channel_status_update(room, before, action.text)))
+        elif action.action == "mute":
+            world.toggle_mute(member)
+
+    def _recorded_room(self, action: Action) -> Optional[FakeVoiceChannel]:
+        """Returns the fake room standing in for a recorded room, bound to its owner's room on first use"""
+        room = self.recorded_rooms.get(action.room)
+        if room is None or room.id not in self.world.channels:
+            owner = self.members[action.owner % len(self.members)].voice_channel if action.owner >= 0 else None
+            if owner is None or owner.category_id not in (self.world.category_find.id, self.world.category_filled.id):
+                return None
+            room = self.recorded_rooms[action.room] = owner
+        return room
+
+    async def drain(self) -> None:
+        """Waits until no event handler, debounced edit, queued request or pending timer is left.
+
+        Timers include grace periods and idle timeouts, so with those configured the drain
+        lasts until the last of them has fired.
+        """
+        while True:
+            if self.world.tasks:
+                await asyncio.gather(*list(self.world.tasks), return_exceptions=True)
+                continue
+            if (
+                self.cog.edits._tasks or self.cog.board_edits._tasks or any(self.cog.rest.queue_depth().values())
+                or len(self.cog.timers) or self.cog.timers._running
+            ):
+                await asyncio.sleep(0.01)
+                continue
+            break
+
+    def close(self) -> None:
+        """Stops the cog's background work"""
+        if self.cog is not None:
+            self.cog.cog_unload()
+
+    async def _on_voice_state_update(self, member, before, after) -> None:
+        await self._timed(self.cog.on_voice_state_update(member, before, after))
+
+    async def _timed(self, handler) -> None:
+        started = time.perf_counter()
+        await handler
+        self.report.latencies.append(time.perf_counter() - started)
+        self.report.events += 1
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self.world.tasks.add(task)
+        task.add_done_callback(self.world.tasks.discard)